@@ -1,42 +1,99 @@
-from os import environ
-from flask import Flask
+import sys
+from os import environ, path
+from flask import Flask, g, send_file
 from flask_cors import CORS
-from flasgger import Swagger
 from flask_swagger_ui import get_swaggerui_blueprint
-from config.swagger_config import swagger_template
 from dotenv import load_dotenv
-from controllers import payments, membership, payroll, company, webhook, coupon
+from controllers import blueprints
+from dao import open_identity_map, close_identity_map, forget_replicas
+from services import reset_warmup
+from repositories import forget_connections
+from utils import reset_executor, lazy_import
+from utils.build_openapi import OPENAPI_PATH
 
-import firebase_admin
-from firebase_admin import credentials
+#imported on first use, see utils/lazy_import.py
+firebase_admin = lazy_import("firebase_admin")
 
 load_dotenv()
 
+#the credential and options the firebase app was created with, a forked worker creates it again from them
+firebase_config = {}
+
 
 def initialize_firebase():
     try:
-        cred = credentials.Certificate(environ["FIREBASE_CREDENTIALS_PATH"])
-        firebase_admin.initialize_app(cred, {
-            "databaseURL": environ["DATABASE_URL"]
-        })
+        cred = firebase_admin.credentials.Certificate(environ["FIREBASE_CREDENTIALS_PATH"])
+        options = {"databaseURL": environ["DATABASE_URL"]}
+        firebase_admin.initialize_app(cred, options)
+        firebase_config.update({"credential": cred, "options": options})
     except Exception as error:
         print(error)
 
 
+def reinitialize_after_fork():
+    """
+        Gives a forked worker its own clients, see gunicorn.conf.py. The gRPC channels, HTTP connections and
+        threads of the parent process can't be used after a fork, so every client the parent may have opened
+        is dropped and built again on first use
+    """
+    #the firestore clients are kept by the firebase app, a new app creates new channels
+    if (firebase_config):
+        firebase_admin.delete_app(firebase_admin.get_app())
+        firebase_admin.initialize_app(firebase_config["credential"], firebase_config["options"])
+
+    #stripe builds a new http session when it's None, it's not imported yet when the parent didn't call it
+    if ("stripe" in sys.modules):
+        sys.modules["stripe"].default_http_client = None
+
+    reset_executor()
+    forget_replicas()
+    forget_connections()
+    reset_warmup()
+
+
+def register_api_docs(app: Flask):
+    """
+        Serves the spec built by utils/build_openapi.py as a static file, the swagger UI is in /apidocs.
+        Without the file, e.g. while changing the routes, flasgger builds the spec on every request
+    """
+    if (not path.exists(OPENAPI_PATH)):
+        from flasgger import Swagger
+        from config.swagger_config import swagger_template
+        Swagger(app, template=swagger_template)
+        return
+
+    @app.route("/apispec_1.json")
+    def apispec():
+        return send_file(OPENAPI_PATH, mimetype="application/json", max_age=3600)
+
+    app.register_blueprint(get_swaggerui_blueprint(
+        base_url="/apidocs",
+        api_url="/apispec_1.json",
+        blueprint_name="apidocs"
+    ))
+
+
 def create_app():
     initialize_firebase()
     app = Flask(__name__)
     CORS(app)
     app.config.from_object("config.settings")
 
-    swagger = Swagger(app, template=swagger_template)
+    register_api_docs(app)
+
+    #the users read by a request are kept until it ends, see dao/identity_map.py
+    @app.before_request
+    def start_identity_map():
+        g.identity_map = open_identity_map()
+
+    @app.teardown_request
+    def end_identity_map(error=None):
+        token = g.pop("identity_map", None)
+        if (token is not None):
+            close_identity_map(token)
 
-    app.register_blueprint(payments)
-    app.register_blueprint(membership)
-    app.register_blueprint(company)
-    app.register_blueprint(payroll)
-    app.register_blueprint(webhook)
-    app.register_blueprint(coupon)
+    for blueprint in blueprints:
+        app.register_blueprint(blueprint)
 
     ui = get_swaggerui_blueprint(
         base_url="/swagger-ui",
@@ -0,0 +1,28 @@
+from a2wsgi import WSGIMiddleware
+from dao import close_replicas
+from os import environ
+from services import start_warmup
+from utils import LifespanApp
+
+#the threads of each worker that run the flask app, a request waiting on Firestore or Stripe holds one of them
+SYNC_WORKERS = int(environ.get("ASGI_SYNC_WORKERS", "32"))
+
+
+def create_asgi_app(flask_app=None) -> LifespanApp:
+    """
+        Builds the ASGI entrypoint, an alternative to serving create_app with WSGI workers. The flask app runs
+        behind the a2wsgi adapter, so every route keeps its hooks, CORS and error handlers and calls the same
+        services, in a pool of SYNC_WORKERS threads.
+        run "uvicorn --factory asgi:create_asgi_app --workers 2"
+        Args:
+            flask_app: the flask app to serve, create_app() when it is None
+    """
+    if (flask_app is None):
+        from app import create_app
+        flask_app = create_app()
+
+    return LifespanApp(
+        WSGIMiddleware(flask_app, workers=SYNC_WORKERS),
+        on_startup=[start_warmup],
+        on_shutdown=[close_replicas]
+    )
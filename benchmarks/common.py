@@ -0,0 +1,175 @@
+import json
+import math
+import time
+from collections import Counter
+from contextlib import contextmanager
+from os import makedirs, path
+from typing import Callable, Dict, List, Optional
+
+BASELINES_DIR = path.join(path.dirname(__file__), "baselines")
+
+
+def percentiles(samples: List[float]) -> dict:
+    """
+        Summarizes a list of latencies
+        Args:
+            samples: a list of latencies in seconds
+        Returns:
+            a dict with the count, mean, p50, p90, p99 and max latencies in milliseconds
+    """
+    if (len(samples) == 0):
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+    ordered = sorted(samples)
+
+    def rank(percentile: float) -> float:
+        index = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": rank(50),
+        "p90_ms": rank(90),
+        "p99_ms": rank(99),
+        "max_ms": round(ordered[-1] * 1000, 3)
+    }
+
+
+def measure(operation: Callable, repeat: int, warmup: int = 1) -> List[float]:
+    """
+        Runs an operation several times and records the latency of each run
+        Args:
+            operation: a callable without arguments
+            repeat: the number of measured runs
+            warmup: the number of runs to discard before measuring
+        Returns:
+            a list of latencies in seconds
+    """
+    for _ in range(warmup):
+        operation()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+
+    return samples
+
+
+class RoundTripCounter():
+    """
+        Counts the Firestore RPCs issued while it is active.
+        The low level gapic client is patched, so every DocumentReference.get, Query.stream,
+        set/update/delete and batch commit is counted exactly once.
+    """
+    RPC_METHODS = ["batch_get_documents", "run_query", "commit", "list_documents"]
+
+    def __init__(self):
+        self.calls = Counter()
+        self._originals = {}
+
+    def __enter__(self):
+        from google.cloud.firestore_v1.services.firestore.client import FirestoreClient
+
+        for method_name in self.RPC_METHODS:
+            original = getattr(FirestoreClient, method_name)
+            self._originals[method_name] = original
+            setattr(FirestoreClient, method_name, self._counted(method_name, original))
+
+        return self
+
+    def __exit__(self, *args):
+        from google.cloud.firestore_v1.services.firestore.client import FirestoreClient
+
+        for method_name, original in self._originals.items():
+            setattr(FirestoreClient, method_name, original)
+        self._originals = {}
+
+    def _counted(self, method_name: str, original: Callable) -> Callable:
+        counter = self.calls
+
+        def wrapper(*args, **kwargs):
+            counter[method_name] += 1
+            return original(*args, **kwargs)
+
+        return wrapper
+
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls.clear()
+
+
+@contextmanager
+def stage(results: dict, name: str):
+    """
+        Records the wall time of a block of code in results[name]
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results[name] = round((time.perf_counter() - start) * 1000, 3)
+
+
+class BaselineStore():
+    """
+        Saves benchmark results as json files and compares new runs against them
+    """
+
+    def __init__(self, name: str, directory: str = BASELINES_DIR):
+        self.file_path = path.join(directory, name + ".json")
+
+    def load(self) -> Optional[Dict[str, dict]]:
+        if (not path.exists(self.file_path)):
+            return None
+
+        with open(self.file_path, "r") as file:
+            return json.load(file)
+
+    def save(self, results: Dict[str, dict]) -> None:
+        makedirs(path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+    def compare(self, results: Dict[str, dict], tolerance: float = 0.25, metric: str = "p50_ms") -> List[str]:
+        """
+            Compares a run against the saved baseline
+            Args:
+                results: {operation: {"p50_ms": ..., "round_trips": ...}}
+                tolerance: the allowed relative latency increase (0.25 = 25%)
+                metric: the latency metric to compare
+            Returns:
+                a list with a description of every regression found, empty when there is no baseline yet
+        """
+        baseline = self.load()
+        if (baseline is None):
+            return []
+
+        regressions = []
+        for operation, current in results.items():
+            previous = baseline.get(operation)
+            if (previous is None):
+                continue
+
+            if (current.get("round_trips", 0) > previous.get("round_trips", 0)):
+                regressions.append(
+                    f"{operation}: round trips {previous.get('round_trips')} -> {current.get('round_trips')}"
+                )
+
+            if (metric in previous and current.get(metric, 0) > previous[metric] * (1 + tolerance)):
+                regressions.append(f"{operation}: {metric} {previous[metric]} -> {current[metric]}")
+
+        return regressions
+
+
+def print_table(results: Dict[str, dict], columns: List[str]) -> None:
+    name_width = max([len("operation")] + [len(name) for name in results])
+    print("operation".ljust(name_width) + "".join(" " + column.rjust(13) for column in columns))
+
+    for name, row in results.items():
+        print(name.ljust(name_width) + "".join(" " + str(row.get(column, "")).rjust(13) for column in columns))
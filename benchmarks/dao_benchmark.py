@@ -0,0 +1,192 @@
+"""
+    DAO latency benchmark against the local Firestore emulator.
+
+    Usage:
+        firebase emulators:start --only firestore
+        FIRESTORE_EMULATOR_HOST=localhost:8080 python -m benchmarks.dao_benchmark [--sizes 10 1000 50000]
+
+    Every operation reports latency percentiles and the Firestore round trips per call.
+    Results are compared against benchmarks/baselines/dao.json, run with --update-baseline to save a new one.
+    The baseline is local to the machine and not committed, without one the run only prints the results.
+"""
+import argparse
+import sys
+from benchmarks.common import BaselineStore, RoundTripCounter, measure, percentiles, print_table
+from benchmarks.emulator import clear_emulator, connect_emulator, seed_collection
+from benchmarks.synthetic import generate_catalog, generate_company, generate_subscription
+
+DEFAULT_SIZES = [10, 1000, 50000]
+
+
+def seed(company_code: str, size: int) -> dict:
+    """
+        Clears the emulator and writes a synthetic company with its catalog and subscriptions
+    """
+    clear_emulator()
+
+    company = generate_company(company_code, size)
+    catalog = generate_catalog()
+    users = [company["admin"]] + company["tutors"] + company["students"]
+    subscriptions = [generate_subscription(company["admin"], catalog["memberships"][0])]
+
+    seed_collection("users", users)
+    seed_collection("memberships", catalog["memberships"])
+    seed_collection("coupons", catalog["coupons"])
+    seed_collection("subscriptions", subscriptions)
+
+    return {**company, **catalog, "subscriptions": subscriptions}
+
+
+def build_operations(company_code: str, data: dict) -> dict:
+    """
+        Builds the operations to measure, every operation is a callable returning a Response
+    """
+    from dao import UserDao, PayrollDao, SubscriptionsDao, MembershipDao, CouponsDao
+    from entities import Payroll, AdminPayout, StudentDebt
+
+    user_dao = UserDao()
+    payroll_dao = PayrollDao()
+    subscriptions_dao = SubscriptionsDao()
+    membership_dao = MembershipDao()
+    coupons_dao = CouponsDao()
+
+    student = data["students"][0] if (len(data["students"]) > 0) else data["tutors"][0]
+    subscription = data["subscriptions"][0]
+    membership = data["memberships"][0]
+    coupon = data["coupons"][1]
+
+    students_debt = [
+        StudentDebt(
+            meetings_last=len(record["HistMeetingTimes"]),
+            meetings_count=len(record["HistMeetingTimes"]),
+            first_meeting=record["HistMeetingTimes"][0] if (len(record["HistMeetingTimes"]) > 0) else None,
+            last_meeting=record["HistMeetingTimesEnd"][-1] if (len(record["HistMeetingTimesEnd"]) > 0) else None,
+            hours=1,
+            student_id=record["id"],
+            student_name=record["name"],
+            student_debt=6000,
+            tutor_id=data["tutors"][0]["id"],
+            tutor_name=data["tutors"][0]["name"],
+            tutor_cost=6000,
+            admin_profit=2000,
+            pending_onboarding=False
+        )
+        for record in data["students"]
+    ]
+    payroll = Payroll(
+        company_code=company_code,
+        admin_id=data["admin"]["id"],
+        admin_payout=AdminPayout(),
+        students_debt=students_debt
+    )
+    created_payroll = payroll_dao.create_payroll(payroll)
+    payroll_id = created_payroll.response.id if (created_payroll.success) else "missing-payroll"
+
+    return {
+        "UserDao.read_user_by_id": lambda: user_dao.read_user_by_id(student["id"]),
+        "UserDao.save_stripe_customer_id": lambda: user_dao.save_stripe_customer_id(student["id"], "cus_bench"),
+        "UserDao.read_all_users_by_company_code": lambda: user_dao.read_all_users_by_company_code(company_code),
+        "UserDao.read_students_by_company_code": lambda: user_dao.read_students_by_company_code(company_code),
+        "UserDao.read_tutors_by_company_code": lambda: user_dao.read_tutors_by_company_code(company_code),
+        "PayrollDao.create_payroll": lambda: payroll_dao.create_payroll(payroll.model_copy()),
+        "PayrollDao.read_payroll_by_id": lambda: payroll_dao.read_payroll_by_id(payroll_id),
+        "PayrollDao.update_payroll_student_debt": lambda: payroll_dao.update_payroll_student_debt(
+            payroll_id,
+            students_debt
+        ),
+        "PayrollDao.read_not_paid_payroll_by_company_code": lambda: payroll_dao.read_not_paid_payroll_by_company_code(
+            company_code
+        ),
+        "SubscriptionsDao.read_active_subscription_by_id": lambda: subscriptions_dao.read_active_subscription_by_id(
+            subscription["id"]
+        ),
+        "SubscriptionsDao.read_active_subscription_by_customer_id":
+            lambda: subscriptions_dao.read_active_subscription_by_customer_id(subscription["local_user_id"]),
+        "SubscriptionsDao.update_subscription_by_id": lambda: subscriptions_dao.update_subscription_by_id(
+            subscription["id"],
+            2
+        ),
+        "MembershipDao.read_memberships": lambda: membership_dao.read_memberships(),
+        "MembershipDao.read_membership_by_id": lambda: membership_dao.read_membership_by_id(membership["id"]),
+        "CouponsDao.read_coupon_by_id": lambda: coupons_dao.read_coupon_by_id(coupon["id"]),
+        "CouponsDao.read_active_coupons": lambda: coupons_dao.read_active_coupons()
+    }
+
+
+# company wide operations are measured fewer times, they dominate the run time on big companies
+BULK_OPERATIONS = [
+    "UserDao.read_all_users_by_company_code",
+    "UserDao.read_students_by_company_code",
+    "UserDao.read_tutors_by_company_code",
+    "PayrollDao.create_payroll",
+    "PayrollDao.read_payroll_by_id",
+    "PayrollDao.update_payroll_student_debt",
+    "PayrollDao.read_not_paid_payroll_by_company_code"
+]
+
+
+def run_size(size: int, repeat: int, bulk_repeat: int) -> dict:
+    company_code = f"BENCH{size}"
+    data = seed(company_code, size)
+    operations = build_operations(company_code, data)
+    results = {}
+
+    for name, operation in operations.items():
+        runs = bulk_repeat if (name in BULK_OPERATIONS) else repeat
+        last_response = {}
+
+        def call():
+            last_response["response"] = operation()
+
+        with RoundTripCounter() as counter:
+            call()
+            round_trips = counter.total()
+
+        samples = measure(call, runs, warmup=0)
+        row = percentiles(samples)
+        row["round_trips"] = round_trips
+        if (not last_response["response"].success):
+            row["error"] = str(last_response["response"].message)[:60]
+
+        results[f"{size}:{name}"] = row
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="DAO benchmark against the Firestore emulator")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--bulk-repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    connect_emulator()
+
+    results = {}
+    for size in args.sizes:
+        results.update(run_size(size, args.repeat, args.bulk_repeat))
+
+    print_table(results, ["round_trips", "p50_ms", "p90_ms", "p99_ms", "max_ms", "error"])
+
+    store = BaselineStore("dao")
+    if (args.update_baseline):
+        store.save(results)
+        print(f"baseline saved in {store.file_path}")
+        return 0
+
+    if (store.load() is None):
+        #the baselines are not committed, their latencies depend on the machine that runs the emulator
+        print(f"no baseline in {store.file_path}, nothing to compare. Run with --update-baseline to create it")
+        return 0
+
+    regressions = store.compare(results, args.tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+
+    return 1 if (len(regressions) > 0) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
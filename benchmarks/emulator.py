@@ -0,0 +1,55 @@
+from os import environ
+import firebase_admin
+import requests
+from firebase_admin import credentials
+from google.auth.credentials import AnonymousCredentials
+
+DEFAULT_PROJECT_ID = "demo-tutorspace-bench"
+
+
+class EmulatorCredential(credentials.Base):
+    """
+        A firebase credential for the local emulator, it doesn't need a service account
+    """
+
+    def get_credential(self):
+        return AnonymousCredentials()
+
+
+def connect_emulator(project_id: str = DEFAULT_PROJECT_ID) -> None:
+    """
+        Initializes the default firebase app against the local Firestore emulator.
+        FIRESTORE_EMULATOR_HOST must be set (ex: "localhost:8080"), so we never touch a real database.
+    """
+    if (not environ.get("FIRESTORE_EMULATOR_HOST")):
+        raise Exception("FIRESTORE_EMULATOR_HOST_is_required")
+
+    # the DAOs build a StripeInterface, it only needs a key to be present
+    environ.setdefault("STRIPE_API", "sk_test_benchmark")
+
+    if (not firebase_admin._apps):
+        firebase_admin.initialize_app(EmulatorCredential(), {"projectId": project_id})
+
+
+def clear_emulator(project_id: str = DEFAULT_PROJECT_ID) -> None:
+    """
+        Deletes every document in the emulator database
+    """
+    host = environ["FIRESTORE_EMULATOR_HOST"]
+    url = f"http://{host}/emulator/v1/projects/{project_id}/databases/(default)/documents"
+    requests.delete(url, timeout=60).raise_for_status()
+
+
+def seed_collection(collection: str, records: list, batch_size: int = 500) -> None:
+    """
+        Writes records with batched commits, every record must have an "id"
+    """
+    from firebase_admin import firestore
+
+    db = firestore.client()
+
+    for index in range(0, len(records), batch_size):
+        batch = db.batch()
+        for record in records[index:index + batch_size]:
+            batch.set(db.collection(collection).document(record["id"]), record)
+        batch.commit()
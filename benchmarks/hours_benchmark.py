@@ -0,0 +1,112 @@
+"""
+    Compares the per student pure python hour calculation with the batched numpy pass.
+
+    Usage:
+        python -m benchmarks.hours_benchmark [--meetings 100000] [--students 5000]
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from benchmarks.common import measure, percentiles, print_table
+from utils import build_meeting_arrays, calculate_hours_by_range_batch, hours_by_range_from_arrays, \
+    to_epoch_microseconds, calculate_hours_by_ledger_batch, meeting_range
+
+
+def python_hours_by_range(activity_starts, activity_ends, start_range, end_range) -> float:
+    """
+        The previous pure python implementation, kept as the reference
+    """
+    total_hours = 0.0
+
+    for start, end in zip(activity_starts, activity_ends):
+        if start > end:
+            continue
+
+        overlap_start = max(start, start_range)
+        overlap_end = min(end, end_range)
+
+        if overlap_end > overlap_start:
+            total_hours += (overlap_end - overlap_start).total_seconds() / 3600
+
+    return total_hours
+
+
+def build_histories(total_meetings: int, total_students: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    per_student = total_meetings // total_students
+
+    histories = []
+    for _ in range(total_students):
+        starts = sorted(base + timedelta(hours=rng.randint(0, 24 * 365)) for _ in range(per_student))
+        histories.append((starts, [start + timedelta(minutes=rng.choice([60, 90, 120])) for start in starts]))
+
+    return histories
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Hours calculation benchmark")
+    parser.add_argument("--meetings", type=int, default=100000)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    histories = build_histories(args.meetings, args.students)
+    start_range = datetime(2024, 4, 1, tzinfo=timezone.utc)
+    end_range = datetime(2024, 9, 1, tzinfo=timezone.utc)
+
+    expected = [python_hours_by_range(starts, ends, start_range, end_range) for (starts, ends) in histories]
+    batched = calculate_hours_by_range_batch(histories, start_range, end_range)
+    if (any(abs(left - right) > 1e-6 for left, right in zip(expected, batched))):
+        print("the batched result doesn't match the reference")
+        return 1
+
+    # the arrays are built once and reused, e.g. to bill several ranges or to re-run a pending payroll
+    starts, ends, owners = build_meeting_arrays(histories)
+    start_us, end_us = to_epoch_microseconds([start_range, end_range]).tolist()
+
+    # cursors as a previous completed payroll (billed until start_range) would have left them
+    ledger = [
+        (starts, ends, meeting_range(starts, ends, 0, None, start_range)[2]) for (starts, ends) in histories
+    ]
+    ledger_hours, _ranges = calculate_hours_by_ledger_batch(ledger, start_range, end_range)
+    if (any(abs(left - right) > 1e-6 for left, right in zip(expected, ledger_hours))):
+        print("the ledger result doesn't match the reference")
+        return 1
+
+    results = {
+        "python_per_student": percentiles(measure(
+            lambda: [python_hours_by_range(starts, ends, start_range, end_range) for (starts, ends) in histories],
+            args.repeat
+        )),
+        "numpy_batch_with_conversion": percentiles(measure(
+            lambda: calculate_hours_by_range_batch(histories, start_range, end_range),
+            args.repeat
+        )),
+        "ledger_from_cursors": percentiles(measure(
+            lambda: calculate_hours_by_ledger_batch(ledger, start_range, end_range),
+            args.repeat
+        )),
+        "numpy_conversion_only": percentiles(measure(
+            lambda: build_meeting_arrays(histories),
+            args.repeat
+        )),
+        "numpy_on_epoch_arrays": percentiles(measure(
+            lambda: hours_by_range_from_arrays(starts, ends, owners, len(histories), start_us, end_us),
+            args.repeat
+        ))
+    }
+
+    reference = results["python_per_student"]["p50_ms"]
+    for row in results.values():
+        row["speedup"] = round(reference / row["p50_ms"], 2) if (row["p50_ms"] > 0) else ""
+
+    print(f"{args.meetings} meetings, {args.students} students")
+    print_table(results, ["p50_ms", "p90_ms", "max_ms", "speedup"])
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+    Import time benchmark, the cold start of a worker before it serves a request.
+
+    Usage:
+        python -m benchmarks.import_benchmark [--statement "import app"] [--top 20]
+
+    It runs the statement in a new interpreter with "python -X importtime" and prints the modules that took
+    the longest, by cumulative time (the module and everything it imported).
+"""
+import argparse
+import subprocess
+import sys
+from os import path
+from typing import Dict
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+
+
+def read_import_times(statement: str) -> Dict[str, dict]:
+    """
+        Runs a statement in a new interpreter and reads its imports
+        Args:
+            statement: python code, e.g. "import controllers"
+        Returns:
+            {module: {"self_ms", "cumulative_ms"}} in import order
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if (not line.startswith("import time:") or "[us]" in line):
+            continue
+        (self_us, cumulative_us, module) = line[len("import time:"):].split("|")
+        imports[module.strip()] = {
+            "self_ms": round(int(self_us) / 1000, 3),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 3)
+        }
+
+    return imports
+
+
+def main(argv=None) -> int:
+    from benchmarks.common import print_table
+
+    parser = argparse.ArgumentParser(description="Import time of the app modules")
+    parser.add_argument("--statement", default="import app")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    imports = read_import_times(args.statement)
+    slowest = sorted(imports.items(), key=lambda item: item[1]["cumulative_ms"], reverse=True)[:args.top]
+
+    print_table(dict(slowest), ["self_ms", "cumulative_ms"])
+    print("total_ms", round(sum(module["self_ms"] for module in imports.values()), 3))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+    End to end payroll load generator.
+
+    Runs prepare_payroll -> charge_students_by_payroll -> pay_tutors_by_payroll -> pay_admin_by_payroll
+    for synthetic companies against in process Firestore and Stripe stand-ins, and reports per stage
+    wall time, Firestore/Stripe call counts and peak memory.
+
+    With --backend memory or sqlite the DAOs use the local repositories instead of the Firestore stand-in,
+    the difference with the firestore backend is the overhead of the Firestore client.
+
+    Usage:
+        python -m benchmarks.payroll_load --students 100 1000 10000 --firestore-latency-ms 5 --stripe-latency-ms 150
+        python -m benchmarks.payroll_load --students 10000 --backend sqlite
+"""
+import argparse
+import logging
+import sys
+import time
+import tracemalloc
+from os import environ
+from unittest import mock
+from benchmarks.common import print_table
+from benchmarks.standins import FakeFirestore, FakeStripe
+from benchmarks.synthetic import generate_payroll_company
+
+STAGES = ["prepare_payroll", "charge_students_by_payroll", "pay_tutors_by_payroll", "pay_admin_by_payroll"]
+
+
+def seed_company(db: FakeFirestore, company: dict, backend: str) -> None:
+    users = [company["admin"]] + company["tutors"] + company["students"]
+
+    if (backend == "firestore"):
+        db.seed("users", users)
+        db.seed("subscriptions", company["subscriptions"])
+        return
+
+    from repositories import create_repository
+
+    create_repository("users").set_objects_by_ids({user["id"]: user for user in users})
+    create_repository("subscriptions").set_objects_by_ids({
+        subscription["id"]: subscription for subscription in company["subscriptions"]
+    })
+
+
+def run_stage(results: dict, name: str, db: FakeFirestore, stripe_fake: FakeStripe, operation, track_memory: bool):
+    db.calls.clear()
+    stripe_fake.calls.clear()
+
+    if (track_memory):
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    response = operation()
+    elapsed = time.perf_counter() - start
+
+    peak = 0
+    if (track_memory):
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    results[name] = {
+        "wall_ms": round(elapsed * 1000, 1),
+        "fs_reads": db.calls["get"] + db.calls["query"],
+        "fs_writes": db.calls["commit"],
+        "stripe_calls": sum(stripe_fake.calls.values()),
+        "peak_mib": round(peak / (1024 * 1024), 2) if (track_memory) else "",
+        "ok": response.success
+    }
+
+    if (not response.success):
+        results[name]["error"] = str(response.message)[:60]
+
+    return response
+
+
+def run_cycle(db: FakeFirestore, stripe_fake: FakeStripe, company_code: str, track_memory: bool) -> dict:
+    from services import PayrollService
+
+    results = {}
+    service = PayrollService()
+
+    prepared = run_stage(results, "prepare_payroll", db, stripe_fake,
+                         lambda: service.prepare_payroll(company_code), track_memory)
+    if (not prepared.success):
+        return results
+
+    payroll = prepared.response
+    payroll_id = payroll.id if (hasattr(payroll, "id")) else payroll.get("id")
+
+    for name in STAGES[1:]:
+        stage_response = run_stage(results, name, db, stripe_fake,
+                                   lambda: getattr(service, name)(payroll_id), track_memory)
+        if (not stage_response.success):
+            break
+
+    return results
+
+
+def run_company(total_students: int, args) -> dict:
+    company_code = f"LOAD{total_students}"
+    company = generate_payroll_company(
+        company_code,
+        total_students,
+        students_per_tutor=args.students_per_tutor,
+        history_weeks=args.history_weeks,
+        company_type=args.company_type,
+        pending_onboarding_ratio=args.pending_onboarding_ratio
+    )
+
+    db = FakeFirestore(latency_ms=args.firestore_latency_ms)
+    seed_company(db, company, args.backend)
+
+    results = {}
+    with mock.patch("firebase_admin.firestore.client", return_value=db), \
+            FakeStripe(latency_ms=args.stripe_latency_ms) as stripe_fake:
+        for cycle in range(args.cycles):
+            for name, row in run_cycle(db, stripe_fake, company_code, not args.no_memory).items():
+                results[f"{total_students}:{cycle + 1}:{name}"] = row
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End to end payroll load generator")
+    parser.add_argument("--students", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--students-per-tutor", type=int, default=10)
+    parser.add_argument("--history-weeks", type=int, default=26)
+    parser.add_argument("--company-type", choices=["tutor_group", "individual_group"], default="tutor_group")
+    parser.add_argument("--pending-onboarding-ratio", type=float, default=0.0)
+    parser.add_argument("--cycles", type=int, default=2, help="the second cycle bills by date range")
+    parser.add_argument("--backend", choices=["firestore", "memory", "sqlite"], default="firestore",
+                        help="the repositories used by the DAOs, firestore is the in process stand-in")
+    parser.add_argument("--firestore-latency-ms", type=float, default=0.0)
+    parser.add_argument("--stripe-latency-ms", type=float, default=0.0)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc, it slows the stages down")
+    parser.add_argument("--verbose", action="store_true", help="keep the Response error logs")
+    args = parser.parse_args(argv)
+
+    if (not args.verbose):
+        logging.disable(logging.ERROR)
+
+    # the services build a StripeInterface, it only needs a key to be present
+    environ.setdefault("STRIPE_API", "sk_test_load")
+    environ["REPOSITORY_BACKEND"] = args.backend
+
+    results = {}
+    for total_students in args.students:
+        results.update(run_company(total_students, args))
+
+    print_table(results, ["wall_ms", "fs_reads", "fs_writes", "stripe_calls", "peak_mib", "ok", "error"])
+
+    return 0 if (all(row["ok"] for row in results.values())) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+    Compares the previous find_* scans with the one pass merge when a pending payroll is re-run.
+
+    Usage:
+        python -m benchmarks.reconcile_benchmark [--students 10000] [--paid-ratio 0.5]
+"""
+import argparse
+import random
+import sys
+from benchmarks.common import measure, percentiles, print_table
+from entities import StudentDebt
+from utils import find_student_debt_by_student_id, merge_payroll_lines
+
+
+def build_lines(total_students: int, paid_ratio: float, seed: int = 7) -> tuple:
+    rng = random.Random(seed)
+
+    def line(index: int, paid: bool) -> StudentDebt:
+        return StudentDebt(
+            hours=1.5,
+            student_id=f"student-{index}",
+            student_name=f"Student {index}",
+            student_debt=9000,
+            tutor_id=f"tutor-{index // 10}",
+            tutor_name=f"Tutor {index // 10}",
+            tutor_cost=6000,
+            admin_profit=3000,
+            pending_onboarding=False,
+            paid=paid
+        )
+
+    previous = [line(index, rng.random() < paid_ratio) for index in range(total_students)]
+    new = [line(index, False) for index in range(total_students)]
+    rng.shuffle(new)
+
+    return previous, new
+
+
+def scan_validate(previous: list, new: list) -> list:
+    """
+        The previous validate_payroll_payments reconciliation, kept as the reference
+    """
+    return [
+        find_student_debt_by_student_id(new, student_debt.student_id) if (not student_debt.paid) else student_debt
+        for student_debt in previous
+    ]
+
+
+def scan_create(previous: list, new: list) -> list:
+    """
+        The previous create_company_payroll reconciliation, kept as the reference
+    """
+    merged = []
+    for record in new:
+        saved_record = find_student_debt_by_student_id(previous, record.student_id)
+        merged.append(saved_record if (saved_record is not None and saved_record.paid) else record)
+    return merged
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Payroll reconciliation benchmark")
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--paid-ratio", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for total_students in args.students:
+        previous, new = build_lines(total_students, args.paid_ratio)
+
+        if (sorted(line.student_id for line in merge_payroll_lines(previous, new, "student_id")) !=
+                sorted(line.student_id for line in scan_create(previous, new))):
+            print("the merged lines don't match the reference")
+            return 1
+
+        rows = {
+            "scan_validate": percentiles(measure(lambda: scan_validate(previous, new), args.repeat)),
+            "scan_create": percentiles(measure(lambda: scan_create(previous, new), args.repeat)),
+            "merge": percentiles(measure(lambda: merge_payroll_lines(previous, new, "student_id"), args.repeat))
+        }
+
+        reference = rows["scan_create"]["p50_ms"]
+        for name, row in rows.items():
+            row["speedup"] = round(reference / row["p50_ms"], 1) if (row["p50_ms"] > 0) else ""
+            results[f"{total_students}:{name}"] = row
+
+    print_table(results, ["p50_ms", "p90_ms", "max_ms", "speedup"])
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+    Server benchmark, the gunicorn profiles of gunicorn.conf.py serving create_app against uvicorn serving asgi.py,
+    all on the local Firestore emulator.
+
+    Usage:
+        firebase emulators:start --only firestore
+        FIRESTORE_EMULATOR_HOST=localhost:8080 python -m benchmarks.server_benchmark [--workers 2] [--concurrency 16 64]
+
+    Every server gets the same closed loop load: --concurrency clients sending the membership reads back to back
+    for --duration seconds, after a --warmup run. It prints requests/sec and latency percentiles per server and
+    concurrency. Without --workers the gunicorn profiles use the sizing of gunicorn.conf.py and uvicorn a worker
+    per CPU. The payments routes are left out, they need a stripe account.
+"""
+import argparse
+import http.client
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import cpu_count
+from os import environ
+from benchmarks.common import percentiles, print_table
+from benchmarks.emulator import clear_emulator, connect_emulator, seed_collection
+from benchmarks.synthetic import generate_catalog, generate_company, generate_subscription
+
+
+def gunicorn_command(args) -> list:
+    return [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{args.port}",
+        "--log-level", "warning", "benchmarks.server_benchmark:wsgi_app()"
+    ]
+
+
+def uvicorn_command(args) -> list:
+    return [
+        sys.executable, "-m", "uvicorn", "--factory", "--workers", str(args.workers or cpu_count()),
+        "--port", str(args.port), "--log-level", "warning", "--no-access-log", "benchmarks.server_benchmark:asgi_app"
+    ]
+
+
+#{name: (command, environment)}
+SERVERS = {
+    "gunicorn-sync": (gunicorn_command, {"GUNICORN_PROFILE": "sync"}),
+    "gunicorn-gthread": (gunicorn_command, {"GUNICORN_PROFILE": "gthread"}),
+    "gunicorn-gevent": (gunicorn_command, {"GUNICORN_PROFILE": "gevent"}),
+    "uvicorn-asgi": (uvicorn_command, {}),
+}
+
+
+def wsgi_app():
+    """
+        The app served by gunicorn, create_app on the emulator
+    """
+    from app import create_app
+
+    connect_emulator()
+    return create_app()
+
+
+def asgi_app():
+    """
+        The app served by uvicorn, create_asgi_app on the emulator
+    """
+    from asgi import create_asgi_app
+
+    return create_asgi_app(wsgi_app())
+
+
+def seed(company_code: str, size: int) -> dict:
+    """
+        Clears the emulator and writes a synthetic company with its catalog and a subscription
+    """
+    clear_emulator()
+
+    company = generate_company(company_code, size)
+    catalog = generate_catalog()
+    users = [company["admin"]] + company["tutors"] + company["students"]
+    subscriptions = [generate_subscription(company["admin"], catalog["memberships"][0])]
+
+    seed_collection("users", users)
+    seed_collection("memberships", catalog["memberships"])
+    seed_collection("subscriptions", subscriptions)
+
+    return {**company, **catalog, "subscriptions": subscriptions}
+
+
+def wait_until_listening(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while (time.monotonic() < deadline):
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/memberships/read_memberships")
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+
+    raise Exception("server_did_not_start")
+
+
+def run_load(port: int, paths: list, concurrency: int, duration: float) -> dict:
+    """
+        Sends the paths round robin from concurrency clients, every client waits for its response before
+        sending the next request
+        Returns:
+            the requests/sec, the errors and the latency percentiles
+    """
+    samples = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(index: int):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        latencies = []
+        failures = 0
+        request_index = index
+        while (time.monotonic() < deadline):
+            start = time.perf_counter()
+            try:
+                connection.request("GET", paths[request_index % len(paths)])
+                response = connection.getresponse()
+                response.read()
+                if (response.status != 200):
+                    failures += 1
+            except (OSError, http.client.HTTPException):
+                failures += 1
+                connection.close()
+            latencies.append(time.perf_counter() - start)
+            request_index += 1
+        connection.close()
+
+        with lock:
+            samples.extend(latencies)
+            errors.append(failures)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {"req_per_s": round(len(samples) / elapsed, 1), "errors": sum(errors), **percentiles(samples)}
+
+
+def run_server(name: str, args, paths: list) -> dict:
+    (command, server_environ) = SERVERS[name]
+    server_environ = {**environ, **server_environ, "REPOSITORY_BACKEND": "firestore", "GUNICORN_ACCESS_LOG": ""}
+    if (args.workers):
+        server_environ["GUNICORN_WORKERS"] = str(args.workers)
+
+    server = subprocess.Popen(command(args), env=server_environ)
+    try:
+        wait_until_listening(args.port)
+        results = {}
+        for concurrency in args.concurrency:
+            run_load(args.port, paths, concurrency, args.warmup)
+            results[f"{name}:{concurrency}c"] = run_load(args.port, paths, concurrency, args.duration)
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compares the WSGI and ASGI servers")
+    parser.add_argument("--servers", choices=list(SERVERS), nargs="+", default=list(SERVERS))
+    parser.add_argument("--workers", type=int, default=None, help="the worker processes of every server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args(argv)
+
+    # the services build a StripeInterface, it only needs a key to be present
+    environ.setdefault("STRIPE_API", "sk_test_benchmark")
+    connect_emulator()
+    data = seed("SERVER", args.users)
+
+    admin_id = data["admin"]["id"]
+    paths = [
+        f"/memberships/read_memberships?user_id={admin_id}",
+        f"/memberships/read_active_membership?user_id={admin_id}",
+    ]
+
+    results = {}
+    for name in args.servers:
+        results.update(run_server(name, args, paths))
+
+    print_table(results, ["req_per_s", "errors", "p50_ms", "p90_ms", "p99_ms", "max_ms"])
+
+    return 0 if (all(row["errors"] == 0 for row in results.values())) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
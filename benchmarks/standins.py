@@ -0,0 +1,306 @@
+"""
+    In process stand-ins for Firestore and Stripe.
+    They keep the same call surface the repositories and the StripeInterface use, so the real
+    DAO and service code runs unchanged, and they count every call that would be a network round trip.
+"""
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+import stripe
+from google.api_core.exceptions import FailedPrecondition
+
+OPERATORS = {
+    "==": lambda current, value: current == value,
+    "!=": lambda current, value: current != value,
+    "<": lambda current, value: current is not None and current < value,
+    "<=": lambda current, value: current is not None and current <= value,
+    ">": lambda current, value: current is not None and current > value,
+    ">=": lambda current, value: current is not None and current >= value,
+    "in": lambda current, value: current in value,
+    "array_contains": lambda current, value: isinstance(current, list) and value in current,
+}
+
+
+def _to_stored(value):
+    """
+        Mimics the Firestore serialization, naive datetimes are stored as UTC.
+        It returns a new copy of every dict and list, scalars and datetimes are immutable so they are shared.
+    """
+    if (isinstance(value, dict)):
+        return {key: _to_stored(item) for key, item in value.items()}
+    if (isinstance(value, (list, tuple))):
+        return [_to_stored(item) for item in value]
+    if (isinstance(value, datetime) and value.tzinfo is None):
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _WriteResult():
+    def __init__(self):
+        self.update_time = datetime.now(timezone.utc)
+        self.transform_results = []
+
+
+class FakeSnapshot():
+    def __init__(self, document_id: str, data: Optional[dict], reference: "FakeDocument" = None,
+                 update_time: int = None):
+        self.id = document_id
+        self._data = data
+        self.reference = reference
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[dict]:
+        return _to_stored(self._data)
+
+
+class FakeDocument():
+    def __init__(self, db: "FakeFirestore", collection: str, document_id: str):
+        self._db = db
+        self.collection_path = collection
+        self.id = document_id
+
+    @property
+    def path(self) -> str:
+        return self.collection_path + "/" + self.id
+
+    def get(self, *args, **kwargs) -> FakeSnapshot:
+        self._db.round_trip("get")
+        return FakeSnapshot(
+            self.id,
+            self._db.documents(self.collection_path).get(self.id),
+            self,
+            self._db.update_time(self.collection_path, self.id)
+        )
+
+    def set(self, data: dict, merge: bool = False) -> _WriteResult:
+        self._db.round_trip("commit")
+        return self._db.apply_set(self.collection_path, self.id, data, merge)
+
+    def update(self, data: dict) -> _WriteResult:
+        self._db.round_trip("commit")
+        return self._db.apply_update(self.collection_path, self.id, data)
+
+    def delete(self) -> _WriteResult:
+        self._db.round_trip("commit")
+        return self._db.apply_delete(self.collection_path, self.id)
+
+
+class FakeQuery():
+    def __init__(self, db: "FakeFirestore", collection: str, filters: list = None, limit: int = None,
+                 start_after: str = None, fields: list = None):
+        self._db = db
+        self._collection = collection
+        self._filters = filters or []
+        self._limit = limit
+        self._start_after = start_after
+        self._fields = fields
+
+    def _copy(self, **changes) -> "FakeQuery":
+        options = {
+            "filters": self._filters,
+            "limit": self._limit,
+            "start_after": self._start_after,
+            "fields": self._fields,
+            **changes
+        }
+        return FakeQuery(self._db, self._collection, **options)
+
+    def select(self, field_paths: list) -> "FakeQuery":
+        return self._copy(fields=list(field_paths))
+
+    def where(self, field_path: str = None, op_string: str = None, value=None, filter=None) -> "FakeQuery":
+        condition = (filter.field_path, filter.op_string, filter.value) if (filter is not None) else (
+            field_path, op_string, value)
+        return self._copy(filters=self._filters + [condition])
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit=count)
+
+    def order_by(self, field_path: str, *args, **kwargs) -> "FakeQuery":
+        if (field_path != "__name__"):
+            raise NotImplementedError("the stand-in only orders by document id")
+        return self
+
+    def start_after(self, fields: dict) -> "FakeQuery":
+        return self._copy(start_after=fields["__name__"])
+
+    def _matches(self, record: dict) -> bool:
+        return all(
+            field in record and OPERATORS[operator](record[field], value)
+            for (field, operator, value) in self._filters
+        )
+
+    def stream(self, *args, **kwargs):
+        self._db.round_trip("query")
+        documents = self._db.documents(self._collection)
+        matches = [
+            FakeSnapshot(document_id, record if (self._fields is None) else {
+                field: record[field] for field in self._fields if (field in record)
+            }, FakeDocument(self._db, self._collection, document_id))
+            for document_id, record in sorted(documents.items())
+            if (self._start_after is None or document_id > self._start_after) and self._matches(record)
+        ]
+        return iter(matches[:self._limit] if (self._limit is not None) else matches)
+
+    def get(self, *args, **kwargs) -> list:
+        return list(self.stream())
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db: "FakeFirestore", collection: str):
+        super().__init__(db, collection)
+
+    def document(self, document_id: str = None) -> FakeDocument:
+        return FakeDocument(self._db, self._collection, document_id or uuid.uuid4().hex[:20])
+
+
+class FakeBatch():
+    def __init__(self, db: "FakeFirestore"):
+        self._db = db
+        self._writes = []
+        self._preconditions = []
+
+    def set(self, reference: FakeDocument, data: dict, merge: bool = False):
+        self._writes.append(lambda: self._db.apply_set(reference.collection_path, reference.id, data, merge))
+
+    def update(self, reference: FakeDocument, data: dict, option: "_LastUpdateOption" = None):
+        if (option is not None):
+            self._preconditions.append((reference, option.last_update_time))
+        self._writes.append(lambda: self._db.apply_update(reference.collection_path, reference.id, data))
+
+    def delete(self, reference: FakeDocument):
+        self._writes.append(lambda: self._db.apply_delete(reference.collection_path, reference.id))
+
+    def commit(self) -> list:
+        self._db.round_trip("commit")
+        for (reference, last_update_time) in self._preconditions:
+            if (self._db.update_time(reference.collection_path, reference.id) != last_update_time):
+                raise FailedPrecondition("the document changed since it was read")
+        return [write() for write in self._writes]
+
+
+class _LastUpdateOption():
+    def __init__(self, last_update_time: int):
+        self.last_update_time = last_update_time
+
+
+class FakeFirestore():
+    """
+        A dict backed stand-in for firestore.Client
+        Args:
+            latency_ms: a simulated network latency added to every round trip
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.calls = Counter()
+        self._collections = {}
+        self._versions = Counter()
+
+    def round_trip(self, kind: str):
+        self.calls[kind] += 1
+        if (self.latency > 0):
+            time.sleep(self.latency)
+
+    def documents(self, collection: str) -> dict:
+        return self._collections.setdefault(collection, {})
+
+    def collection(self, collection: str) -> FakeCollection:
+        return FakeCollection(self, collection)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+    def write_option(self, last_update_time: int = None) -> _LastUpdateOption:
+        return _LastUpdateOption(last_update_time)
+
+    def update_time(self, collection: str, document_id: str) -> int:
+        #a version number stands in for the update timestamp
+        return self._versions[(collection, document_id)]
+
+    def get_all(self, references: list, *args, **kwargs):
+        self.round_trip("get")
+        return iter([
+            FakeSnapshot(reference.id, self.documents(reference.collection_path).get(reference.id), reference)
+            for reference in references
+        ])
+
+    def apply_set(self, collection: str, document_id: str, data: dict, merge: bool = False) -> _WriteResult:
+        documents = self.documents(collection)
+        stored = _to_stored(data)
+        documents[document_id] = {**documents.get(document_id, {}), **stored} if (merge) else stored
+        self._versions[(collection, document_id)] += 1
+        return _WriteResult()
+
+    def apply_update(self, collection: str, document_id: str, data: dict) -> _WriteResult:
+        documents = self.documents(collection)
+        if (document_id not in documents):
+            raise Exception(f"404 No document to update: {collection}/{document_id}")
+
+        record = documents[document_id]
+        for (field, value) in data.items():
+            record[field] = _to_stored(value)
+        self._versions[(collection, document_id)] += 1
+        return _WriteResult()
+
+    def apply_delete(self, collection: str, document_id: str) -> _WriteResult:
+        self.documents(collection).pop(document_id, None)
+        return _WriteResult()
+
+    def seed(self, collection: str, records: list):
+        for record in records:
+            self.apply_set(collection, record["id"], record)
+
+
+class FakeStripe():
+    """
+        Replaces the stripe resources used by the payroll with local fakes
+        Args:
+            latency_ms: a simulated network latency added to every stripe call
+    """
+    RESOURCES = [
+        ("Invoice", "create", "in"),
+        ("Invoice", "pay", "in"),
+        ("InvoiceItem", "create", "ii"),
+        ("Transfer", "create", "tr"),
+        ("Payout", "create", "po"),
+    ]
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.calls = Counter()
+        self._originals = []
+
+    def _fake(self, name: str, prefix: str):
+        def call(*args, **kwargs):
+            self.calls[name] += 1
+            if (self.latency > 0):
+                time.sleep(self.latency)
+
+            object_id = args[0] if (len(args) > 0 and isinstance(args[0], str)) else prefix + "_" + uuid.uuid4().hex
+            return {"id": object_id, "status": "paid" if (prefix == "in") else "pending", **kwargs}
+
+        return call
+
+    def __enter__(self):
+        for (resource_name, method_name, prefix) in self.RESOURCES:
+            resource = getattr(stripe, resource_name)
+            self._originals.append((resource, method_name, resource.__dict__.get(method_name)))
+            setattr(resource, method_name, self._fake(f"{resource_name}.{method_name}", prefix))
+
+        return self
+
+    def __exit__(self, *args):
+        for (resource, method_name, original) in reversed(self._originals):
+            if (original is None):
+                delattr(resource, method_name)
+            else:
+                setattr(resource, method_name, original)
+        self._originals = []
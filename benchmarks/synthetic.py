@@ -0,0 +1,219 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+STUDENTS_PER_TUTOR = 10
+
+
+def _student_record(rng: random.Random, company_code: str, index: int, tutor_name: str, meetings: int) -> dict:
+    start = datetime(2024, 1, 1, 15, 0, tzinfo=timezone.utc)
+    starts = [start + timedelta(days=7 * week, hours=rng.randint(0, 4)) for week in range(meetings)]
+    ends = [meeting + timedelta(minutes=rng.choice([60, 90])) for meeting in starts]
+
+    record = {
+        "id": f"{company_code}-student-{index}",
+        "uid": f"{company_code}-student-{index}",
+        "name": f"Student {company_code} {index}",
+        "ParentName": f"Parent {index}",
+        "email": f"student{index}@{company_code.lower()}.example.com",
+        "Type": "Student",
+        "Tutor": tutor_name,
+        "CompanyCode": company_code,
+        "company_type": "tutor_group",
+        "Notepad": "n" * rng.randint(200, 2000),
+        "assignments": "a" * rng.randint(100, 1000),
+        "QuizResults": "q" * rng.randint(100, 1000),
+        "HistMeetingTimes": starts,
+        "HistMeetingTimesEnd": ends,
+        "stripe_customer_id": f"cus_{company_code}_{index}",
+        "has_default_payment_method": True
+    }
+
+    for test in range(1, 11):
+        record[f"Test{test}"] = str(rng.randint(400, 1600))
+        record[f"Test{test}ACT"] = str(rng.randint(1, 36))
+
+    return record
+
+
+def _tutor_record(company_code: str, index: int, admin: bool = False) -> dict:
+    user_id = f"{company_code}-admin" if (admin) else f"{company_code}-tutor-{index}"
+
+    return {
+        "id": user_id,
+        "uid": user_id,
+        "name": f"Admin {company_code}" if (admin) else f"Tutor {company_code} {index}",
+        "email": f"{user_id}@example.com",
+        "Type": "Tutor",
+        "Admin": admin,
+        "CompanyCode": company_code,
+        "company_type": "tutor_group",
+        "cost_per_session": 6000,
+        "pay_per_hour": 4000,
+        "stripe_subaccount_id": f"acct_{user_id}",
+        "stripe_customer_id": f"cus_{user_id}"
+    }
+
+
+def generate_company(company_code: str, total_users: int, meetings_per_student: int = 12, seed: int = 7) -> dict:
+    """
+        Generates a synthetic company shaped like the production user documents
+        Args:
+            company_code: the company code for every user
+            total_users: the total number of users, admin and tutors included
+            meetings_per_student: the length of every student's meeting history
+            seed: random seed, the same seed always generates the same company
+        Returns:
+            {
+                "admin": the admin user dict,
+                "tutors": a list of tutor user dicts,
+                "students": a list of student user dicts
+            }
+    """
+    rng = random.Random(seed)
+
+    total_tutors = max(1, (total_users - 1) // (STUDENTS_PER_TUTOR + 1))
+    total_students = max(0, total_users - 1 - total_tutors)
+
+    admin = _tutor_record(company_code, 0, admin=True)
+    tutors = [_tutor_record(company_code, index) for index in range(total_tutors)]
+    students = [
+        _student_record(rng, company_code, index, tutors[index % total_tutors]["name"], meetings_per_student)
+        for index in range(total_students)
+    ]
+
+    return {"admin": admin, "tutors": tutors, "students": students}
+
+
+def generate_catalog(total_memberships: int = 5, total_coupons: int = 20) -> dict:
+    """
+        Generates the memberships and coupons catalogs
+    """
+    memberships = [{
+        "id": f"membership-{index}",
+        "name": f"Membership {index}",
+        "description": "synthetic membership",
+        "price": 1000 * (index + 1),
+        "interval": "month",
+        "interval_count": 1,
+        "active_admin": index % 2 == 0,
+        "type_": ["Individual"]
+    } for index in range(total_memberships)]
+
+    coupons = [{
+        "id": f"coupon-{index}",
+        "name": f"Coupon {index}",
+        "type_": "percentage",
+        "percent_off": 10.0,
+        "active": index % 4 != 0,
+        "stripe_coupon_id": f"stripe-coupon-{index}"
+    } for index in range(total_coupons)]
+
+    return {"memberships": memberships, "coupons": coupons}
+
+
+def generate_subscription(user: dict, membership: dict, index: int = 0) -> dict:
+    """
+        Generates an active subscription for a user
+    """
+    now = datetime.now(timezone.utc)
+
+    return {
+        "id": f"subscription-{user['id']}-{index}",
+        "status": "active",
+        "quantity": 1,
+        "payment_random_id": f"random-{user['id']}-{index}",
+        "stripe_subscription_id": membership.get("stripe_id", "prod_synthetic"),
+        "stripe_active_subscription_id": f"sub_{user['id']}",
+        "stripe_customer_id": user.get("stripe_customer_id", ""),
+        "local_subscription_id": membership["id"],
+        "local_user_id": user["id"],
+        "start_date": now.timestamp(),
+        "renewal_date": (now + timedelta(days=30)).timestamp(),
+        "is_paid": True,
+        "admin": user.get("Admin", False),
+        "company_type": user.get("company_type", ""),
+        "prorate_data": []
+    }
+
+
+def _meeting_history(rng: random.Random, weeks: int, now: datetime) -> tuple:
+    """
+        A chronological meeting history: one or two weekly slots, sessions of 60/90/120 minutes
+        and some cancelled weeks, ending before now
+    """
+    slots = [(rng.randint(0, 6), rng.randint(14, 20)) for _ in range(rng.choice([1, 1, 2]))]
+    duration = timedelta(minutes=rng.choice([60, 60, 90, 120]))
+    first_week = now - timedelta(weeks=rng.randint(max(1, weeks // 4), weeks))
+    first_week = first_week.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    starts = []
+    week = first_week
+    while (week + timedelta(weeks=1) < now):
+        for (weekday, hour) in slots:
+            if (rng.random() > 0.1):
+                starts.append(week + timedelta(days=weekday, hours=hour))
+        week = week + timedelta(weeks=1)
+
+    starts.sort()
+    return starts, [start + duration for start in starts]
+
+
+def generate_payroll_company(company_code: str,
+                             total_students: int,
+                             students_per_tutor: int = STUDENTS_PER_TUTOR,
+                             history_weeks: int = 26,
+                             company_type: str = "tutor_group",
+                             pending_onboarding_ratio: float = 0.0,
+                             seed: int = 7) -> dict:
+    """
+        Generates a company ready to run a full payroll cycle
+        Args:
+            company_code: the company code for every user
+            total_students: the number of students (or individuals) to bill
+            students_per_tutor: the number of students assigned to every tutor
+            history_weeks: the maximum length of a meeting history in weeks
+            company_type: tutor_group or individual_group
+            pending_onboarding_ratio: the share of students without a default payment method,
+                the payroll cannot pay the tutors until all of them are charged
+            seed: random seed, the same seed always generates the same company
+        Returns:
+            {
+                "admin": the admin user dict, onboarded and with an active subscription,
+                "tutors": tutor dicts with cost_per_session and pay_per_hour in cents,
+                "students": student dicts with their meeting histories,
+                "subscriptions": the admin active subscription
+            }
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    total_tutors = max(1, total_students // students_per_tutor)
+    user_type = "Student" if (company_type == "tutor_group") else "Individual"
+
+    admin = _tutor_record(company_code, 0, admin=True)
+    admin["company_type"] = company_type
+
+    tutors = []
+    for index in range(total_tutors):
+        tutor = _tutor_record(company_code, index)
+        # even amounts in cents, so half hour sessions always bill whole cents
+        tutor["cost_per_session"] = rng.choice([4000, 5000, 6000, 8000])
+        tutor["pay_per_hour"] = tutor["cost_per_session"] - rng.choice([1000, 1500, 2000])
+        tutor["company_type"] = company_type
+        tutors.append(tutor)
+
+    students = []
+    for index in range(total_students):
+        starts, ends = _meeting_history(rng, history_weeks, now)
+        student = _student_record(rng, company_code, index, tutors[index % total_tutors]["name"], 0)
+        student.update({
+            "Type": user_type,
+            "company_type": company_type,
+            "HistMeetingTimes": starts,
+            "HistMeetingTimesEnd": ends,
+            "has_default_payment_method": rng.random() >= pending_onboarding_ratio
+        })
+        students.append(student)
+
+    subscription = generate_subscription(admin, {"id": "membership-admin", "stripe_id": "prod_admin"})
+
+    return {"admin": admin, "tutors": tutors, "students": students, "subscriptions": [subscription]}
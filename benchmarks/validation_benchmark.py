@@ -0,0 +1,70 @@
+"""
+    Compares the pydantic validation paths for user documents and payroll lines.
+
+    Usage:
+        python -m benchmarks.validation_benchmark [--users 50000]
+"""
+import argparse
+import sys
+from benchmarks.common import measure, percentiles, print_table
+from benchmarks.synthetic import generate_payroll_company
+from entities import StudentUser, PayrollStudent, StudentDebt, validate_models
+
+
+def build_lines(students: list) -> list:
+    return [
+        StudentDebt(
+            meetings_last=len(student["HistMeetingTimes"]),
+            meetings_count=len(student["HistMeetingTimes"]),
+            hours=1.5,
+            student_id=student["id"],
+            student_name=student["name"],
+            student_debt=9000,
+            tutor_id="tutor",
+            tutor_name="Tutor",
+            tutor_cost=6000,
+            admin_profit=3000,
+            pending_onboarding=False
+        ).model_dump()
+        for student in students
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Validation benchmark")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--history-weeks", type=int, default=26)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    students = generate_payroll_company("VALIDATION", args.users, history_weeks=args.history_weeks)["students"]
+    projected = [
+        {field: record[field] for field in PayrollStudent.model_fields if (field in record)} for record in students
+    ]
+    lines = build_lines(students)
+
+    cases = {
+        "StudentUser.model_validate": lambda: [StudentUser.model_validate(record) for record in students],
+        "StudentUser.type_adapter": lambda: validate_models(StudentUser, students),
+        "PayrollStudent.model_validate": lambda: [PayrollStudent.model_validate(record) for record in projected],
+        "PayrollStudent.type_adapter": lambda: validate_models(PayrollStudent, projected),
+        "StudentDebt.model_validate": lambda: [StudentDebt.model_validate(record) for record in lines],
+        "StudentDebt.type_adapter": lambda: validate_models(StudentDebt, lines),
+        # no validation at all, kept to show it isn't cheaper than the pydantic core for these models
+        "StudentDebt.model_construct": lambda: [StudentDebt.model_construct(**record) for record in lines],
+    }
+
+    results = {}
+    for name, operation in cases.items():
+        row = percentiles(measure(operation, args.repeat))
+        row["docs_per_s"] = round(args.users / (row["p50_ms"] / 1000)) if (row["p50_ms"] > 0) else ""
+        results[name] = row
+
+    print(f"{args.users} documents")
+    print_table(results, ["p50_ms", "p90_ms", "docs_per_s"])
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
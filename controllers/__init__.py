@@ -4,3 +4,6 @@ from .payroll_controller import payroll
 from .company_controller import company
 from .webhook_controller import webhook
 from .coupons_controller import coupon
+from .health_controller import health
+
+blueprints = [payments, membership, company, payroll, webhook, coupon, health]
@@ -0,0 +1,49 @@
+from flask import Blueprint
+from entities import Response
+from services import start_warmup, is_ready, read_warmup_stages
+
+health = Blueprint("health", __name__, url_prefix="/health")
+
+
+@health.route("/live", methods=["GET"])
+def live():
+    """Liveness probe, the process is serving
+        ---
+        tags:
+            - Health
+        responses:
+            200:
+                description: Returns a Response object with success true
+                schema:
+                    $ref: '#/definitions/Response'
+    """
+    response = Response()
+    response.success = True
+
+    return response.model_dump()
+
+
+@health.route("/ready", methods=["GET"])
+def ready():
+    """Readiness probe, the worker is ready once its warm up is done
+        ---
+        tags:
+            - Health
+        responses:
+            200:
+                description: The warm up is done, response has the time and result of every stage
+                schema:
+                    $ref: '#/definitions/Response'
+            503:
+                description: The warm up is running
+                schema:
+                    $ref: '#/definitions/Response'
+    """
+    #the servers start the warm up when a worker starts, the first probe starts it otherwise
+    start_warmup()
+
+    response = Response()
+    response.success = is_ready()
+    response.response = read_warmup_stages()
+
+    return response.model_dump(), 200 if (response.success) else 503
@@ -1,7 +1,10 @@
 from flask import Blueprint, request
 from entities import Response
 from services import StripeService
-import json, stripe
+from utils import lazy_import
+import json
+
+stripe = lazy_import("stripe")
 
 webhook = Blueprint("webhook", __name__)
 
@@ -1,5 +1,7 @@
-from .user import UserDao
-from .membership import MembershipDao
-from .subscription import SubscriptionsDao
+from .user import UserDao, AsyncUserDao
+from .membership import MembershipDao, AsyncMembershipDao
+from .subscription import SubscriptionsDao, AsyncSubscriptionsDao
 from .payroll import PayrollDao
-from .coupon import CouponsDao
+from .coupon import CouponsDao, AsyncCouponsDao
+from .identity_map import open_identity_map, close_identity_map, identity_map_scope, prefetch_records
+from .user_replica import read_company_users, close_replicas, forget_replicas
@@ -1,13 +1,14 @@
 from entities import Response, Coupon
 from interfaces import StripeInterface
-from repositories import FirestoreRepository
+from repositories import create_repository, create_async_repository
+from dao.identity_map import get_record, put_record
 
 
 class CouponsDao():
     def __init__(self):
         self.collection = "coupons"
         self.stripe = StripeInterface()
-        self.repository = FirestoreRepository(self.collection)
+        self.repository = create_repository(self.collection)
 
     def create_coupon(self, coupon: Coupon) -> Response:
         """
@@ -42,7 +43,14 @@ class CouponsDao():
         response = Response()
 
         try:
-            read_response = self.repository.read_object_by_id(coupon_id)
+            record = get_record(self.collection, coupon_id)
+            if (record is None):
+                read_response = self.repository.read_object_by_id(coupon_id)
+                if (read_response.success):
+                    put_record(self.collection, coupon_id, read_response.response)
+            else:
+                read_response = Response(response=record, success=True)
+
             if (not read_response.success):
                 raise Exception(read_response.message)
 
@@ -92,3 +100,62 @@ class CouponsDao():
             response.message = e
 
         return response
+
+
+class AsyncCouponsDao():
+    """
+        The CouponsDao reads on an async repository, so the async request handlers can await them together
+    """
+
+    def __init__(self):
+        self.collection = "coupons"
+        self.repository = create_async_repository(self.collection)
+
+    async def read_coupon_by_id(self, coupon_id: str) -> Response:
+        """
+            Reads a single coupon by id
+            Args:
+                coupon_id: The coupon id
+            Returns:
+                response
+        """
+        response = Response()
+
+        try:
+            record = get_record(self.collection, coupon_id)
+            if (record is None):
+                read_response = await self.repository.read_object_by_id(coupon_id)
+                if (read_response.success):
+                    put_record(self.collection, coupon_id, read_response.response)
+            else:
+                read_response = Response(response=record, success=True)
+
+            if (not read_response.success):
+                raise Exception(read_response.message)
+
+            response.response = Coupon.model_validate(read_response.response)
+            response.success = True
+        except Exception as e:
+            response.message = e
+
+        return response
+
+    async def read_active_coupons(self) -> Response:
+        """
+            Reads all the coupons that can be used
+            Returns:
+                response
+        """
+        response = Response()
+
+        try:
+            read_response = await self.repository.read_objects_with_equal("active", True)
+            if (not read_response.success):
+                raise Exception(read_response.message)
+
+            response.response_list = [Coupon.model_validate(item) for item in read_response.response_list]
+            response.success = True
+        except Exception as e:
+            response.message = e
+
+        return response
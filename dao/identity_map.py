@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import List, Optional, Tuple
+from repositories import create_repository
+
+#the records read in the current request, by collection and id. None outside a request, so nothing is cached
+_records: ContextVar[Optional[dict]] = ContextVar("identity_map", default=None)
+
+
+def open_identity_map() -> Token:
+    """
+        Starts an empty identity map for the current request
+        Returns:
+            the token to close it with close_identity_map
+    """
+    return _records.set({})
+
+
+def close_identity_map(token: Token):
+    """
+        Drops the identity map of the current request
+        Args:
+            token: the token returned by open_identity_map
+    """
+    _records.reset(token)
+
+
+@contextmanager
+def identity_map_scope():
+    """
+        Keeps an identity map open inside a with block, e.g. in scripts and background jobs
+    """
+    token = open_identity_map()
+    try:
+        yield
+    finally:
+        close_identity_map(token)
+
+
+def get_record(collection: str, object_id: str) -> Optional[dict]:
+    records = _records.get()
+    return records.get((collection, object_id)) if (records is not None) else None
+
+
+def put_record(collection: str, object_id: str, record: dict):
+    records = _records.get()
+    if (records is not None):
+        records[(collection, object_id)] = record
+
+
+def prefetch_records(documents: List[Tuple[str, str]]):
+    """
+        Reads the records a request is going to need, of any collection, in one round trip.
+        The DAOs find them in the identity map afterwards, it does nothing when the map is not open
+        Args:
+            documents: (collection, id) tuples
+    """
+    records = _records.get()
+    if (records is None):
+        return
+
+    missing = [document for document in dict.fromkeys(documents) if (document not in records)]
+    if (len(missing) == 0):
+        return
+
+    documents_response = create_repository(missing[0][0]).read_documents(missing)
+    if (documents_response.success):
+        records.update(documents_response.response)
+
+
+def forget_records(collection: str, object_ids: list = None):
+    """
+        Removes records after they are written, all the collection when object_ids is None
+    """
+    records = _records.get()
+    if (records is None):
+        return
+
+    if (object_ids is None):
+        for key in [key for key in records if (key[0] == collection)]:
+            del records[key]
+    else:
+        for object_id in object_ids:
+            records.pop((collection, object_id), None)
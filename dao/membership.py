@@ -1,14 +1,15 @@
-from repositories import FirestoreRepository
+from repositories import create_repository, create_async_repository
+from dao.identity_map import get_record, put_record
 from interfaces import StripeInterface
 from entities import Response, Membership, Product, PriceData, Recurring, StudentUser, TutorUser
-from typing import Union
+from typing import List, Union
 
 
 class MembershipDao():
     def __init__(self) -> None:
         self.collection = "memberships"
         self.stripe = StripeInterface()
-        self.repository = FirestoreRepository(self.collection)
+        self.repository = create_repository(self.collection)
 
     def create_membership(self, membership: Membership) -> Response:
         """
@@ -91,7 +92,14 @@ class MembershipDao():
         response = Response()
 
         try:
-            response = self.repository.read_object_by_id(membership_id)
+            record = get_record(self.collection, membership_id)
+            if (record is None):
+                response = self.repository.read_object_by_id(membership_id)
+                if (response.success):
+                    put_record(self.collection, membership_id, response.response)
+            else:
+                response.response = record
+                response.success = True
 
             if (not response.success):
                 raise Exception(response.message)
@@ -103,6 +111,32 @@ class MembershipDao():
 
         return response
 
+    def read_memberships_by_ids(self, membership_ids: List[str]) -> Response:
+        """
+            Reads many memberships in one round trip
+            Args:
+                membership_ids: local membership ids
+            Returns:
+                response: a response object
+                    response.response: a dict {membership_id: Membership} with the memberships found
+        """
+        response = Response()
+
+        try:
+            read_response = self.repository.read_objects_by_ids(membership_ids)
+            if (not read_response.success):
+                raise Exception(read_response.message)
+
+            response.response = {
+                membership_id: Membership.model_validate(record)
+                for (membership_id, record) in read_response.response.items()
+            }
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
     def read_enabled_user_memberships(self, user: Union[StudentUser, TutorUser]) -> Response:
         """
             Reads all the memberships enabled to be bought for a user
@@ -131,3 +165,89 @@ class MembershipDao():
             response.message = str(e)
 
         return response
+
+
+class AsyncMembershipDao():
+    """
+        The MembershipDao reads on an async repository, so the async request handlers can await them together
+    """
+
+    def __init__(self) -> None:
+        self.collection = "memberships"
+        self.repository = create_async_repository(self.collection)
+
+    async def read_memberships(self) -> Response:
+        """
+            Reads all the memberships records from the database
+            Returns:
+                response: a response object
+                    response.response_list = a list of Membership objects
+        """
+        response = Response()
+
+        try:
+            response = await self.repository.read_collection()
+            if (not response.success):
+                raise Exception(response.message)
+
+            response.response_list = [Membership.model_validate(item) for item in response.response_list]
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_membership_by_id(self, membership_id: str) -> Response:
+        """
+            Reads a membership record from the database with an id
+            Args:
+                membership_id(str): a local membership id
+            Returns:
+                response: a response object
+                    response.response: a Membership object
+        """
+        response = Response()
+
+        try:
+            record = get_record(self.collection, membership_id)
+            if (record is None):
+                response = await self.repository.read_object_by_id(membership_id)
+                if (response.success):
+                    put_record(self.collection, membership_id, response.response)
+            else:
+                response.response = record
+                response.success = True
+
+            if (not response.success):
+                raise Exception(response.message)
+
+            response.response = Membership.model_validate(response.response)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_enabled_user_memberships(self, user: Union[StudentUser, TutorUser]) -> Response:
+        """
+            Reads all the memberships enabled to be bought for a user
+            Args:
+                user: the user object
+            Returns:
+                response: a response object
+                    response.response_list: a list of the enabled memberships objects
+        """
+        response = Response()
+
+        try:
+            if (user.Admin):
+                response = await self.repository.read_objects_with_equal("active_admin", True)
+            else:
+                response = await self.repository.read_objects_with_equal("type_", user.Type)
+
+            if (not response.success):
+                raise Exception(response.message)
+
+            response.response_list = [Membership.model_validate(item) for item in response.response_list]
+        except Exception as e:
+            response.message = str(e)
+
+        return response
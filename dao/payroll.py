@@ -1,11 +1,88 @@
-from repositories import FirestoreRepository
-from entities import Payroll, Response, StudentDebt, TutorPayout, AdminPayout
+from repositories import BaseRepository, create_repository
+from entities import Payroll, Response, StudentDebt, TutorPayout, AdminPayout, validate_models
 
 
 class PayrollDao():
+    #line items stored as payroll/{payroll_id}/{field}/{line_id} documents: field -> (model, line id field)
+    LINES = {
+        "students_debt": (StudentDebt, "student_id"),
+        "tutors_payout": (TutorPayout, "tutor_id")
+    }
+
     def __init__(self):
         self.collection = "payroll"
-        self.repository = FirestoreRepository(self.collection)
+        self.repository = create_repository(self.collection)
+
+    def _lines_repository(self, payroll_id: str, field: str) -> BaseRepository:
+        return create_repository(f"{self.collection}/{payroll_id}/{field}")
+
+    def _to_document(self, payroll: Payroll) -> dict:
+        """
+            The payroll summary document, the line items are saved apart with _save_lines
+        """
+        return {**payroll.model_dump(exclude={"id", *self.LINES}), **self._lines_summary(payroll)}
+
+    def _lines_summary(self, payroll: Payroll) -> dict:
+        return {
+            "students_debt": [],
+            "tutors_payout": [],
+            "lines_in_subcollections": True,
+            "students_debt_count": len(payroll.students_debt),
+            "tutors_payout_count": len(payroll.tutors_payout)
+        }
+
+    def _save_lines(self, payroll_id: str, field: str, lines: list, replace: bool = False) -> list:
+        """
+            Writes every line as its own document
+            Args:
+                payroll_id: the payroll id
+                field: students_debt or tutors_payout
+                lines: the line items, models or dicts
+                replace: deletes the saved lines that are not in lines
+            Returns:
+                the lines saved as dicts
+        """
+        model, line_id = self.LINES[field]
+        records = {}
+        for line in lines:
+            record = model.model_validate(line).model_dump()
+            records[record[line_id]] = record
+
+        repository = self._lines_repository(payroll_id, field)
+
+        if (replace):
+            saved_response = repository.read_collection()
+            if (not saved_response.success and not saved_response.message.startswith("no_records_found")):
+                raise Exception(saved_response.message)
+
+            removed = [
+                saved[line_id] for saved in saved_response.response_list if (saved[line_id] not in records)
+            ]
+            if (len(removed) > 0):
+                delete_response = repository.delete_objects_by_ids(removed)
+                if (not delete_response.success):
+                    raise Exception(delete_response.message)
+
+        write_response = repository.set_objects_by_ids(records)
+        if (not write_response.success):
+            raise Exception(write_response.message)
+
+        return list(records.values())
+
+    def _load_lines(self, record: dict) -> dict:
+        """
+            Adds the line items to a payroll summary document,
+            payrolls saved before the subcollections keep their embedded lists
+        """
+        if (record.get("lines_in_subcollections")):
+            for field in self.LINES:
+                lines_response = self._lines_repository(record["id"], field).read_collection()
+                if (not lines_response.success and not lines_response.message.startswith("no_records_found")):
+                    raise Exception(lines_response.message)
+
+                record[field] = validate_models(self.LINES[field][0], lines_response.response_list)
+
+        return record
 
     def create_payroll(self, payroll: Payroll) -> Response:
         """
@@ -18,10 +95,14 @@ class PayrollDao():
         response = Response()
 
         try:
-            create_response = self.repository.create_object(payroll.model_dump())
+            create_response = self.repository.create_object(self._to_document(payroll))
 
             if (create_response.success):
-                response.response = Payroll.model_validate(create_response.response)
+                payroll_id = create_response.response["id"]
+                response.response = Payroll.model_validate({
+                    **create_response.response,
+                    **{field: self._save_lines(payroll_id, field, getattr(payroll, field)) for field in self.LINES}
+                })
                 response.success = True
 
         except Exception as e:
@@ -42,7 +123,7 @@ class PayrollDao():
         try:
             response = self.repository.read_object_by_id(payroll_id)
             if (response.success):
-                response.response = Payroll.model_validate(response.response)
+                response.response = Payroll.model_validate(self._load_lines(response.response))
 
         except Exception as e:
             response.message = str(e)
@@ -64,7 +145,7 @@ class PayrollDao():
             response = self.repository.read_objects_with_equal("company_code", company_code)
             if (response.success):
                 response.response_list = [
-                    Payroll.model_validate(payroll)
+                    Payroll.model_validate(self._load_lines(payroll))
                     for payroll in response.response_list
                 ]
 
@@ -75,7 +156,7 @@ class PayrollDao():
 
     def update_payroll_student_debt(self, payroll_id: str, students_debt: list) -> Response:
         """
-            Sets a new student debt array for a payroll
+            Saves the students debt lines of a payroll
             Args:
                 payroll_id: the payroll id
                 students_debt: the new student debt list
@@ -85,12 +166,7 @@ class PayrollDao():
         response = Response()
 
         try:
-            response = self.repository.update_object_by_id(payroll_id, {
-                "students_debt": [
-                    StudentDebt.model_validate(student_debt).model_dump()
-                    for student_debt in students_debt
-                ]
-            })
+            response = self._update_lines(payroll_id, "students_debt", students_debt)
         except Exception as e:
             response.message = str(e)
 
@@ -98,7 +174,7 @@ class PayrollDao():
 
     def update_payroll_tutors_payout(self, payroll_id: str, tutors_payout: list) -> Response:
         """
-            Sets a new tutors payout array for a payroll
+            Saves the tutors payout lines of a payroll
             Args:
                 payroll_id:
                 tutors_payout:
@@ -108,12 +184,90 @@ class PayrollDao():
         response = Response()
 
         try:
-            response = self.repository.update_object_by_id(payroll_id, {
-                "tutors_payout": [
-                    TutorPayout.model_validate(payout).model_dump()
-                    for payout in tutors_payout
-                ]
-            })
+            response = self._update_lines(payroll_id, "tutors_payout", tutors_payout)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def _update_lines(self, payroll_id: str, field: str, lines: list) -> Response:
+        """
+            Saves the line items and returns the payroll summary document with them
+        """
+        response = self.repository.read_object_by_id(payroll_id)
+        if (not response.success):
+            return response
+
+        if (not response.response.get("lines_in_subcollections")):
+            migrate_response = self.migrate_payroll_lines(Payroll.model_validate({**response.response, field: lines}))
+            if (not migrate_response.success):
+                raise Exception(migrate_response.message)
+
+            response.response = migrate_response.response.model_dump()
+        else:
+            response.response[field] = self._save_lines(payroll_id, field, lines)
+
+        return response
+
+    def migrate_payroll_lines(self, payroll: Payroll) -> Response:
+        """
+            Moves the embedded students_debt and tutors_payout lists of a payroll to line documents
+            Args:
+                payroll: the payroll with its lines
+            Returns:
+                response.response: the payroll
+        """
+        response = Response()
+
+        try:
+            for field in self.LINES:
+                self._save_lines(payroll.id, field, getattr(payroll, field))
+
+            update_response = self.repository.update_object_by_id(payroll.id, self._lines_summary(payroll))
+            if (not update_response.success):
+                raise Exception(update_response.message)
+
+            payroll.lines_in_subcollections = True
+            response.response = payroll
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def update_student_debt_line(self, payroll_id: str, student_id: str, data: dict) -> Response:
+        """
+            Updates only the given fields of one student debt line
+            Args:
+                payroll_id: the payroll id
+                student_id: the student id of the line
+                data: the fields that changed, e.g. {"paid": True, "stripe_invoice_id": "in_..."}
+            Returns:
+                response:
+        """
+        response = Response()
+
+        try:
+            response = self._lines_repository(payroll_id, "students_debt").update_objects_by_ids({student_id: data})
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def update_tutor_payout_line(self, payroll_id: str, tutor_id: str, data: dict) -> Response:
+        """
+            Updates only the given fields of one tutor payout line
+            Args:
+                payroll_id: the payroll id
+                tutor_id: the tutor id of the line
+                data: the fields that changed, e.g. {"paid": True, "stripe_payout_id": "po_..."}
+            Returns:
+                response:
+        """
+        response = Response()
+
+        try:
+            response = self._lines_repository(payroll_id, "tutors_payout").update_objects_by_ids({tutor_id: data})
         except Exception as e:
             response.message = str(e)
 
@@ -174,7 +328,7 @@ class PayrollDao():
                 raise Exception(payroll_response.message)
 
             response.response_list = [
-                Payroll.model_validate(payroll)
+                Payroll.model_validate(self._load_lines(payroll))
                 for payroll in payroll_response.response_list if payroll["company_code"] == company_code
             ]
             response.success = True
@@ -194,8 +348,13 @@ class PayrollDao():
         response = Response()
 
         try:
-            del payroll.id
-            response = self.repository.update_object_by_id(payroll_id, payroll.model_dump())
+            #the lines are written first and the summary last, a failure in between leaves the previous summary
+            #and updating the payroll again writes the same lines
+            lines = {field: self._save_lines(payroll_id, field, getattr(payroll, field), True) for field in self.LINES}
+
+            response = self.repository.update_object_by_id(payroll_id, self._to_document(payroll))
+            if (response.success):
+                response.response.update(lines)
         except Exception as e:
             response.message = str(e)
 
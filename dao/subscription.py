@@ -1,14 +1,14 @@
 from entities import Response, Subscription, Membership, TutorUser, StudentUser
-from repositories import FirestoreRepository
+from repositories import create_repository, create_async_repository
 from datetime import datetime, timedelta
 from secrets import token_hex
-from typing import Union
+from typing import List, Union
 
 
 class SubscriptionsDao():
     def __init__(self) -> None:
         self.collection = "subscriptions"
-        self.repository = FirestoreRepository(self.collection)
+        self.repository = create_repository(self.collection)
 
     def create_subscription(self,
                             membership: Membership,
@@ -52,32 +52,91 @@ class SubscriptionsDao():
 
         return response
 
-    def update_subscription_by_id(self, subscription_id: str, quantity: int) -> Response:
+    def update_subscription_by_id(self, subscription_id: str, quantity: int, previous_quantity: int = None) -> Response:
         """
-            Update the subscription quantity
+            Update the subscription quantity, the change is appended to the prorate_data history in the same write
             Args:
                 subscription_id (str): a local subscription id
                 quantity (int): the new total amount of licences
+                previous_quantity (int): the amount of licences before the change, None to read it
             Returns:
                 response: a response object
         """
         response = Response()
 
         try:
-            current_subscription_response = self.read_active_subscription_by_id(subscription_id)
-            if (not current_subscription_response.success):
-                raise Exception(current_subscription_response.message)
-
-            current_subscription: Subscription = current_subscription_response.response
-            prorate_data = current_subscription.prorate_data
-            prorate_data.append({
-                "before": current_subscription.quantity,
-                "after": quantity
-            })
-            response = self.repository.update_object_by_id(subscription_id, {
-                "quantity": quantity,
-                "prorate_data": prorate_data
-            })
+            if (previous_quantity is None):
+                current_subscription_response = self.read_active_subscription_by_id(subscription_id)
+                if (not current_subscription_response.success):
+                    raise Exception(current_subscription_response.message)
+
+                previous_quantity = current_subscription_response.response.quantity
+
+            response = self.repository.append_history(
+                subscription_id,
+                "prorate_data",
+                [{
+                    "before": previous_quantity,
+                    "after": quantity,
+                    "date": datetime.now()
+                }],
+                data={"quantity": quantity}
+            )
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_prorate_data(self, subscription_id: str) -> Response:
+        """
+            Reads all the quantity changes of a subscription, the ones still inline in the record first
+            Args:
+                subscription_id: a local subscription id
+            Returns:
+                response: a response object
+                    response.response_list: the prorate_data entries, oldest first
+        """
+        response = Response()
+
+        try:
+            subscription_response = self.repository.read_object_by_id(subscription_id)
+            if (not subscription_response.success):
+                raise Exception(subscription_response.message)
+
+            history_response = self.repository.read_history(subscription_id, "prorate_data")
+            if (not history_response.success):
+                raise Exception(history_response.message)
+
+            response.response_list = [
+                *subscription_response.response.get("prorate_data", []),
+                *[entry for document in history_response.response_list for entry in document["entries"]]
+            ]
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def archive_prorate_data(self, subscription_id: str) -> Response:
+        """
+            Moves the prorate_data kept inline in a subscription record to its history
+            Args:
+                subscription_id: a local subscription id
+            Returns:
+                response: a response object
+                    response.response: True when there was something to move
+        """
+        response = Response()
+
+        try:
+            def plan(record: dict):
+                prorate_data = record.get("prorate_data") or []
+                if (len(prorate_data) == 0):
+                    return None
+
+                return {"entries": prorate_data}, {"prorate_data": []}
+
+            response = self.repository.move_to_history(subscription_id, "prorate_data", plan)
         except Exception as e:
             response.message = str(e)
 
@@ -108,6 +167,32 @@ class SubscriptionsDao():
 
         return response
 
+    def read_subscriptions_by_ids(self, subscription_ids: List[str]) -> Response:
+        """
+            Reads many subscriptions in one round trip
+            Args:
+                subscription_ids: local subscription ids
+            Returns:
+                response: a response object
+                    response.response: a dict {subscription_id: Subscription} with the subscriptions found
+        """
+        response = Response()
+
+        try:
+            read_response = self.repository.read_objects_by_ids(subscription_ids)
+            if (not read_response.success):
+                raise Exception(read_response.message)
+
+            response.response = {
+                subscription_id: Subscription.model_validate(record)
+                for (subscription_id, record) in read_response.response.items()
+            }
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
     def save_stripe_session_id(self, subscription_id: str, stripe_session_id: str) -> Response:
         """
             Saves the stripe session id in an active_session
@@ -259,3 +344,59 @@ class SubscriptionsDao():
             response.message = str(e)
 
         return response
+
+
+class AsyncSubscriptionsDao():
+    """
+        The SubscriptionsDao reads on an async repository, so the async request handlers can await them together
+    """
+
+    def __init__(self) -> None:
+        self.collection = "subscriptions"
+        self.repository = create_async_repository(self.collection)
+
+    async def read_active_subscription_by_id(self, subscription_id: str) -> Response:
+        """
+            Reads an active subscription from a subscription id
+            Args:
+                subscription_id: a local subscription id
+            Returns:
+                response: a response object
+                    response.response: a Subscription object
+        """
+        response = Response()
+
+        try:
+            subscription_response = await self.repository.read_object_by_id(subscription_id)
+            if (not subscription_response.success):
+                raise Exception(subscription_response.message)
+
+            response.success = True if (subscription_response.response != {}) else False
+            if (response.success):
+                response.response = Subscription.model_validate(subscription_response.response)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_active_subscription_by_customer_id(self, user_id: str) -> Response:
+        """
+            Reads an active subscription from a customer id
+            Args:
+                user_id(str): a local customer id
+            Returns:
+                response: a response object
+                    response.response_list: a list with Subscription objects
+        """
+        response = Response()
+
+        try:
+            response = await self.repository.read_objects_with_equal("local_user_id", user_id)
+            response.response_list = [Subscription.model_validate(item) for item in response.response_list if
+                                      item['status'] == "active"]
+            response.success = True if (len(response.response_list) > 0) else False
+            response.message = "" if (response.success) else "no_active_subscription"
+        except Exception as e:
+            response.message = str(e)
+
+        return response
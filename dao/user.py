@@ -1,12 +1,139 @@
-from repositories import FirestoreRepository
-from entities import Response, TutorUser, StudentUser
+from repositories import create_repository, create_async_repository
+from dao.identity_map import get_record, put_record, forget_records
+from dao.user_replica import read_company_users
+from entities import Response, TutorUser, StudentUser, PayrollTutor, PayrollStudent, validate_models
 from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+def parse_user(record: dict) -> dict:
+    """
+        Validates a user record
+        Returns:
+            {"type": the user type, "user": StudentUser for the students, TutorUser for the rest}
+    """
+    user_type = record['Type']
+    parsed_user = StudentUser.model_validate(record) if (user_type == "Student") else TutorUser.model_validate(record)
+
+    return {"type": user_type, "user": parsed_user}
+
+
+def parse_company_users(records: List[dict]) -> List[dict]:
+    """
+        Validates the users of a company, keeping their order
+        Returns:
+            a list of {"type": the user type, "user": TutorUser or StudentUser}
+    """
+    #validates the tutors and the students in one call each, then puts them back in order
+    tutors = iter(validate_models(TutorUser, [record for record in records if (record['Type'] == "Tutor")]))
+    students = iter(validate_models(StudentUser, [record for record in records if (record['Type'] != "Tutor")]))
+
+    return [
+        {
+            "type": record['Type'],
+            "user": next(tutors) if (record['Type'] == "Tutor") else next(students)
+        }
+        for record in records
+    ]
+
+
+def company_users_of_type(users: List[dict], user_type: str) -> list:
+    """
+        Picks the users of a type from parse_company_users, the admins are left out of students and individuals
+    """
+    return [
+        record["user"]
+        for record in users if
+        (record["type"] == user_type and (user_type == "Tutor" or not record["user"].Admin))
+    ]
+
+
+def records_of_type(records: List[dict], user_type: str = None) -> List[dict]:
+    """
+        Picks the user records of a type, all of them when user_type is None
+    """
+    return [record for record in records if (user_type is None or record['Type'] == user_type)]
+
+
+def admin_filters(company_code: str) -> List[tuple]:
+    """
+        The filters of the query that reads the admin of a company
+    """
+    return [("CompanyCode", "==", company_code), ("Admin", "==", True)]
+
+
+def parse_admin(admins_response: Response) -> dict:
+    """
+        Validates the admin read with admin_filters
+        Returns:
+            {"type": the admin type, "user": TutorUser for the tutors, StudentUser for the rest}
+    """
+    #a company without admin answers no_records_found, any other failure is the real error
+    if (not admins_response.success and not admins_response.message.startswith("no_records_found")):
+        raise Exception(admins_response.message)
+
+    if (len(admins_response.response_list) == 0):
+        raise Exception("admin_not_found")
+
+    record = admins_response.response_list[0]
+    user_type = record['Type']
+    parsed_user = TutorUser.model_validate(record) if (user_type == "Tutor") else StudentUser.model_validate(record)
+
+    return {"type": user_type, "user": parsed_user}
+
+
+class UserRecords():
+    """
+        The identity map and the company replica of the UserDao and AsyncUserDao reads, the two DAOs only differ
+        in the repository calls. It needs self.collection
+    """
+
+    def _cached_user(self, user_id: str) -> Optional[Response]:
+        #the same user is often read several times in one request, it's read from firestore once
+        record = get_record(self.collection, user_id)
+        return None if (record is None) else Response(response=record, success=True)
+
+    def _remember_user(self, user_id: str, read_response: Response) -> Response:
+        if (read_response.success):
+            put_record(self.collection, user_id, read_response.response)
+        return read_response
+
+    def _cached_users(self, user_ids: List[str]) -> Dict[str, Optional[dict]]:
+        return {user_id: get_record(self.collection, user_id) for user_id in user_ids}
+
+    def _remember_users(self, records: Dict[str, Optional[dict]], read_response: Response) -> Dict[str, dict]:
+        """
+            Adds the users read for the missing records of _cached_users
+            Returns:
+                {user_id: {type, user}} with the users found, in the order of the records
+        """
+        if (not read_response.success):
+            raise Exception(read_response.message)
+
+        for (user_id, record) in read_response.response.items():
+            put_record(self.collection, user_id, record)
+            records[user_id] = record
+
+        return {user_id: parse_user(record) for (user_id, record) in records.items() if (record is not None)}
 
+    def _replica_users(self, company_code: str, user_type: str = None) -> Optional[List[dict]]:
+        #the users of a warm company replica, None when the repository has to be read
+        replica = read_company_users(company_code)
+        if (replica is None):
+            return None
+        return replica.read_users() if (user_type is None) else replica.read_users_by_type(user_type)
+
+    def _replica_admin(self, company_code: str) -> Optional[Response]:
+        replica = read_company_users(company_code)
+        return None if (replica is None) else Response(response_list=replica.read_admins(), success=True)
+
+
+class UserDao(UserRecords):
+    PAGE_SIZE = 500
 
-class UserDao():
     def __init__(self) -> None:
         self.collection = "users"
-        self.repository = FirestoreRepository(self.collection)
+        self.repository = create_repository(self.collection)
 
     def read_user_by_id(self, user_id: str) -> Response:
         """
@@ -24,15 +151,37 @@ class UserDao():
         response = Response()
 
         try:
-            response = self.repository.read_object_by_id(user_id)
+            response = self._cached_user(user_id)
+            if (response is None):
+                response = self._remember_user(user_id, self.repository.read_object_by_id(user_id))
 
             if (response.success):
-                user_type = response.response['Type']
-                parsed_user = StudentUser.model_validate(response.response) if (
-                        user_type == "Student") else TutorUser.model_validate(response.response)
+                response.response = parse_user(response.response)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_users_by_ids(self, user_ids: List[str]) -> Response:
+        """
+            Reads many users in one round trip, the ones already read in the request are not read again
+            Args:
+                user_ids: local user ids
+            Returns:
+                response: a response object
+                    response.response: a dict {user_id: {type, user}} with the users found, in the order of user_ids
+        """
+        response = Response()
+
+        try:
+            records = self._cached_users(user_ids)
 
-                response.response = {"type": user_type, "user": parsed_user}
+            missing = [user_id for (user_id, record) in records.items() if (record is None)]
+            read_response = self.repository.read_objects_by_ids(missing) if (
+                    len(missing) > 0) else Response(response={}, success=True)
 
+            response.response = self._remember_users(records, read_response)
+            response.success = True
         except Exception as e:
             response.message = str(e)
 
@@ -51,6 +200,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [user_id])
             response = self.repository.update_object_by_id(user_id, {
                 "stripe_customer_id": stripe_customer_id
             })
@@ -72,6 +222,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [user_id])
             response = self.repository.update_object_by_id(user_id, {
                 "setup_intent_id": setup_intent_id
             })
@@ -92,6 +243,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [user_id])
             response = self.repository.update_object_by_id(user_id, {
                 "has_default_payment_method": has_default_payment_method
             })
@@ -113,6 +265,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [user_id])
             response = self.repository.update_object_by_id(user_id, {
                 "stripe_subaccount_id": stripe_sub_account_id
             })
@@ -121,11 +274,12 @@ class UserDao():
 
         return response
 
-    def read_all_users_by_company_code(self, company_code: str) -> Response:
+    def read_all_users_by_company_code(self, company_code: str, user_type: str = None) -> Response:
         """
-            Reads all the users under a company code
+            Reads all the users under a company code, from the company replica when it is warm
             Args:
                 company_code: the company code
+                user_type: only validate and return the users of this type, None for all of them
             Returns:
                 response: a response object
                     response.response_list: a list of dicts with all the users and theirs type (student, tutor)
@@ -137,22 +291,103 @@ class UserDao():
         response = Response()
 
         try:
-            response = self.repository.read_objects_with_equal("CompanyCode", company_code)
+            records = self._replica_users(company_code, user_type)
+            if (records is None):
+                response = self.repository.read_objects_with_equal("CompanyCode", company_code)
+                records = records_of_type(response.response_list, user_type)
 
-            response.response_list = [
-                {
-                    "type": record['Type'],
-                    "user": TutorUser.model_validate(record)
-                    if record['Type'] == "Tutor" else StudentUser.model_validate(record)
-                }
-                for record in response.response_list
-            ]
+            response.response_list = parse_company_users(records)
             response.success = True
         except Exception as e:
             response.message = str(e)
 
         return response
 
+    def read_admin_by_company_code(self, company_code: str) -> Response:
+        """
+            Reads the admin of a company with one query, without reading the other users
+            Args:
+                company_code: the company code
+            Returns:
+                response: a response object
+                    response.response:
+                    {
+                        type: the admin object type
+                        user: the admin object
+                    }
+        """
+        response = Response()
+
+        try:
+            admins_response = self._replica_admin(company_code)
+            if (admins_response is None):
+                admins_response = self.repository.read_objects_with_filters(admin_filters(company_code), limit=1)
+
+            response.response = parse_admin(admins_response)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def iterate_users_by_company_code(
+            self,
+            company_code: str,
+            user_type: str,
+            page_size: int = PAGE_SIZE,
+            payroll_fields: bool = False
+    ) -> Iterator[List]:
+        """
+            Reads the users of a type under a company code one page at a time, so only a page is in memory
+            Args:
+                company_code: the company code
+                user_type: Tutor, Student or Individual
+                page_size: the number of user documents read by query
+                payroll_fields: only read the fields the payroll uses, into PayrollTutor/PayrollStudent objects
+            Returns:
+                a generator of lists of TutorUser (Tutor) or StudentUser (Student, Individual) objects,
+                admins are left out of students and individuals like in read_students_by_company_code
+            Raises:
+                Exception: when a page can't be read
+        """
+        if (user_type == "Tutor"):
+            model = PayrollTutor if (payroll_fields) else TutorUser
+        else:
+            model = PayrollStudent if (payroll_fields) else StudentUser
+
+        def keep(record: dict) -> bool:
+            return record.get("Type") == user_type and (user_type == "Tutor" or not record.get("Admin", False))
+
+        replica = read_company_users(company_code)
+        if (replica is not None):
+            records = [record for record in replica.read_users_by_type(user_type) if (keep(record))]
+            for start in range(0, len(records), page_size):
+                yield validate_models(model, records[start:start + page_size])
+            return
+
+        fields = list(model.model_fields) if (payroll_fields) else None
+        start_after = None
+
+        while (True):
+            page_response = self.repository.read_objects_with_equal_page(
+                "CompanyCode",
+                company_code,
+                page_size,
+                start_after,
+                fields
+            )
+            if (not page_response.success):
+                raise Exception(page_response.message)
+
+            page = validate_models(model, [record for record in page_response.response_list if (keep(record))])
+
+            if (len(page) > 0):
+                yield page
+
+            start_after = page_response.response
+            if (start_after is None):
+                return
+
     def read_tutors_by_company_code(self, company_code: str) -> Response:
         """
             Reads all the tutors under a company code
@@ -165,14 +400,10 @@ class UserDao():
         response = Response()
 
         try:
-            users_in_company = self.read_all_users_by_company_code(company_code)
+            users_in_company = self.read_all_users_by_company_code(company_code, "Tutor")
 
             if (users_in_company.success):
-                response.response_list = [
-                    record["user"]
-                    for record in users_in_company.response_list if
-                    (record["type"] == "Tutor")
-                ]
+                response.response_list = company_users_of_type(users_in_company.response_list, "Tutor")
                 response.success = True
         except Exception as e:
             response.message = str(e)
@@ -191,14 +422,10 @@ class UserDao():
         response = Response()
 
         try:
-            users_in_company = self.read_all_users_by_company_code(company_code)
+            users_in_company = self.read_all_users_by_company_code(company_code, "Student")
 
             if (users_in_company.success):
-                response.response_list = [
-                    record["user"]
-                    for record in users_in_company.response_list if
-                    (record["type"] == "Student" and not record["user"].Admin)
-                ]
+                response.response_list = company_users_of_type(users_in_company.response_list, "Student")
                 response.success = True
 
         except Exception as e:
@@ -218,14 +445,10 @@ class UserDao():
         response = Response()
 
         try:
-            users_in_company = self.read_all_users_by_company_code(company_code)
+            users_in_company = self.read_all_users_by_company_code(company_code, "Individual")
 
             if (users_in_company.success):
-                response.response_list = [
-                    record["user"]
-                    for record in users_in_company.response_list if
-                    (record["type"] == "Individual" and not record["user"].Admin)
-                ]
+                response.response_list = company_users_of_type(users_in_company.response_list, "Individual")
                 response.success = True
 
         except Exception as e:
@@ -245,6 +468,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection)
             response = self.repository.massive_update_with_equal(
                 "CompanyCode",
                 company_code,
@@ -269,6 +493,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [tutor_id])
             response = self.repository.update_object_by_id(
                 tutor_id,
                 {
@@ -293,6 +518,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [tutor_id])
             response = self.repository.update_object_by_id(
                 tutor_id,
                 {
@@ -345,6 +571,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [admin_id])
             response = self.repository.update_object_by_id(
                 admin_id,
                 {
@@ -356,6 +583,27 @@ class UserDao():
 
         return response
 
+    def set_payroll_meeting_cursors(self, cursors: dict) -> Response:
+        """
+            Saves the index of the first meeting not billed yet of every student, so the next payroll
+            starts reading the meeting history from there
+            Args:
+                cursors: a dict {student_id: payroll_meeting_cursor}
+            Returns:
+                response.response: the number of students updated
+        """
+        response = Response()
+
+        try:
+            forget_records(self.collection, list(cursors))
+            response = self.repository.update_objects_by_ids({
+                student_id: {"payroll_meeting_cursor": cursor} for (student_id, cursor) in cursors.items()
+            })
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
     def set_tutor_pay_configuration(self, tutor_id: str, pay_amount: int, price_amount: int) -> Response:
         """
             Updates the tutor cost_per_session
@@ -370,6 +618,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [tutor_id])
             response = self.repository.update_object_by_id(
                 tutor_id,
                 {
@@ -384,7 +633,7 @@ class UserDao():
 
     def save_coupon_applied(self, user_id: str, coupon_id: str) -> Response:
         """
-            Saves an applied coupon record to a user
+            Saves an applied coupon record to a user, in the subscription_coupons_applied history
             Args:
                 user_id:
                 coupon_id:
@@ -393,28 +642,143 @@ class UserDao():
         response = Response()
 
         try:
-            user_response = self.read_user_by_id(user_id)
-            if (not user_response.success):
-                raise Exception(user_response.message)
-
-            user: TutorUser = user_response.response["user"]
-            previous_coupons = user.subscription_coupons_applied
-            previous_coupons.append({
+            update_response = self.repository.append_history(user_id, "subscription_coupons_applied", [{
                 "coupon_id": coupon_id,
                 "date": datetime.now()
-            })
-
-            update_response = self.repository.update_object_by_id(user_id, {
-                    "subscription_coupons_applied": previous_coupons
-                }
-            )
+            }])
 
             if (not update_response.success):
                 raise Exception(update_response.message)
 
             response.success = True
         except Exception as e:
-            response.message = e
+            response.message = str(e)
+
+        return response
+
+    def read_coupons_applied(self, user_id: str) -> Response:
+        """
+            Reads all the coupons applied to a user, the ones still inline in the record first
+            Args:
+                user_id: a local user id
+            Returns:
+                response: a response object
+                    response.response_list: the {coupon_id, date} entries, oldest first
+        """
+        response = Response()
+
+        try:
+            user_response = self.repository.read_object_by_id(user_id)
+            if (not user_response.success):
+                raise Exception(user_response.message)
+
+            history_response = self.repository.read_history(user_id, "subscription_coupons_applied")
+            if (not history_response.success):
+                raise Exception(history_response.message)
+
+            response.response_list = [
+                *user_response.response.get("subscription_coupons_applied", []),
+                *[entry for document in history_response.response_list for entry in document["entries"]]
+            ]
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def archive_coupons_applied(self, user_id: str) -> Response:
+        """
+            Moves the subscription_coupons_applied kept inline in a user record to its history
+            Args:
+                user_id: a local user id
+            Returns:
+                response: a response object
+                    response.response: True when there was something to move
+        """
+        response = Response()
+
+        try:
+            def plan(record: dict):
+                coupons = record.get("subscription_coupons_applied") or []
+                if (len(coupons) == 0):
+                    return None
+
+                return {"entries": coupons}, {"subscription_coupons_applied": []}
+
+            forget_records(self.collection, [user_id])
+            response = self.repository.move_to_history(user_id, "subscription_coupons_applied", plan)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def archive_billed_meetings(self, user_id: str) -> Response:
+        """
+            Moves the meetings already billed by a completed payroll, the ones before payroll_meeting_cursor,
+            to the meetings history. The cursor is moved back by the same amount, so it keeps pointing
+            to the first meeting not billed. It must not run while the company has a payroll not paid,
+            its lines point to positions of the meeting arrays
+            Args:
+                user_id: a local user id
+            Returns:
+                response: a response object
+                    response.response: True when there was something to move
+        """
+        response = Response()
+
+        try:
+            def plan(record: dict):
+                starts = record.get("HistMeetingTimes") or []
+                ends = record.get("HistMeetingTimesEnd") or []
+                cursor = record.get("payroll_meeting_cursor", 0)
+                billed = min(cursor, len(starts), len(ends))
+                if (billed <= 0):
+                    return None
+
+                return (
+                    {"HistMeetingTimes": starts[:billed], "HistMeetingTimesEnd": ends[:billed]},
+                    {
+                        "HistMeetingTimes": starts[billed:],
+                        "HistMeetingTimesEnd": ends[billed:],
+                        "payroll_meeting_cursor": cursor - billed
+                    }
+                )
+
+            forget_records(self.collection, [user_id])
+            response = self.repository.move_to_history(user_id, "meetings", plan)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_meeting_history(self, user_id: str) -> Response:
+        """
+            Reads all the meetings of a user, the archived ones and the ones still in the record
+            Args:
+                user_id: a local user id
+            Returns:
+                response: a response object
+                    response.response: {"HistMeetingTimes": [...], "HistMeetingTimesEnd": [...]}, oldest first
+        """
+        response = Response()
+
+        try:
+            user_response = self.repository.read_object_by_id(user_id)
+            if (not user_response.success):
+                raise Exception(user_response.message)
+
+            history_response = self.repository.read_history(user_id, "meetings")
+            if (not history_response.success):
+                raise Exception(history_response.message)
+
+            documents = [*history_response.response_list, user_response.response]
+            response.response = {
+                field: [date for document in documents for date in (document.get(field) or [])]
+                for field in ("HistMeetingTimes", "HistMeetingTimesEnd")
+            }
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
 
         return response
 
@@ -429,6 +793,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [user_id])
             response = self.repository.update_object_by_id(user_id, {
                 "has_pending_discount_coupon": True,
                 "pending_discount_coupon": coupon_id
@@ -448,6 +813,7 @@ class UserDao():
         response = Response()
 
         try:
+            forget_records(self.collection, [user_id])
             response = self.repository.update_object_by_id(user_id, {
                 "has_pending_discount_coupon": False,
                 "pending_discount_coupon": ""
@@ -456,3 +822,133 @@ class UserDao():
             response.message = e
 
         return response
+
+
+class AsyncUserDao(UserRecords):
+    """
+        The UserDao reads on an async repository, so the async request handlers can await them together
+    """
+
+    def __init__(self) -> None:
+        self.collection = "users"
+        self.repository = create_async_repository(self.collection)
+
+    async def read_user_by_id(self, user_id: str) -> Response:
+        """
+            Reads a local customer from the database, like UserDao.read_user_by_id
+            Args:
+                user_id (str): a local user id
+            Returns:
+                response: a response object
+                    response.response: {type, user}
+        """
+        response = Response()
+
+        try:
+            response = self._cached_user(user_id)
+            if (response is None):
+                response = self._remember_user(user_id, await self.repository.read_object_by_id(user_id))
+
+            if (response.success):
+                response.response = parse_user(response.response)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_users_by_ids(self, user_ids: List[str]) -> Response:
+        """
+            Reads many users in one round trip, like UserDao.read_users_by_ids
+            Args:
+                user_ids: local user ids
+            Returns:
+                response: a response object
+                    response.response: a dict {user_id: {type, user}} with the users found, in the order of user_ids
+        """
+        response = Response()
+
+        try:
+            records = self._cached_users(user_ids)
+
+            missing = [user_id for (user_id, record) in records.items() if (record is None)]
+            read_response = await self.repository.read_objects_by_ids(missing) if (
+                    len(missing) > 0) else Response(response={}, success=True)
+
+            response.response = self._remember_users(records, read_response)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_all_users_by_company_code(self, company_code: str, user_type: str = None) -> Response:
+        """
+            Reads all the users under a company code, from the company replica when it is warm
+            Args:
+                company_code: the company code
+                user_type: only validate and return the users of this type, None for all of them
+            Returns:
+                response: a response object
+                    response.response_list: a list of {type, user}
+        """
+        response = Response()
+
+        try:
+            records = self._replica_users(company_code, user_type)
+            if (records is None):
+                response = await self.repository.read_objects_with_equal("CompanyCode", company_code)
+                records = records_of_type(response.response_list, user_type)
+
+            response.response_list = parse_company_users(records)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_users_of_type_by_company_code(self, company_code: str, user_type: str) -> Response:
+        """
+            Reads the tutors, students or individuals under a company code, the admins are left out of
+            students and individuals like in UserDao.read_students_by_company_code
+            Args:
+                company_code: a company code
+                user_type: Tutor, Student or Individual
+            Returns:
+                response: a response object
+                    response.response_list: a list of TutorUser or StudentUser objects
+        """
+        response = Response()
+
+        try:
+            users_in_company = await self.read_all_users_by_company_code(company_code, user_type)
+
+            if (users_in_company.success):
+                response.response_list = company_users_of_type(users_in_company.response_list, user_type)
+                response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_admin_by_company_code(self, company_code: str) -> Response:
+        """
+            Reads the admin of a company with one query, like UserDao.read_admin_by_company_code
+            Args:
+                company_code: the company code
+            Returns:
+                response: a response object
+                    response.response: {type, user}
+        """
+        response = Response()
+
+        try:
+            admins_response = self._replica_admin(company_code)
+            if (admins_response is None):
+                admins_response = await self.repository.read_objects_with_filters(admin_filters(company_code), limit=1)
+
+            response.response = parse_admin(admins_response)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from os import environ
+from threading import Event, Lock
+import time
+from repositories import create_repository
+from typing import Dict, List, Optional
+
+#opt in, every worker process keeps a listener per company it serves
+REPLICA_ENABLED = environ.get("USER_REPLICA", "off") == "on"
+MAX_COMPANIES = int(environ.get("USER_REPLICA_MAX_COMPANIES", "200"))
+#a company not read for this long is dropped, so only the active companies keep a listener
+IDLE_SECONDS = float(environ.get("USER_REPLICA_IDLE_SECONDS", "3600"))
+
+
+class CompanyUsers():
+    """
+        The users of a company kept up to date by a listener, indexed by id, name, type and Admin.
+        The records are never modified in place, a change replaces the record
+    """
+
+    def __init__(self, company_code: str) -> None:
+        self.company_code = company_code
+        self.lock = Lock()
+        self.warm = Event()
+        self.watch = None
+        self.last_read = time.monotonic()
+        self.users: Dict[str, dict] = {}
+        self.by_name: Dict[str, set] = {}
+        self.by_type: Dict[str, set] = {}
+        self.admins = set()
+
+    def _index_sets(self, record: dict) -> List[set]:
+        sets = [self.by_name.setdefault(record.get("name"), set()), self.by_type.setdefault(record.get("Type"), set())]
+        if (record.get("Admin", False)):
+            sets.append(self.admins)
+        return sets
+
+    def apply(self, changed: List[dict], removed: List[str]):
+        """
+            Applies the changes sent by the listener, the first call has all the users and warms the replica
+        """
+        with self.lock:
+            for object_id in removed:
+                record = self.users.pop(object_id, None)
+                if (record is not None):
+                    for ids in self._index_sets(record):
+                        ids.discard(object_id)
+
+            for record in changed:
+                previous = self.users.get(record["id"])
+                if (previous is not None):
+                    for ids in self._index_sets(previous):
+                        ids.discard(record["id"])
+                self.users[record["id"]] = record
+                for ids in self._index_sets(record):
+                    ids.add(record["id"])
+
+        self.warm.set()
+
+    def _sorted(self, object_ids) -> List[dict]:
+        #ordered by id, like the firestore queries
+        return [self.users[object_id] for object_id in sorted(object_ids)]
+
+    def read_users(self) -> List[dict]:
+        with self.lock:
+            return self._sorted(self.users)
+
+    def read_users_by_type(self, user_type: str) -> List[dict]:
+        with self.lock:
+            return self._sorted(self.by_type.get(user_type, ()))
+
+    def read_users_by_name(self, name: str) -> List[dict]:
+        with self.lock:
+            return self._sorted(self.by_name.get(name, ()))
+
+    def read_admins(self) -> List[dict]:
+        with self.lock:
+            return self._sorted(self.admins)
+
+
+_replicas: "OrderedDict[str, CompanyUsers]" = OrderedDict()
+_replicas_lock = Lock()
+
+
+def _drop(company_code: str):
+    replica = _replicas.pop(company_code)
+    if (replica.watch is not None):
+        replica.watch.unsubscribe()
+
+
+def read_company_users(company_code: str) -> Optional[CompanyUsers]:
+    """
+        Returns the replica of the users of a company once it is warm. The first read of a company starts
+        its listener and returns None, the caller queries the database meanwhile
+        Args:
+            company_code: the company code
+        Returns:
+            the replica, None when it's disabled, not warm yet or its listener stopped
+    """
+    if (not REPLICA_ENABLED):
+        return None
+
+    now = time.monotonic()
+    with _replicas_lock:
+        replica = _replicas.get(company_code)
+        if (replica is not None and replica.watch is not None and not replica.watch.is_active):
+            _drop(company_code) # the listener failed, the next read starts a new one
+            replica = None
+
+        if (replica is None):
+            replica = _replicas[company_code] = CompanyUsers(company_code)
+            try:
+                replica.watch = create_repository("users").watch_objects_with_equal(
+                    "CompanyCode", company_code, replica.apply
+                )
+            except Exception:
+                _replicas.pop(company_code)
+                return None
+
+        replica.last_read = now
+        _replicas.move_to_end(company_code)
+
+        #the least recently read companies are dropped first
+        while (len(_replicas) > 1 and (
+                len(_replicas) > MAX_COMPANIES or now - next(iter(_replicas.values())).last_read > IDLE_SECONDS)):
+            _drop(next(iter(_replicas)))
+
+    return replica if (replica.warm.is_set()) else None
+
+
+def close_replicas():
+    """
+        Stops every listener, e.g. when the process shuts down
+    """
+    with _replicas_lock:
+        for company_code in list(_replicas):
+            _drop(company_code)
+
+
+def forget_replicas():
+    """
+        Drops the replicas of the parent process in a forked worker without stopping their listeners,
+        the listeners run in the parent
+    """
+    global _replicas_lock
+    _replicas_lock = Lock()
+    _replicas.clear()
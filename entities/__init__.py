@@ -4,8 +4,13 @@ from .local.StudentUser import StudentUser
 from .local.Membership import Membership
 from .local.Subscription import Subscription
 from .local.Payroll import Payroll, StudentDebt, TutorPayout, TutorNotFound, AdminPayout
+from .local.PayrollUser import PayrollStudent, PayrollTutor
+from .local.PayrollRecords import StudentDebtRecord, TutorPayoutRecord
 from .local.Coupon import Coupon
 
+#Validation helpers
+from .validation import list_adapter, validate_models
+
 #Response entities
 from .responses.Response import Response
 
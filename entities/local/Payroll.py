@@ -4,9 +4,13 @@ from datetime import datetime
 
 
 class StudentDebt(BaseModel):
-    start_hours: List[datetime]
-    end_hours: List[datetime]
+    meetings_first: int = 0 #billed meetings are HistMeetingTimes[meetings_first:meetings_last]
+    meetings_last: int = 0
+    meetings_count: int = 0
+    first_meeting: Optional[datetime] = None
+    last_meeting: Optional[datetime] = None
     hours: float
+    meeting_cursor: int = 0 #student payroll_meeting_cursor once this payroll is completed
     student_id: str
     student_name: str
     student_debt: int #cents
@@ -63,4 +67,7 @@ class Payroll(BaseModel):
     tutors_not_found: List[TutorNotFound] = []
     students_with_error: List = []
     error: str = ""
+    lines_in_subcollections: bool = False #students_debt and tutors_payout live in payroll/{id}/... documents
+    students_debt_count: int = 0
+    tutors_payout_count: int = 0
 
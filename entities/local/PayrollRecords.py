@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(slots=True)
+class StudentDebtRecord:
+    """
+        A StudentDebt line while the payroll is calculated, converted to StudentDebt when it's saved
+    """
+    hours: float
+    student_id: str
+    student_name: str
+    student_debt: float #cents
+    tutor_id: str
+    tutor_name: str
+    tutor_cost: int #cents
+    admin_profit: float #cents
+    pending_onboarding: bool
+    stripe_customer_id: str = ""
+    pending_coupon: Optional[str] = None
+    meetings_first: int = 0
+    meetings_last: int = 0
+    first_meeting: Optional[datetime] = None
+    last_meeting: Optional[datetime] = None
+    meeting_cursor: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            **{name: getattr(self, name) for name in self.__slots__},
+            "meetings_count": self.meetings_last - self.meetings_first
+        }
+
+
+@dataclass(slots=True)
+class TutorPayoutRecord:
+    """
+        A TutorPayout line while the payroll is calculated, the students hours are added to it
+    """
+    tutor_id: str
+    tutor_name: str
+    pending_onboarding: bool
+    stripe_sub_account_id: str = ""
+    tutor_payout: float = 0 #cents
+    tutor_total_hours: float = 0
+
+    def add(self, hours: float, payout: float):
+        self.tutor_total_hours += hours
+        self.tutor_payout += payout
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
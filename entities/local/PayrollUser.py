@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+
+
+class PayrollStudent(BaseModel):
+    """
+        The StudentUser fields the payroll reads, the user documents are read projected to them
+    """
+    id: str = ""
+    name: str = ""
+    Type: str = ""
+    Admin: bool = False
+    CompanyCode: str = ""
+    Tutor: str = ""
+    HistMeetingTimes: List[datetime] = []
+    HistMeetingTimesEnd: List[datetime] = []
+    payroll_meeting_cursor: int = 0
+    stripe_customer_id: str = ""
+    has_default_payment_method: bool = False
+    has_pending_discount_coupon: bool = False
+    pending_discount_coupon: str = ""
+
+
+class PayrollTutor(BaseModel):
+    """
+        The TutorUser fields the payroll reads, the user documents are read projected to them
+    """
+    id: str = ""
+    name: str = ""
+    Type: str = ""
+    Admin: bool = False
+    CompanyCode: str = ""
+    stripe_subaccount_id: str = ""
+    cost_per_session: int = 0 #cost in cents
+    pay_per_hour: int = 0 #pay in cents
@@ -42,6 +42,7 @@ class StudentUser(BaseModel):
     assignments: str = ""
     HistMeetingTimes: List[datetime] = []
     HistMeetingTimesEnd: List[datetime] = []
+    payroll_meeting_cursor: int = 0 #first meeting not billed by a completed payroll
     Tutor: str = ""
     Test: str = ""
     Improvement: str = ""
@@ -43,6 +43,6 @@ class TutorUser(BaseModel):
     cost_per_session: int = 0 #cost in cents
     pay_per_hour: int = 0 #pay in cents
     last_payout_date: Optional[datetime] = None
-    subscription_coupons_applied: list = []
+    #the coupons applied live in the users/{id}/subscription_coupons_applied history, see UserDao.read_coupons_applied
     has_pending_invoice_coupon: bool = False
     pending_invoice_coupon: str = ""
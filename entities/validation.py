@@ -0,0 +1,26 @@
+from functools import lru_cache
+from typing import List, Type, TypeVar
+from pydantic import BaseModel, TypeAdapter
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[Model]) -> TypeAdapter:
+    """
+        The list[model] validator, it is built once by model and reused
+    """
+    return TypeAdapter(List[model])
+
+
+def validate_models(model: Type[Model], records: list) -> List[Model]:
+    """
+        Validates many records in one call to the pydantic core
+        Args:
+            model: the pydantic model
+            records: a dict's list, e.g. the records read from firestore
+        Returns:
+            a list of model objects
+    """
+    return list_adapter(model).validate_python(records)
+
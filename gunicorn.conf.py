@@ -0,0 +1,67 @@
+"""
+    The gunicorn configuration, run "gunicorn -c gunicorn.conf.py".
+    GUNICORN_PROFILE picks the worker model, the workers and threads are sized from the CPU count and can be
+    set with GUNICORN_WORKERS and GUNICORN_THREADS.
+
+    sync: one request per worker, the Firestore and Stripe waits block the whole worker
+    gthread: a pool of threads per worker, the waits overlap (the default)
+    gevent: greenlets, thousands of waits per worker
+"""
+from multiprocessing import cpu_count
+from os import environ
+
+CPUS = cpu_count()
+
+PROFILES = {
+    "sync": {"worker_class": "sync", "workers": CPUS * 2 + 1, "threads": 1},
+    #the threads spend their time waiting on the network, so a worker per CPU keeps many of them busy
+    "gthread": {"worker_class": "gthread", "workers": CPUS + 1, "threads": 8},
+    "gevent": {"worker_class": "gevent", "workers": CPUS, "threads": 1},
+}
+
+profile = environ.get("GUNICORN_PROFILE", "gthread")
+if (profile not in PROFILES):
+    raise Exception("invalid_gunicorn_profile")
+
+wsgi_app = "app:create_app()"
+bind = environ.get("GUNICORN_BIND", "0.0.0.0:" + environ.get("PORT", "5000"))
+
+worker_class = PROFILES[profile]["worker_class"]
+workers = int(environ.get("GUNICORN_WORKERS", PROFILES[profile]["workers"]))
+threads = int(environ.get("GUNICORN_THREADS", PROFILES[profile]["threads"]))
+worker_connections = int(environ.get("GUNICORN_WORKER_CONNECTIONS", "1000"))
+
+#create_app and the heavy imports run once in the master, the workers share its memory.
+#gevent must patch the standard library before grpc and requests are imported, so its workers load the app
+preload_app = profile != "gevent"
+
+#the payroll stages of a large company take longer than the default 30 seconds
+timeout = int(environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+#a worker is replaced after this many requests, at a random point so they don't restart together
+max_requests = int(environ.get("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+#stdout by default, an empty value turns it off
+accesslog = environ.get("GUNICORN_ACCESS_LOG", "-") or None
+
+
+def post_fork(server, worker):
+    if (profile == "gevent"):
+        #grpc has to cooperate with the gevent loop, or a Firestore call blocks every greenlet of the worker
+        from grpc.experimental import gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+
+    if (preload_app):
+        from app import reinitialize_after_fork
+        reinitialize_after_fork()
+
+    #every worker warms its own clients, /health/ready answers 503 until it's done
+    from services import start_warmup
+    start_warmup()
+
+
+def worker_exit(server, worker):
+    from dao import close_replicas
+    close_replicas()
@@ -1,7 +1,10 @@
 from entities import Response, Product, StripeCustomer, SubAccount, Session, Coupon
 from utils.utils import dollars_to_cents
+from utils.lazy_import import lazy_import
 from os import environ
-import stripe
+
+#stripe takes most of the start up imports, it's imported by the first call
+stripe = lazy_import("stripe")
 
 
 class StripeInterface():
@@ -219,6 +222,24 @@ class StripeInterface():
 
         return response
 
+    def read_balance(self) -> Response:
+        """
+            Reads the balance of the stripe account, a cheap call e.g. to open the connection
+            Returns:
+                response: A response object
+                    response.response (dict): a stripe balance object
+        """
+        response = Response()
+
+        try:
+            balance_response = stripe.Balance.retrieve()
+            response.success = True if ("object" in balance_response) else False
+            response.response = balance_response
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
     def read_customer_by_email(self, customer_email: str) -> Response:
         """
             A function for read stripe customer information with an email
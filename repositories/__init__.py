@@ -1,2 +1,10 @@
 from .base_repository import BaseRepository
 from .firestore_repository import FirestoreRepository
+from .local_repository import LocalRepository
+from .memory_repository import InMemoryRepository
+from .sqlite_repository import SqliteRepository, forget_connections
+from .caching_repository import CachingRepository, AsyncCachingRepository, read_cache_stats, clear_caches
+from .async_base_repository import AsyncBaseRepository
+from .async_firestore_repository import AsyncFirestoreRepository
+from .async_repository_adapter import AsyncRepositoryAdapter
+from .factory import create_repository, create_async_repository
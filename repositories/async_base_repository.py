@@ -0,0 +1,144 @@
+from abc import ABC, abstractmethod
+from entities import Response
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class AsyncBaseRepository(ABC):
+    """
+        The BaseRepository contract for the async DAOs, every method but watch_objects_with_equal is a coroutine
+        with the same arguments and response as the BaseRepository one, see repositories/base_repository.py
+    """
+
+    def __init__(self, collection: str):
+        """
+            Args:
+                collection: the collection name to work with
+        """
+        self.collection = collection
+
+    @abstractmethod
+    async def create_object(self, data: dict) -> Response:
+        """
+            Create a new record with the data in the specified collection
+        """
+
+    @abstractmethod
+    async def read_collection(self) -> Response:
+        """
+            Reads all records from a collection
+        """
+
+    @abstractmethod
+    async def read_collection_page(self, page_size: int, start_after: str = None, fields: List[str] = None) -> Response:
+        """
+            Reads one page of all the records of the specified collection, ordered by id
+        """
+
+    @abstractmethod
+    async def read_object_by_id(self, object_id: str) -> Response:
+        """
+            Reads one record from the collection and id
+        """
+
+    @abstractmethod
+    async def read_objects_by_ids(self, object_ids: List[str]) -> Response:
+        """
+            Reads many records from the specified collection by id, in one round trip
+        """
+
+    @abstractmethod
+    async def read_documents(self, documents: List[Tuple[str, str]]) -> Response:
+        """
+            Reads records of any collection by id, in one round trip
+        """
+
+    @abstractmethod
+    async def read_objects_with_equal(self, field: str, value: Any, fields: List[str] = None) -> Response:
+        """
+            Reads the records from the specified collection when a field is equal to a value
+        """
+
+    @abstractmethod
+    def watch_objects_with_equal(self, field: str, value: Any, on_change: Callable[[List[dict], List[str]], None]):
+        """
+            Listens to the records of the specified collection when a field is equal to a value,
+            it's not a coroutine, on_change is called from the thread of the listener
+        """
+
+    @abstractmethod
+    async def read_objects_with_equal_page(
+            self,
+            field: str,
+            value: Any,
+            page_size: int,
+            start_after: str = None,
+            fields: List[str] = None
+    ) -> Response:
+        """
+            Reads one page of the records from the specified collection when a field is equal to a value
+        """
+
+    @abstractmethod
+    async def read_objects_with_filters(self, filters: List[tuple], limit: int = None, fields: List[str] = None) -> Response:
+        """
+            Reads the records from the specified collection that match all the filters
+        """
+
+    @abstractmethod
+    async def update_object_by_id(self, object_id: str, data: dict) -> Response:
+        """
+            Updates a record from the specified collection and id
+        """
+
+    @abstractmethod
+    async def update_objects_by_ids(self, updates: dict) -> Response:
+        """
+            Updates many records of the specified collection by id, in batches
+        """
+
+    @abstractmethod
+    async def set_objects_by_ids(self, records: dict, merge: bool = False) -> Response:
+        """
+            Writes many records of the specified collection by id, in batches
+        """
+
+    @abstractmethod
+    async def delete_objects_by_ids(self, object_ids: list) -> Response:
+        """
+            Deletes many records of the specified collection by id, in batches
+        """
+
+    @abstractmethod
+    async def append_history(self, object_id: str, history: str, entries: list, data: dict = None) -> Response:
+        """
+            Appends entries to the history of a record
+        """
+
+    @abstractmethod
+    async def read_history(self, object_id: str, history: str) -> Response:
+        """
+            Reads all the entries of the history of a record
+        """
+
+    @abstractmethod
+    async def move_to_history(
+            self,
+            object_id: str,
+            history: str,
+            plan: Callable[[dict], Optional[Tuple[dict, dict]]]
+    ) -> Response:
+        """
+            Moves data of a record to its history, the record is updated only if it didn't change since it was read
+        """
+
+    @abstractmethod
+    async def delete_object_by_id(self, object_id: str) -> Response:
+        """
+            Delete a record from the specified collection and id
+        """
+
+    @abstractmethod
+    async def massive_update_with_equal(self, field, value, field_to_update, value_to_update) -> Response:
+        """
+           Performs a massive update of field(field_to_update=value_to_update) with a condition(field==value)
+        """
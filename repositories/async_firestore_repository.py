@@ -0,0 +1,344 @@
+from .async_base_repository import AsyncBaseRepository
+from .firestore_queries import FirestoreQueries, base_query
+from entities import Response
+from typing import Any, Callable, List, Optional, Tuple
+from utils.lazy_import import lazy_import
+
+#firestore and grpc are imported by the first repository, see utils/lazy_import.py
+firestore_async = lazy_import("firebase_admin.firestore_async")
+exceptions = lazy_import("google.api_core.exceptions")
+
+
+class AsyncFirestoreRepository(FirestoreQueries, AsyncBaseRepository):
+    """
+        The AsyncBaseRepository on the firestore AsyncClient, every method is a coroutine with the same
+        arguments and responses as the FirestoreRepository one, the queries are built by FirestoreQueries.
+        Independent reads, of any collection, can be awaited together with asyncio.gather
+    """
+
+    def __init__(self, collection: str) -> None:
+        """
+            Param:
+                collection: a string with the collection name
+        """
+        super().__init__(collection)
+        self.db = firestore_async.client()
+
+    async def create_object(self, data: dict) -> Response:
+        """
+            Create a new record with the data in the specified collection
+        """
+        response = Response()
+
+        try:
+            reference = self.db.collection(self.collection).document()
+            data["id"] = reference.id
+            result = await reference.set(data)
+
+            response.success = True if (result.update_time) else False
+            if (response.success):
+                response.response = data
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_collection(self) -> Response:
+        """
+            Reads all records from the specified collection
+        """
+        response = Response()
+
+        try:
+            response = self._records_response([record async for record in self.db.collection(self.collection).stream()])
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_collection_page(self, page_size: int, start_after: str = None, fields: List[str] = None) -> Response:
+        """
+            Reads one page of all the records of the specified collection, ordered by id
+        """
+        response = Response()
+
+        try:
+            query = self._page_query(self.db.collection(self.collection), page_size, start_after, fields)
+            response = self._page_response([record async for record in query.stream()], page_size)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_object_by_id(self, object_id: str) -> Response:
+        """
+            Reads one record from the specified collection and id
+        """
+        response = Response()
+
+        try:
+            response = self._object_response(await self.db.collection(self.collection).document(object_id).get())
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_objects_by_ids(self, object_ids: List[str]) -> Response:
+        """
+            Reads many records from the specified collection by id, in one round trip
+        """
+        response = Response()
+
+        try:
+            response = self._objects_by_ids_response(
+                object_ids,
+                await self.read_documents([(self.collection, object_id) for object_id in object_ids])
+            )
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_documents(self, documents: List[Tuple[str, str]]) -> Response:
+        """
+            Reads records of any collection by id with a single get_all, in one round trip
+        """
+        response = Response()
+
+        try:
+            references = self._document_references(documents)
+            snapshots = [
+                snapshot async for snapshot in self.db.get_all([reference for (reference, _key) in references.values()])
+            ] if (len(references) > 0) else []
+
+            response = self._documents_response(references, snapshots)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_objects_with_equal(self, field: str, value: Any, fields: List[str] = None) -> Response:
+        """
+            Reads records from the specified collection when a field is equal to a value
+        """
+        response = Response()
+
+        try:
+            query = self._equal_query(field, value)
+
+            if (fields is not None):
+                query = query.select(self._projection(fields))
+
+            response = self._records_response([record async for record in query.stream()])
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_objects_with_equal_page(
+            self,
+            field: str,
+            value: Any,
+            page_size: int,
+            start_after: str = None,
+            fields: List[str] = None
+    ) -> Response:
+        """
+            Reads one page of the records from the specified collection when a field is equal to a value,
+            the records are ordered by id
+        """
+        response = Response()
+
+        try:
+            query = self._page_query(self._equal_query(field, value), page_size, start_after, fields)
+            response = self._page_response([record async for record in query.stream()], page_size)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_objects_with_filters(self, filters: List[tuple], limit: int = None, fields: List[str] = None) -> Response:
+        """
+            Reads the records from the specified collection that match all the filters
+        """
+        response = Response()
+
+        try:
+            query = self._filters_query(filters, limit, fields)
+            response = self._records_response([record async for record in query.stream()])
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def update_object_by_id(self, object_id: str, data: dict) -> Response:
+        """
+            Updates an existing record from the specified collection and id
+        """
+        response = Response()
+
+        try:
+            reference = self.db.collection(self.collection).document(object_id)
+            result = await reference.update(data)
+            record = await reference.get()
+
+            response.success = True if (result.update_time) else False
+            if (response.success):
+                response.response = record.to_dict()
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def update_objects_by_ids(self, updates: dict) -> Response:
+        """
+            Updates many existing records from the specified collection in batched writes
+        """
+        response = Response()
+
+        try:
+            items = list(updates.items())
+            for batch in self._batches(items, lambda batch, reference, data: batch.update(reference, data)):
+                await batch.commit()
+
+            response.response = len(items)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def set_objects_by_ids(self, records: dict, merge: bool = False) -> Response:
+        """
+            Creates or overwrites many records of the specified collection in batched writes
+        """
+        response = Response()
+
+        try:
+            items = list(records.items())
+            for batch in self._batches(items, lambda batch, reference, data: batch.set(reference, data, merge=merge)):
+                await batch.commit()
+
+            response.response = len(items)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def delete_objects_by_ids(self, object_ids: list) -> Response:
+        """
+            Deletes many records of the specified collection in batched writes
+        """
+        response = Response()
+
+        try:
+            items = [(object_id, None) for object_id in object_ids]
+            for batch in self._batches(items, lambda batch, reference, _data: batch.delete(reference)):
+                await batch.commit()
+
+            response.response = len(items)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def append_history(self, object_id: str, history: str, entries: list, data: dict = None) -> Response:
+        """
+            Appends entries to a history of a record, kept in the subcollection {collection}/{object_id}/{history}.
+            The history document and the record update are one batch
+        """
+        response = Response()
+
+        try:
+            await self._history_batch(object_id, history, entries, data).commit()
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def read_history(self, object_id: str, history: str) -> Response:
+        """
+            Reads the history documents of a record, oldest first
+        """
+        response = Response()
+
+        try:
+            reference = self.db.collection(self._history_path(object_id, history))
+            response.response_list = [record.to_dict() async for record in reference.order_by("__name__").stream()]
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def move_to_history(
+            self,
+            object_id: str,
+            history: str,
+            plan: Callable[[dict], Optional[Tuple[dict, dict]]]
+    ) -> Response:
+        """
+            Moves data of a record to its history. The record update has the read time as precondition,
+            when another write changed the record meanwhile it's read and planned again
+        """
+        response = Response()
+
+        try:
+            reference = self.db.collection(self.collection).document(object_id)
+
+            for attempt in range(self.MOVE_ATTEMPTS):
+                batch = self._move_batch(object_id, history, await reference.get(), plan)
+                if (batch is None):
+                    response.response = False
+                    break
+
+                try:
+                    await batch.commit()
+                except exceptions.FailedPrecondition:
+                    continue
+
+                response.response = True
+                break
+            else:
+                raise Exception("record_changed_while_moving_history")
+
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def delete_object_by_id(self, object_id: str) -> Response:
+        """
+            Delete a record from the specified collection and id
+        """
+        response = Response()
+
+        try:
+            result = await self.db.collection(self.collection).document(object_id).delete()
+            response.success = True if (result) else False
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    async def massive_update_with_equal(self, field, value, field_to_update, value_to_update) -> Response:
+        """
+            Performs a massive update of field(field_to_update=value_to_update) with a condition(field==value)
+        """
+        response = Response()
+
+        try:
+            reference = self.db.collection(self.collection)
+            query = reference.where(filter=base_query.FieldFilter(field, "==", value))
+            records = [record async for record in query.stream()]
+
+            await self._massive_update_batch(reference, records, field_to_update, value_to_update).commit()
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
@@ -0,0 +1,86 @@
+from .async_base_repository import AsyncBaseRepository
+from .base_repository import BaseRepository
+from entities import Response
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class AsyncRepositoryAdapter(AsyncBaseRepository):
+    """
+        Gives a sync repository the AsyncBaseRepository interface, for the local backends:
+        their calls don't wait on the network, so they run inline in the event loop
+    """
+
+    def __init__(self, repository: BaseRepository) -> None:
+        super().__init__(repository.collection)
+        self.repository = repository
+
+    #reads
+    async def read_collection(self) -> Response:
+        return self.repository.read_collection()
+
+    async def read_collection_page(self, page_size: int, start_after: str = None, fields: List[str] = None) -> Response:
+        return self.repository.read_collection_page(page_size, start_after, fields)
+
+    async def read_object_by_id(self, object_id: str) -> Response:
+        return self.repository.read_object_by_id(object_id)
+
+    async def read_objects_by_ids(self, object_ids: List[str]) -> Response:
+        return self.repository.read_objects_by_ids(object_ids)
+
+    async def read_documents(self, documents: List[Tuple[str, str]]) -> Response:
+        return self.repository.read_documents(documents)
+
+    async def read_objects_with_equal(self, field: str, value: Any, fields: List[str] = None) -> Response:
+        return self.repository.read_objects_with_equal(field, value, fields)
+
+    def watch_objects_with_equal(self, field: str, value: Any, on_change: Callable[[List[dict], List[str]], None]):
+        return self.repository.watch_objects_with_equal(field, value, on_change)
+
+    async def read_objects_with_equal_page(
+            self,
+            field: str,
+            value: Any,
+            page_size: int,
+            start_after: str = None,
+            fields: List[str] = None
+    ) -> Response:
+        return self.repository.read_objects_with_equal_page(field, value, page_size, start_after, fields)
+
+    async def read_objects_with_filters(self, filters: List[tuple], limit: int = None, fields: List[str] = None) -> Response:
+        return self.repository.read_objects_with_filters(filters, limit, fields)
+
+    async def read_history(self, object_id: str, history: str) -> Response:
+        return self.repository.read_history(object_id, history)
+
+    #writes
+    async def create_object(self, data: dict) -> Response:
+        return self.repository.create_object(data)
+
+    async def update_object_by_id(self, object_id: str, data: dict) -> Response:
+        return self.repository.update_object_by_id(object_id, data)
+
+    async def update_objects_by_ids(self, updates: dict) -> Response:
+        return self.repository.update_objects_by_ids(updates)
+
+    async def set_objects_by_ids(self, records: dict, merge: bool = False) -> Response:
+        return self.repository.set_objects_by_ids(records, merge)
+
+    async def delete_objects_by_ids(self, object_ids: list) -> Response:
+        return self.repository.delete_objects_by_ids(object_ids)
+
+    async def append_history(self, object_id: str, history: str, entries: list, data: dict = None) -> Response:
+        return self.repository.append_history(object_id, history, entries, data)
+
+    async def move_to_history(
+            self,
+            object_id: str,
+            history: str,
+            plan: Callable[[dict], Optional[Tuple[dict, dict]]]
+    ) -> Response:
+        return self.repository.move_to_history(object_id, history, plan)
+
+    async def delete_object_by_id(self, object_id: str) -> Response:
+        return self.repository.delete_object_by_id(object_id)
+
+    async def massive_update_with_equal(self, field, value, field_to_update, value_to_update) -> Response:
+        return self.repository.massive_update_with_equal(field, value, field_to_update, value_to_update)
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from entities import Response
-from typing import Any
+from typing import Any, Callable, List, Optional, Tuple
 
 
 class BaseRepository(ABC):
@@ -33,6 +33,20 @@ class BaseRepository(ABC):
                     response.response_list (list): a dict's list with all the record found in the specified collection
         """
 
+    @abstractmethod
+    def read_collection_page(self, page_size: int, start_after: str = None, fields: List[str] = None) -> Response:
+        """
+            Reads one page of all the records of the specified collection, ordered by id
+            Args:
+                page_size(int): the max number of records in the page
+                start_after(str): the id of the last record of the previous page, None for the first page
+                fields(list): only read these fields of the records, None to read them complete
+            Returns:
+                response: a response object
+                    response.response_list (list): a dict's list with the records of the page
+                    response.response (str): the cursor for the next page, None when this is the last page
+        """
+
     @abstractmethod
     def read_object_by_id(self, object_id: str) -> Response:
         """
@@ -45,17 +59,92 @@ class BaseRepository(ABC):
         """
 
     @abstractmethod
-    def read_objects_with_equal(self, field: str, value: Any) -> Response:
+    def read_objects_by_ids(self, object_ids: List[str]) -> Response:
+        """
+            Reads many records from the specified collection by id, in one round trip
+            Args:
+                object_ids(list): the records ids
+            Returns:
+                response: a response object
+                    response.response (dict): {id: record} with the records found
+                    response.response_list (list): the records found, in the order of object_ids,
+                        success is True even when some ids don't exist
+        """
+
+    @abstractmethod
+    def read_documents(self, documents: List[Tuple[str, str]]) -> Response:
+        """
+            Reads records of any collection by id, in one round trip
+            Args:
+                documents(list): (collection, id) tuples
+            Returns:
+                response: a response object
+                    response.response (dict): {(collection, id): record} with the records found
+        """
+
+    @abstractmethod
+    def read_objects_with_equal(self, field: str, value: Any, fields: List[str] = None) -> Response:
         """
             Reads records from the specified collection when a field is equal to a value
             Args:
                 field(str): a string with the field
                 value(str): a string with the value to be equal
+                fields(list): only read these fields of the records, None to read them complete
             Returns:
                 response: a response object
                     response.response_list (list): a dict's list with all the records found in the specified collection
         """
 
+    @abstractmethod
+    def watch_objects_with_equal(self, field: str, value: Any, on_change: Callable[[List[dict], List[str]], None]):
+        """
+            Listens to the records of the specified collection when a field is equal to a value.
+            on_change is called with all the records first, then with the records changed after each write
+            Args:
+                field(str): a string with the field
+                value(str): a string with the value to be equal
+                on_change: receives the records added or modified and the ids of the records removed
+            Returns:
+                a watch, watch.unsubscribe() stops it and watch.is_active is False once it stopped
+        """
+
+    @abstractmethod
+    def read_objects_with_equal_page(
+            self,
+            field: str,
+            value: Any,
+            page_size: int,
+            start_after: str = None,
+            fields: List[str] = None
+    ) -> Response:
+        """
+            Reads one page of the records from the specified collection when a field is equal to a value,
+            the records are ordered by id
+            Args:
+                field(str): a string with the field
+                value: a value with the value to be equal
+                page_size(int): the max number of records in the page
+                start_after(str): the id of the last record of the previous page, None for the first page
+                fields(list): only read these fields of the records, None to read them complete
+            Returns:
+                response: a response object
+                    response.response_list (list): a dict's list with the records of the page
+                    response.response (str): the cursor for the next page, None when this is the last page
+        """
+
+    @abstractmethod
+    def read_objects_with_filters(self, filters: List[tuple], limit: int = None, fields: List[str] = None) -> Response:
+        """
+            Reads the records from the specified collection that match all the filters
+            Args:
+                filters(list): (field, operator, value) tuples, e.g. ("Admin", "==", True)
+                limit(int): the max number of records, None to read all of them
+                fields(list): only read these fields of the records, None to read them complete
+            Returns:
+                response: a response object
+                    response.response_list (list): a dict's list with the records found
+        """
+
     @abstractmethod
     def update_object_by_id(self, object_id: str, data: dict) -> Response:
         """
@@ -68,6 +157,85 @@ class BaseRepository(ABC):
                     response.response (dict):  a dict with the record updated in the database
         """
 
+    @abstractmethod
+    def update_objects_by_ids(self, updates: dict) -> Response:
+        """
+            Updates many existing records from the specified collection in batched writes
+            Args:
+                updates (dict): a dictionary {object_id: {fields to update}}
+            Returns:
+                response: a response object
+                    response.response (int): the number of records updated
+        """
+
+    @abstractmethod
+    def set_objects_by_ids(self, records: dict, merge: bool = False) -> Response:
+        """
+            Creates or overwrites many records of the specified collection in batched writes
+            Args:
+                records (dict): a dictionary {object_id: record}
+                merge (bool): merge the fields with the existing records instead of overwriting them
+            Returns:
+                response: a response object
+                    response.response (int): the number of records written
+        """
+
+    @abstractmethod
+    def delete_objects_by_ids(self, object_ids: list) -> Response:
+        """
+            Deletes many records of the specified collection in batched writes
+            Args:
+                object_ids (list): the ids to delete
+            Returns:
+                response: a response object
+                    response.response (int): the number of records deleted
+        """
+
+    @abstractmethod
+    def append_history(self, object_id: str, history: str, entries: list, data: dict = None) -> Response:
+        """
+            Appends entries to a history of a record, kept in the subcollection {collection}/{object_id}/{history}
+            so the record itself doesn't grow
+            Args:
+                object_id(str): the record id
+                history(str): the history name, e.g. prorate_data
+                entries(list): the entries to append, they are saved together in one history document
+                data(dict): fields of the record to update in the same write, None to only append
+            Returns:
+                response: a response object
+        """
+
+    @abstractmethod
+    def read_history(self, object_id: str, history: str) -> Response:
+        """
+            Reads the history documents of a record, oldest first
+            Args:
+                object_id(str): the record id
+                history(str): the history name
+            Returns:
+                response: a response object
+                    response.response_list (list): a dict's list with the history documents
+        """
+
+    @abstractmethod
+    def move_to_history(
+            self,
+            object_id: str,
+            history: str,
+            plan: Callable[[dict], Optional[Tuple[dict, dict]]]
+    ) -> Response:
+        """
+            Moves data of a record to its history, the record is updated only if it didn't change since it was read
+            Args:
+                object_id(str): the record id
+                history(str): the history name
+                plan: a function that receives the record and returns (history document, record update),
+                    or None when there is nothing to move
+            Returns:
+                response: a response object
+                    response.response (bool): True when something was moved
+        """
+
     @abstractmethod
     def delete_object_by_id(self, object_id: str) -> Response:
         """
@@ -0,0 +1,390 @@
+from . import BaseRepository
+from .async_base_repository import AsyncBaseRepository
+from cachetools import TTLCache
+from copy import deepcopy
+from threading import Lock
+from entities import Response
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+#ttl in seconds, maxsize in records. The memberships and coupons rarely change, the users change often and
+#the payroll is read and written by the same flow, so it's not cached
+CACHE_POLICIES = {
+    "memberships": {"ttl": 3600, "maxsize": 1000},
+    "coupons": {"ttl": 3600, "maxsize": 5000},
+    "users": {"ttl": 30, "maxsize": 10000},
+    "payroll": None,
+}
+
+
+def _records_size(value) -> int:
+    #a query result weighs as many records as it has, so a large company can't grow the cache past maxsize
+    return max(len(value), 1) if (isinstance(value, list)) else 1
+
+
+class _CollectionCache():
+    """
+        The cached records and query results of a collection, shared by all its repositories in the process
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.lock = Lock()
+        self.records = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.queries = TTLCache(maxsize=maxsize, ttl=ttl, getsizeof=_records_size)
+        #changes on every write, a read that started before a write doesn't store its result
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, entries: TTLCache, key: Any) -> Tuple[Optional[Response], int]:
+        """
+            Returns:
+                (the cached response or None on a miss, the generation to store the read with)
+        """
+        with self.lock:
+            cached = entries.get(key)
+            if (cached is not None):
+                self.hits += 1
+            else:
+                self.misses += 1
+            generation = self.generation
+
+        if (cached is None):
+            return (None, generation)
+
+        response = Response()
+        response.success = True
+        if (isinstance(cached, list)):
+            response.response_list = deepcopy(cached)
+        else:
+            response.response = deepcopy(cached)
+        return (response, generation)
+
+    def store(self, entries: TTLCache, key: Any, generation: int, value: Any):
+        with self.lock:
+            if (generation == self.generation):
+                try:
+                    entries[key] = deepcopy(value)
+                except ValueError:
+                    pass # bigger than the whole cache
+
+    def invalidate(self, object_ids: Optional[list] = None):
+        """
+            Forgets the records written, all of them when object_ids is None. Any write can change the result
+            of a query, so the query results are always forgotten
+        """
+        with self.lock:
+            self.generation += 1
+            self.queries.clear()
+            if (object_ids is None):
+                self.records.clear()
+            else:
+                for object_id in object_ids:
+                    self.records.pop(object_id, None)
+
+
+def _query_key(field: str, value: Any, fields: Optional[List[str]]) -> Optional[tuple]:
+    #None when the value can't be a cache key, e.g. a list
+    key = (field, value, tuple(fields) if (fields is not None) else None)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+_caches: Dict[str, _CollectionCache] = {}
+_caches_lock = Lock()
+
+
+def _collection_cache(collection: str, policy: dict) -> _CollectionCache:
+    with _caches_lock:
+        if (collection not in _caches):
+            _caches[collection] = _CollectionCache(policy["ttl"], policy["maxsize"])
+        return _caches[collection]
+
+
+def read_cache_stats() -> dict:
+    """
+        Reads the hit rates of the cached collections of the process
+        Returns:
+            {collection: {"hits", "misses", "hit_rate", "records", "queries"}}
+    """
+    stats = {}
+    with _caches_lock:
+        for (collection, cache) in _caches.items():
+            with cache.lock:
+                total = cache.hits + cache.misses
+                stats[collection] = {
+                    "hits": cache.hits,
+                    "misses": cache.misses,
+                    "hit_rate": round(cache.hits / total, 4) if (total > 0) else 0.0,
+                    "records": len(cache.records),
+                    "queries": len(cache.queries),
+                }
+    return stats
+
+
+def clear_caches():
+    """
+        Drops the cached records and the stats of every collection
+    """
+    with _caches_lock:
+        _caches.clear()
+
+
+class CachingRepository(BaseRepository):
+    """
+        Wraps a repository with a read-through cache of read_object_by_id and read_objects_with_equal.
+        The writes made through any CachingRepository of the collection invalidate the cache of the process,
+        the writes made by other processes or clients are seen when the entries expire
+    """
+
+    def __init__(self, repository: BaseRepository, policy: dict) -> None:
+        super().__init__(repository.collection)
+        self.repository = repository
+        self.cache = _collection_cache(repository.collection, policy)
+
+    def _read_through(self, entries: TTLCache, key: Any, read: Callable[[], Response], value: Callable) -> Response:
+        (cached, generation) = self.cache.lookup(entries, key)
+        if (cached is not None):
+            return cached
+
+        response = read()
+        if (response.success):
+            self.cache.store(entries, key, generation, value(response))
+
+        return response
+
+    def _invalidate(self, object_ids: Optional[list] = None):
+        self.cache.invalidate(object_ids)
+
+    #reads
+    def read_object_by_id(self, object_id: str) -> Response:
+        return self._read_through(
+            self.cache.records,
+            object_id,
+            lambda: self.repository.read_object_by_id(object_id),
+            lambda response: response.response
+        )
+
+    def read_objects_with_equal(self, field: str, value: Any, fields: List[str] = None) -> Response:
+        key = _query_key(field, value, fields)
+        if (key is None):
+            return self.repository.read_objects_with_equal(field, value, fields)
+
+        return self._read_through(
+            self.cache.queries,
+            key,
+            lambda: self.repository.read_objects_with_equal(field, value, fields),
+            lambda response: response.response_list
+        )
+
+    def read_collection(self) -> Response:
+        return self.repository.read_collection()
+
+    def read_collection_page(self, page_size: int, start_after: str = None, fields: List[str] = None) -> Response:
+        return self.repository.read_collection_page(page_size, start_after, fields)
+
+    def read_objects_by_ids(self, object_ids: List[str]) -> Response:
+        return self.repository.read_objects_by_ids(object_ids)
+
+    def read_documents(self, documents: List[Tuple[str, str]]) -> Response:
+        return self.repository.read_documents(documents)
+
+    def watch_objects_with_equal(self, field: str, value: Any, on_change: Callable[[List[dict], List[str]], None]):
+        return self.repository.watch_objects_with_equal(field, value, on_change)
+
+    def read_objects_with_equal_page(
+            self,
+            field: str,
+            value: Any,
+            page_size: int,
+            start_after: str = None,
+            fields: List[str] = None
+    ) -> Response:
+        return self.repository.read_objects_with_equal_page(field, value, page_size, start_after, fields)
+
+    def read_objects_with_filters(self, filters: List[tuple], limit: int = None, fields: List[str] = None) -> Response:
+        return self.repository.read_objects_with_filters(filters, limit, fields)
+
+    def read_history(self, object_id: str, history: str) -> Response:
+        return self.repository.read_history(object_id, history)
+
+    #writes
+    def create_object(self, data: dict) -> Response:
+        response = self.repository.create_object(data)
+        self._invalidate([])
+        return response
+
+    def update_object_by_id(self, object_id: str, data: dict) -> Response:
+        response = self.repository.update_object_by_id(object_id, data)
+        self._invalidate([object_id])
+        return response
+
+    def update_objects_by_ids(self, updates: dict) -> Response:
+        response = self.repository.update_objects_by_ids(updates)
+        self._invalidate(list(updates))
+        return response
+
+    def set_objects_by_ids(self, records: dict, merge: bool = False) -> Response:
+        response = self.repository.set_objects_by_ids(records, merge)
+        self._invalidate(list(records))
+        return response
+
+    def delete_objects_by_ids(self, object_ids: list) -> Response:
+        response = self.repository.delete_objects_by_ids(object_ids)
+        self._invalidate(list(object_ids))
+        return response
+
+    def append_history(self, object_id: str, history: str, entries: list, data: dict = None) -> Response:
+        response = self.repository.append_history(object_id, history, entries, data)
+        if (data):
+            self._invalidate([object_id])
+        return response
+
+    def move_to_history(
+            self,
+            object_id: str,
+            history: str,
+            plan: Callable[[dict], Optional[Tuple[dict, dict]]]
+    ) -> Response:
+        response = self.repository.move_to_history(object_id, history, plan)
+        self._invalidate([object_id])
+        return response
+
+    def delete_object_by_id(self, object_id: str) -> Response:
+        response = self.repository.delete_object_by_id(object_id)
+        self._invalidate([object_id])
+        return response
+
+    def massive_update_with_equal(self, field, value, field_to_update, value_to_update) -> Response:
+        response = self.repository.massive_update_with_equal(field, value, field_to_update, value_to_update)
+        self._invalidate()
+        return response
+
+
+class AsyncCachingRepository(AsyncBaseRepository):
+    """
+        The CachingRepository of the async repositories, it shares the cache of the collection with the sync
+        ones, so a write through either of them invalidates the reads of both
+    """
+
+    def __init__(self, repository: AsyncBaseRepository, policy: dict) -> None:
+        super().__init__(repository.collection)
+        self.repository = repository
+        self.cache = _collection_cache(repository.collection, policy)
+
+    async def _read_through(self, entries: TTLCache, key: Any, read: Callable[[], Awaitable[Response]], value: Callable) -> Response:
+        (cached, generation) = self.cache.lookup(entries, key)
+        if (cached is not None):
+            return cached
+
+        response = await read()
+        if (response.success):
+            self.cache.store(entries, key, generation, value(response))
+
+        return response
+
+    #reads
+    async def read_object_by_id(self, object_id: str) -> Response:
+        return await self._read_through(
+            self.cache.records,
+            object_id,
+            lambda: self.repository.read_object_by_id(object_id),
+            lambda response: response.response
+        )
+
+    async def read_objects_with_equal(self, field: str, value: Any, fields: List[str] = None) -> Response:
+        key = _query_key(field, value, fields)
+        if (key is None):
+            return await self.repository.read_objects_with_equal(field, value, fields)
+
+        return await self._read_through(
+            self.cache.queries,
+            key,
+            lambda: self.repository.read_objects_with_equal(field, value, fields),
+            lambda response: response.response_list
+        )
+
+    async def read_collection(self) -> Response:
+        return await self.repository.read_collection()
+
+    async def read_collection_page(self, page_size: int, start_after: str = None, fields: List[str] = None) -> Response:
+        return await self.repository.read_collection_page(page_size, start_after, fields)
+
+    async def read_objects_by_ids(self, object_ids: List[str]) -> Response:
+        return await self.repository.read_objects_by_ids(object_ids)
+
+    async def read_documents(self, documents: List[Tuple[str, str]]) -> Response:
+        return await self.repository.read_documents(documents)
+
+    def watch_objects_with_equal(self, field: str, value: Any, on_change: Callable[[List[dict], List[str]], None]):
+        return self.repository.watch_objects_with_equal(field, value, on_change)
+
+    async def read_objects_with_equal_page(
+            self,
+            field: str,
+            value: Any,
+            page_size: int,
+            start_after: str = None,
+            fields: List[str] = None
+    ) -> Response:
+        return await self.repository.read_objects_with_equal_page(field, value, page_size, start_after, fields)
+
+    async def read_objects_with_filters(self, filters: List[tuple], limit: int = None, fields: List[str] = None) -> Response:
+        return await self.repository.read_objects_with_filters(filters, limit, fields)
+
+    async def read_history(self, object_id: str, history: str) -> Response:
+        return await self.repository.read_history(object_id, history)
+
+    #writes
+    async def create_object(self, data: dict) -> Response:
+        response = await self.repository.create_object(data)
+        self.cache.invalidate([])
+        return response
+
+    async def update_object_by_id(self, object_id: str, data: dict) -> Response:
+        response = await self.repository.update_object_by_id(object_id, data)
+        self.cache.invalidate([object_id])
+        return response
+
+    async def update_objects_by_ids(self, updates: dict) -> Response:
+        response = await self.repository.update_objects_by_ids(updates)
+        self.cache.invalidate(list(updates))
+        return response
+
+    async def set_objects_by_ids(self, records: dict, merge: bool = False) -> Response:
+        response = await self.repository.set_objects_by_ids(records, merge)
+        self.cache.invalidate(list(records))
+        return response
+
+    async def delete_objects_by_ids(self, object_ids: list) -> Response:
+        response = await self.repository.delete_objects_by_ids(object_ids)
+        self.cache.invalidate(list(object_ids))
+        return response
+
+    async def append_history(self, object_id: str, history: str, entries: list, data: dict = None) -> Response:
+        response = await self.repository.append_history(object_id, history, entries, data)
+        if (data):
+            self.cache.invalidate([object_id])
+        return response
+
+    async def move_to_history(
+            self,
+            object_id: str,
+            history: str,
+            plan: Callable[[dict], Optional[Tuple[dict, dict]]]
+    ) -> Response:
+        response = await self.repository.move_to_history(object_id, history, plan)
+        self.cache.invalidate([object_id])
+        return response
+
+    async def delete_object_by_id(self, object_id: str) -> Response:
+        response = await self.repository.delete_object_by_id(object_id)
+        self.cache.invalidate([object_id])
+        return response
+
+    async def massive_update_with_equal(self, field, value, field_to_update, value_to_update) -> Response:
+        response = await self.repository.massive_update_with_equal(field, value, field_to_update, value_to_update)
+        self.cache.invalidate()
+        return response
@@ -0,0 +1,67 @@
+from os import environ
+from typing import Optional
+from .async_base_repository import AsyncBaseRepository
+from .async_firestore_repository import AsyncFirestoreRepository
+from .async_repository_adapter import AsyncRepositoryAdapter
+from .base_repository import BaseRepository
+from .caching_repository import CACHE_POLICIES, AsyncCachingRepository, CachingRepository
+from .firestore_repository import FirestoreRepository
+from .memory_repository import InMemoryRepository
+from .sqlite_repository import SqliteRepository
+
+REPOSITORY_BACKENDS = {
+    "firestore": FirestoreRepository,
+    "memory": InMemoryRepository,
+    "sqlite": SqliteRepository,
+}
+
+
+def _cache_policy(collection: str) -> Optional[dict]:
+    #the policy of the collection when it's listed in REPOSITORY_CACHE, e.g. "memberships,coupons"
+    cached_collections = [name.strip() for name in environ.get("REPOSITORY_CACHE", "").split(",")]
+    return CACHE_POLICIES.get(collection) if (collection in cached_collections) else None
+
+
+def create_repository(collection: str) -> BaseRepository:
+    """
+        Creates the repository of a collection with the backend set in REPOSITORY_BACKEND, firestore by default.
+        The collections listed in REPOSITORY_CACHE, e.g. "memberships,coupons", are wrapped with a CachingRepository
+        Args:
+            collection: the collection path
+        Returns:
+            the repository
+    """
+    backend = environ.get("REPOSITORY_BACKEND", "firestore")
+    if (backend not in REPOSITORY_BACKENDS):
+        raise Exception("invalid_repository_backend")
+
+    repository = REPOSITORY_BACKENDS[backend](collection)
+
+    policy = _cache_policy(collection)
+    if (policy is not None):
+        repository = CachingRepository(repository, policy)
+
+    return repository
+
+
+def create_async_repository(collection: str) -> AsyncBaseRepository:
+    """
+        Creates the async repository of a collection with the backend set in REPOSITORY_BACKEND.
+        The local backends are adapted from their sync repositories. The collections listed in REPOSITORY_CACHE
+        share the cache of their sync repositories
+        Args:
+            collection: the collection path
+        Returns:
+            an AsyncFirestoreRepository, an AsyncCachingRepository or an AsyncRepositoryAdapter
+    """
+    if (environ.get("REPOSITORY_BACKEND", "firestore") != "firestore"):
+        #create_repository already wraps the cached collections
+        return AsyncRepositoryAdapter(create_repository(collection))
+
+    repository = AsyncFirestoreRepository(collection)
+
+    policy = _cache_policy(collection)
+    if (policy is not None):
+        repository = AsyncCachingRepository(repository, policy)
+
+    return repository
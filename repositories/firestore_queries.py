@@ -0,0 +1,196 @@
+from secrets import token_hex
+import time
+from entities import Response
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.lazy_import import lazy_import
+
+#firestore and grpc are imported by the first repository, see utils/lazy_import.py
+base_query = lazy_import("google.cloud.firestore_v1.base_query")
+
+
+class FirestoreQueries():
+    """
+        The query building and record parsing of FirestoreRepository and AsyncFirestoreRepository, the sync and
+        async clients build queries and batches the same way, so the repositories only differ in the calls that
+        reach the server. It needs self.db and self.collection
+    """
+    BATCH_SIZE = 500 #firestore limit of writes per batch
+    MOVE_ATTEMPTS = 5 #times move_to_history reads the record again when it changed meanwhile
+
+    #queries
+    def _equal_query(self, field: str, value: Any):
+        reference = self.db.collection(self.collection)
+        equal_operator = "array_contains" if (field == "type_") else "=="  # type_ is an array in the database
+        return reference.where(filter=base_query.FieldFilter(field, equal_operator, value))
+
+    def _filters_query(self, filters: List[tuple], limit: int = None, fields: List[str] = None):
+        query = self.db.collection(self.collection)
+        for (field, operator, value) in filters:
+            query = query.where(filter=base_query.FieldFilter(field, operator, value))
+
+        if (fields is not None):
+            query = query.select(self._projection(fields))
+
+        if (limit is not None):
+            query = query.limit(limit)
+
+        return query
+
+    def _page_query(self, query, page_size: int, start_after: str = None, fields: List[str] = None):
+        #the pages are ordered by id, the cursor is the id of the last record of the previous page
+        query = query.order_by("__name__")
+
+        if (start_after is not None):
+            query = query.start_after({"__name__": start_after})
+
+        if (fields is not None):
+            query = query.select(self._projection(fields))
+
+        return query.limit(page_size)
+
+    def _projection(self, fields: List[str]) -> List[str]:
+        #the records keep their id as a field too, it's always read
+        return fields if ("id" in fields) else ["id", *fields]
+
+    def _document_references(self, documents: List[Tuple[str, str]]) -> Dict[str, tuple]:
+        #get_all returns the snapshots in any order, they are matched back by document path
+        references = {}
+        for (collection, object_id) in documents:
+            reference = self.db.collection(collection).document(object_id)
+            references[reference.path] = (reference, (collection, object_id))
+        return references
+
+    #responses
+    def _records_response(self, records: list) -> Response:
+        response = Response()
+        response.response_list = [record.to_dict() for record in records]
+        records_exists = True if (len(response.response_list) > 0) else False
+
+        response.message = "" if (records_exists) else "no_records_found_in_" + self.collection
+        response.success = records_exists
+        return response
+
+    def _page_response(self, records: list, page_size: int) -> Response:
+        response = Response()
+        response.response_list = [record.to_dict() for record in records]
+        response.response = records[-1].id if (len(records) == page_size) else None
+        response.success = True
+        return response
+
+    def _object_response(self, snapshot) -> Response:
+        response = Response()
+        if (not snapshot.exists):
+            response.message = "no_records_found_in_" + self.collection
+        else:
+            response.response = snapshot.to_dict()
+            response.success = True
+        return response
+
+    def _documents_response(self, references: Dict[str, tuple], snapshots: list) -> Response:
+        response = Response()
+        response.response = {
+            references[snapshot.reference.path][1]: snapshot.to_dict()
+            for snapshot in snapshots if (snapshot.exists)
+        }
+        response.success = True
+        return response
+
+    def _objects_by_ids_response(self, object_ids: List[str], documents_response: Response) -> Response:
+        if (not documents_response.success):
+            raise Exception(documents_response.message)
+
+        response = Response()
+        response.response = {
+            object_id: record for ((_collection, object_id), record) in documents_response.response.items()
+        }
+        response.response_list = [
+            response.response[object_id] for object_id in dict.fromkeys(object_ids) if (object_id in response.response)
+        ]
+        response.success = True
+        return response
+
+    #writes
+    def _batches(self, items: list, write: Callable) -> list:
+        #the writes split in batches of BATCH_SIZE, each one is committed by the repository
+        reference = self.db.collection(self.collection)
+        batches = []
+
+        for index in range(0, len(items), self.BATCH_SIZE):
+            batch = self.db.batch()
+
+            for (object_id, data) in items[index:index + self.BATCH_SIZE]:
+                write(batch, reference.document(object_id), data)
+
+            batches.append(batch)
+
+        return batches
+
+    def _history_batch(self, object_id: str, history: str, entries: list, data: dict = None):
+        batch = self.db.batch()
+        batch.set(self._history_document(object_id, history), {"entries": entries})
+
+        if (data):
+            batch.update(self.db.collection(self.collection).document(object_id), data)
+
+        return batch
+
+    def _move_batch(self, object_id: str, history: str, snapshot, plan: Callable[[dict], Optional[Tuple[dict, dict]]]):
+        """
+            Plans the move of the record read by move_to_history
+            Returns:
+                the batch to commit, None when there is nothing to move
+        """
+        if (not snapshot.exists):
+            raise Exception("no_records_found_in_" + self.collection)
+
+        planned = plan(snapshot.to_dict())
+        if (planned is None):
+            return None
+
+        (history_document, update) = planned
+        batch = self.db.batch()
+        batch.set(self._history_document(object_id, history), history_document)
+        #the update fails with FailedPrecondition when another write changed the record after it was read
+        batch.update(
+            self.db.collection(self.collection).document(object_id),
+            update,
+            option=self.db.write_option(last_update_time=snapshot.update_time)
+        )
+        return batch
+
+    def _massive_update_batch(self, reference, records: list, field_to_update: str, value_to_update: Any):
+        batch = self.db.batch()
+
+        for record in records:
+            batch.update(reference.document(record.to_dict()["id"]), {field_to_update: value_to_update})
+
+        return batch
+
+    def _history_path(self, object_id: str, history: str) -> str:
+        return self.collection + "/" + object_id + "/" + history
+
+    def _history_document(self, object_id: str, history: str):
+        #the ids start with the time, so ordering by id reads the history in the order it was written
+        return self.db.collection(self._history_path(object_id, history)).document(
+            f"{time.time_ns():020d}{token_hex(4)}"
+        )
+
+    def watch_objects_with_equal(self, field: str, value: Any, on_change: Callable[[List[dict], List[str]], None]):
+        """
+            Listens to the records of the specified collection when a field is equal to a value.
+            on_change is called with all the records first, then with the records changed after each write.
+            It's not a coroutine in either repository, it runs in the listener thread of the firestore client
+            Args:
+                field(str): a string with the field
+                value(str): a string with the value to be equal
+                on_change: receives the records added or modified and the ids of the records removed
+            Returns:
+                the firestore watch, watch.unsubscribe() stops it and watch.is_active is False once it stopped
+        """
+        def on_snapshot(_documents, changes, _read_time):
+            on_change(
+                [change.document.to_dict() for change in changes if (change.type.name != "REMOVED")],
+                [change.document.id for change in changes if (change.type.name == "REMOVED")]
+            )
+
+        return self._equal_query(field, value).on_snapshot(on_snapshot)
@@ -1,11 +1,15 @@
 from . import BaseRepository
-from firebase_admin import firestore
-from google.cloud.firestore_v1.base_query import FieldFilter
+from .firestore_queries import FirestoreQueries, base_query
 from entities import Response
-from typing import Any
+from typing import Any, Callable, List, Optional, Tuple
+from utils.lazy_import import lazy_import
 
+#firestore and grpc are imported by the first repository, see utils/lazy_import.py
+firestore = lazy_import("firebase_admin.firestore")
+exceptions = lazy_import("google.api_core.exceptions")
 
-class FirestoreRepository(BaseRepository):
+
+class FirestoreRepository(FirestoreQueries, BaseRepository):
 
     def __init__(self, collection: str) -> None:
         """
@@ -50,13 +54,29 @@ class FirestoreRepository(BaseRepository):
         response = Response()
 
         try:
-            records = self.db.collection(self.collection).stream()
-            response.response_list = [record.to_dict() for record in records]
+            response = self._records_response(self.db.collection(self.collection).stream())
+        except Exception as e:
+            response.message = str(e)
 
-            records_exists = True if (len(response.response_list) > 0) else False
+        return response
+
+    def read_collection_page(self, page_size: int, start_after: str = None, fields: List[str] = None) -> Response:
+        """
+            Reads one page of all the records of the specified collection, ordered by id
+            Args:
+                page_size(int): the max number of records in the page
+                start_after(str): the id of the last record of the previous page, None for the first page
+                fields(list): only read these fields of the records, None to read them complete
+            Returns:
+                response: a response object
+                    response.response_list (list): a dict's list with the records of the page
+                    response.response (str): the cursor for the next page, None when this is the last page
+        """
+        response = Response()
 
-            response.message = "" if (records_exists) else "no_records_found_in_" + self.collection
-            response.success = records_exists
+        try:
+            query = self._page_query(self.db.collection(self.collection), page_size, start_after, fields)
+            response = self._page_response(list(query.stream()), page_size)
         except Exception as e:
             response.message = str(e)
 
@@ -74,25 +94,64 @@ class FirestoreRepository(BaseRepository):
         response = Response()
 
         try:
-            record = self.db.collection(self.collection).document(object_id).get()
+            response = self._object_response(self.db.collection(self.collection).document(object_id).get())
+        except Exception as e:
+            response.message = str(e)
 
-            if (not record.exists):
-                response.message = "no_records_found_in_" + self.collection
-            else:
-                response.response = record.to_dict()
-                response.success = True
+        return response
 
+    def read_objects_by_ids(self, object_ids: List[str]) -> Response:
+        """
+            Reads many records from the specified collection by id, in one round trip
+            Args:
+                object_ids(list): the records ids
+            Returns:
+                response: a response object
+                    response.response (dict): {id: record} with the records found
+                    response.response_list (list): the records found, in the order of object_ids,
+                        success is True even when some ids don't exist
+        """
+        response = Response()
+
+        try:
+            response = self._objects_by_ids_response(
+                object_ids,
+                self.read_documents([(self.collection, object_id) for object_id in object_ids])
+            )
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_documents(self, documents: List[Tuple[str, str]]) -> Response:
+        """
+            Reads records of any collection by id with a single get_all, in one round trip
+            Args:
+                documents(list): (collection, id) tuples
+            Returns:
+                response: a response object
+                    response.response (dict): {(collection, id): record} with the records found
+        """
+        response = Response()
+
+        try:
+            references = self._document_references(documents)
+            snapshots = self.db.get_all([reference for (reference, _key) in references.values()]) if (
+                    len(references) > 0) else []
+
+            response = self._documents_response(references, snapshots)
         except Exception as e:
             response.message = str(e)
 
         return response
 
-    def read_objects_with_equal(self, field: str, value: Any) -> Response:
+    def read_objects_with_equal(self, field: str, value: Any, fields: List[str] = None) -> Response:
         """
             Reads records from the specified collection when a field is equal to a value
             Args:
                 field(str): a string with the field
                 value: a value with the value to be equal
+                fields(list): only read these fields of the records, None to read them complete
             Returns:
                 response: a response object
                     response.response_list (list): a dict's list with all the records found in the specified collection
@@ -100,15 +159,65 @@ class FirestoreRepository(BaseRepository):
         response = Response()
 
         try:
-            reference = self.db.collection(self.collection)
-            equal_operator = "array_contains" if (field == "type_") else "=="  # type_ is an array in the database
-            records = reference.where(filter=FieldFilter(field, equal_operator, value)).stream()
+            query = self._equal_query(field, value)
 
-            response.response_list = [record.to_dict() for record in records]
-            records_exists = True if (len(response.response_list) > 0) else False
+            if (fields is not None):
+                query = query.select(self._projection(fields))
 
-            response.message = "" if (records_exists) else "no_records_found_in_" + self.collection
-            response.success = records_exists
+            response = self._records_response(query.stream())
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_objects_with_equal_page(
+            self,
+            field: str,
+            value: Any,
+            page_size: int,
+            start_after: str = None,
+            fields: List[str] = None
+    ) -> Response:
+        """
+            Reads one page of the records from the specified collection when a field is equal to a value,
+            the records are ordered by id
+            Args:
+                field(str): a string with the field
+                value: a value with the value to be equal
+                page_size(int): the max number of records in the page
+                start_after(str): the id of the last record of the previous page, None for the first page
+                fields(list): only read these fields of the records, None to read them complete
+            Returns:
+                response: a response object
+                    response.response_list (list): a dict's list with the records of the page
+                    response.response (str): the cursor for the next page, None when this is the last page
+        """
+        response = Response()
+
+        try:
+            query = self._page_query(self._equal_query(field, value), page_size, start_after, fields)
+            response = self._page_response(list(query.stream()), page_size)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_objects_with_filters(self, filters: List[tuple], limit: int = None, fields: List[str] = None) -> Response:
+        """
+            Reads the records from the specified collection that match all the filters,
+            equality filters on several fields are served by the single field indexes
+            Args:
+                filters(list): (field, operator, value) tuples, e.g. ("Admin", "==", True)
+                limit(int): the max number of records, None to read all of them
+                fields(list): only read these fields of the records, None to read them complete
+            Returns:
+                response: a response object
+                    response.response_list (list): a dict's list with the records found
+        """
+        response = Response()
+
+        try:
+            response = self._records_response(self._filters_query(filters, limit, fields).stream())
         except Exception as e:
             response.message = str(e)
 
@@ -139,6 +248,164 @@ class FirestoreRepository(BaseRepository):
 
         return response
 
+    def update_objects_by_ids(self, updates: dict) -> Response:
+        """
+            Updates many existing records from the specified collection in batched writes
+            Args:
+                updates (dict): a dictionary {object_id: {fields to update}}
+            Returns:
+                response: a response object
+                    response.response (int): the number of records updated
+        """
+        response = Response()
+
+        try:
+            items = list(updates.items())
+            for batch in self._batches(items, lambda batch, reference, data: batch.update(reference, data)):
+                batch.commit()
+
+            response.response = len(items)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def set_objects_by_ids(self, records: dict, merge: bool = False) -> Response:
+        """
+            Creates or overwrites many records of the specified collection in batched writes
+            Args:
+                records (dict): a dictionary {object_id: record}
+                merge (bool): merge the fields with the existing records instead of overwriting them
+            Returns:
+                response: a response object
+                    response.response (int): the number of records written
+        """
+        response = Response()
+
+        try:
+            items = list(records.items())
+            for batch in self._batches(items, lambda batch, reference, data: batch.set(reference, data, merge=merge)):
+                batch.commit()
+
+            response.response = len(items)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def delete_objects_by_ids(self, object_ids: list) -> Response:
+        """
+            Deletes many records of the specified collection in batched writes
+            Args:
+                object_ids (list): the ids to delete
+            Returns:
+                response: a response object
+                    response.response (int): the number of records deleted
+        """
+        response = Response()
+
+        try:
+            items = [(object_id, None) for object_id in object_ids]
+            for batch in self._batches(items, lambda batch, reference, _data: batch.delete(reference)):
+                batch.commit()
+
+            response.response = len(items)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def append_history(self, object_id: str, history: str, entries: list, data: dict = None) -> Response:
+        """
+            Appends entries to a history of a record, kept in the subcollection {collection}/{object_id}/{history}
+            so the record itself doesn't grow. The history document and the record update are one batch
+            Args:
+                object_id(str): the record id
+                history(str): the history name, e.g. prorate_data
+                entries(list): the entries to append, they are saved together in one history document
+                data(dict): fields of the record to update in the same write, None to only append
+            Returns:
+                response: a response object
+        """
+        response = Response()
+
+        try:
+            self._history_batch(object_id, history, entries, data).commit()
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_history(self, object_id: str, history: str) -> Response:
+        """
+            Reads the history documents of a record, oldest first
+            Args:
+                object_id(str): the record id
+                history(str): the history name
+            Returns:
+                response: a response object
+                    response.response_list (list): a dict's list with the history documents
+        """
+        response = Response()
+
+        try:
+            reference = self.db.collection(self._history_path(object_id, history))
+            response.response_list = [record.to_dict() for record in reference.order_by("__name__").stream()]
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def move_to_history(
+            self,
+            object_id: str,
+            history: str,
+            plan: Callable[[dict], Optional[Tuple[dict, dict]]]
+    ) -> Response:
+        """
+            Moves data of a record to its history. The record update has the read time as precondition,
+            when another write changed the record meanwhile it's read and planned again
+            Args:
+                object_id(str): the record id
+                history(str): the history name
+                plan: a function that receives the record and returns (history document, record update),
+                    or None when there is nothing to move
+            Returns:
+                response: a response object
+                    response.response (bool): True when something was moved
+        """
+        response = Response()
+
+        try:
+            reference = self.db.collection(self.collection).document(object_id)
+
+            for attempt in range(self.MOVE_ATTEMPTS):
+                batch = self._move_batch(object_id, history, reference.get(), plan)
+                if (batch is None):
+                    response.response = False
+                    break
+
+                try:
+                    batch.commit()
+                except exceptions.FailedPrecondition:
+                    continue
+
+                response.response = True
+                break
+            else:
+                raise Exception("record_changed_while_moving_history")
+
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
     def delete_object_by_id(self, object_id: str) -> Response:
         """
             Delete a record from the specified collection and id
@@ -172,16 +439,9 @@ class FirestoreRepository(BaseRepository):
 
         try:
             reference = self.db.collection(self.collection)
-            records = reference.where(filter=FieldFilter(field, "==", value)).stream()
-
-            batch = self.db.batch()
-
-            for record in records:
-                record = record.to_dict()
-                record_ref = self.db.collection(self.collection).document(record["id"])
-                batch.update(record_ref, {field_to_update: value_to_update})
+            records = reference.where(filter=base_query.FieldFilter(field, "==", value)).stream()
 
-            batch.commit()
+            self._massive_update_batch(reference, records, field_to_update, value_to_update).commit()
             response.success = True
 
         except Exception as e:
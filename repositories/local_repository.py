@@ -0,0 +1,449 @@
+from . import BaseRepository
+from abc import abstractmethod
+from datetime import datetime, timezone
+from secrets import token_hex
+from threading import RLock
+import time
+from entities import Response
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+OPERATORS = {
+    "==": lambda current, value: current == value,
+    "!=": lambda current, value: current != value,
+    "<": lambda current, value: current is not None and current < value,
+    "<=": lambda current, value: current is not None and current <= value,
+    ">": lambda current, value: current is not None and current > value,
+    ">=": lambda current, value: current is not None and current >= value,
+    "in": lambda current, value: current in value,
+    "array_contains": lambda current, value: isinstance(current, list) and value in current,
+}
+
+
+def to_stored(value):
+    """
+        Mimics the Firestore serialization: it returns a new copy of every dict and list,
+        and naive datetimes are stored as UTC
+    """
+    if (isinstance(value, dict)):
+        return {key: to_stored(item) for key, item in value.items()}
+    if (isinstance(value, (list, tuple))):
+        return [to_stored(item) for item in value]
+    if (isinstance(value, datetime) and value.tzinfo is None):
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def matches(record: dict, filters: Iterable[tuple]) -> bool:
+    #like in Firestore, a record without the field doesn't match any filter on it
+    return all(
+        field in record and OPERATORS[operator](record[field], value)
+        for (field, operator, value) in filters
+    )
+
+
+class LocalWatch():
+    """
+        A watch of the records of a local collection that match the filters, it sees the writes of the process
+    """
+
+    def __init__(self, collection: str, filters: List[tuple], on_change: Callable[[List[dict], List[str]], None]):
+        self.collection = collection
+        self.filters = filters
+        self.on_change = on_change
+        self.object_ids = set()
+        self.is_active = True
+
+    def unsubscribe(self):
+        self.is_active = False
+
+    def notify(self, object_id: str, record: Optional[dict]):
+        if (record is not None and matches(record, self.filters)):
+            self.object_ids.add(object_id)
+            self.on_change([to_stored(record)], [])
+        elif (object_id in self.object_ids):
+            self.object_ids.discard(object_id)
+            self.on_change([], [object_id])
+
+
+class LocalRepository(BaseRepository):
+    """
+        The BaseRepository contract over a local store, the Firestore responses and errors are kept
+        so the DAOs can't tell the difference. The subclasses only implement the storage methods
+    """
+    _lock = RLock()
+    _watches: Dict[Tuple[str, str], List[LocalWatch]] = {}
+
+    def __init__(self, collection: str) -> None:
+        super().__init__(collection)
+
+    #storage
+    @abstractmethod
+    def _get(self, collection: str, object_id: str) -> Optional[dict]:
+        """
+            Returns a copy of the record, None when it doesn't exist
+        """
+
+    @abstractmethod
+    def _put(self, collection: str, object_id: str, record: dict):
+        """
+            Saves the record, replacing the previous one
+        """
+
+    @abstractmethod
+    def _delete(self, collection: str, object_id: str):
+        """
+            Deletes the record, nothing happens when it doesn't exist
+        """
+
+    @abstractmethod
+    def _query(
+            self,
+            collection: str,
+            filters: List[tuple],
+            start_after: str = None,
+            limit: int = None
+    ) -> List[Tuple[str, dict]]:
+        """
+            Returns copies of the records that match all the filters as (id, record), ordered by id
+        """
+
+    #helpers
+    def _save(self, collection: str, object_id: str, record: dict):
+        self._put(collection, object_id, record)
+        self._notify(collection, object_id, record)
+
+    def _remove(self, collection: str, object_id: str):
+        self._delete(collection, object_id)
+        self._notify(collection, object_id, None)
+
+    def _notify(self, collection: str, object_id: str, record: Optional[dict]):
+        key = (type(self).__name__, collection)
+        if (key not in self._watches):
+            return
+
+        self._watches[key] = [watch for watch in self._watches[key] if (watch.is_active)]
+        for watch in self._watches[key]:
+            watch.notify(object_id, record)
+
+    def _equal_operator(self, field: str) -> str:
+        return "array_contains" if (field == "type_") else "==" # type_ is an array in the database
+
+    def _project(self, record: dict, fields: Optional[List[str]]) -> dict:
+        if (fields is None):
+            return record
+        return {field: record[field] for field in ["id", *fields] if (field in record)}
+
+    def _found(self, response: Response, collection: str):
+        response.success = True if (len(response.response_list) > 0) else False
+        if (not response.success):
+            response.message = "no_records_found_in_" + collection
+
+    def _update_record(self, object_id: str, data: dict) -> dict:
+        record = self._get(self.collection, object_id)
+        if (record is None):
+            raise Exception(f"404 No document to update: {self.collection}/{object_id}")
+
+        for (field_path, value) in data.items():
+            #a dotted field path updates a nested field, like in Firestore
+            *parents, field = field_path.split(".")
+            target = record
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[field] = to_stored(value)
+
+        self._save(self.collection, object_id, record)
+        return record
+
+    def _history_path(self, object_id: str, history: str) -> str:
+        return self.collection + "/" + object_id + "/" + history
+
+    def _history_id(self) -> str:
+        #the ids start with the time, so ordering by id reads the history in the order it was written
+        return f"{time.time_ns():020d}{token_hex(4)}"
+
+    #BaseRepository
+    def create_object(self, data: dict) -> Response:
+        response = Response()
+
+        try:
+            data["id"] = token_hex(10)
+            with self._lock:
+                self._save(self.collection, data["id"], to_stored(data))
+
+            response.response = data
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_collection(self) -> Response:
+        response = Response()
+
+        try:
+            response.response_list = [record for (_id, record) in self._query(self.collection, [])]
+            self._found(response, self.collection)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_collection_page(self, page_size: int, start_after: str = None, fields: List[str] = None) -> Response:
+        response = Response()
+
+        try:
+            records = self._query(self.collection, [], start_after, page_size)
+
+            response.response_list = [self._project(record, fields) for (_id, record) in records]
+            response.response = records[-1][0] if (len(records) == page_size) else None
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_object_by_id(self, object_id: str) -> Response:
+        response = Response()
+
+        try:
+            record = self._get(self.collection, object_id)
+
+            if (record is None):
+                response.message = "no_records_found_in_" + self.collection
+            else:
+                response.response = record
+                response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_objects_by_ids(self, object_ids: List[str]) -> Response:
+        response = Response()
+
+        try:
+            records = {object_id: self._get(self.collection, object_id) for object_id in object_ids}
+
+            response.response = {object_id: record for (object_id, record) in records.items() if (record is not None)}
+            response.response_list = list(response.response.values())
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_documents(self, documents: List[Tuple[str, str]]) -> Response:
+        response = Response()
+
+        try:
+            records = {(collection, object_id): self._get(collection, object_id) for (collection, object_id) in documents}
+
+            response.response = {key: record for (key, record) in records.items() if (record is not None)}
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_objects_with_equal(self, field: str, value: Any, fields: List[str] = None) -> Response:
+        response = Response()
+
+        try:
+            records = self._query(self.collection, [(field, self._equal_operator(field), value)])
+
+            response.response_list = [self._project(record, fields) for (_id, record) in records]
+            self._found(response, self.collection)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def watch_objects_with_equal(self, field: str, value: Any, on_change: Callable[[List[dict], List[str]], None]):
+        watch = LocalWatch(self.collection, [(field, self._equal_operator(field), value)], on_change)
+
+        with self._lock:
+            records = self._query(self.collection, watch.filters)
+            watch.object_ids = {object_id for (object_id, _record) in records}
+            self._watches.setdefault((type(self).__name__, self.collection), []).append(watch)
+            on_change([record for (_id, record) in records], [])
+
+        return watch
+
+    def read_objects_with_equal_page(
+            self,
+            field: str,
+            value: Any,
+            page_size: int,
+            start_after: str = None,
+            fields: List[str] = None
+    ) -> Response:
+        response = Response()
+
+        try:
+            records = self._query(self.collection, [(field, self._equal_operator(field), value)], start_after, page_size)
+
+            response.response_list = [self._project(record, fields) for (_id, record) in records]
+            response.response = records[-1][0] if (len(records) == page_size) else None
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_objects_with_filters(self, filters: List[tuple], limit: int = None, fields: List[str] = None) -> Response:
+        response = Response()
+
+        try:
+            records = self._query(self.collection, list(filters), None, limit)
+
+            response.response_list = [self._project(record, fields) for (_id, record) in records]
+            self._found(response, self.collection)
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def update_object_by_id(self, object_id: str, data: dict) -> Response:
+        response = Response()
+
+        try:
+            with self._lock:
+                response.response = self._update_record(object_id, data)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def update_objects_by_ids(self, updates: dict) -> Response:
+        response = Response()
+
+        try:
+            with self._lock:
+                #like a Firestore batch, nothing is written when a record doesn't exist
+                missing = [object_id for object_id in updates if (self._get(self.collection, object_id) is None)]
+                if (len(missing) > 0):
+                    raise Exception(f"404 No document to update: {self.collection}/{missing[0]}")
+
+                for (object_id, data) in updates.items():
+                    self._update_record(object_id, data)
+
+            response.response = len(updates)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def set_objects_by_ids(self, records: dict, merge: bool = False) -> Response:
+        response = Response()
+
+        try:
+            with self._lock:
+                for (object_id, data) in records.items():
+                    previous = self._get(self.collection, object_id) if (merge) else None
+                    self._save(self.collection, object_id, {**(previous or {}), **to_stored(data)})
+
+            response.response = len(records)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def delete_objects_by_ids(self, object_ids: list) -> Response:
+        response = Response()
+
+        try:
+            with self._lock:
+                for object_id in object_ids:
+                    self._remove(self.collection, object_id)
+
+            response.response = len(object_ids)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def append_history(self, object_id: str, history: str, entries: list, data: dict = None) -> Response:
+        response = Response()
+
+        try:
+            with self._lock:
+                if (data):
+                    self._update_record(object_id, data)
+                self._save(self._history_path(object_id, history), self._history_id(), to_stored({"entries": entries}))
+
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def read_history(self, object_id: str, history: str) -> Response:
+        response = Response()
+
+        try:
+            response.response_list = [
+                record for (_id, record) in self._query(self._history_path(object_id, history), [])
+            ]
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def move_to_history(
+            self,
+            object_id: str,
+            history: str,
+            plan: Callable[[dict], Optional[Tuple[dict, dict]]]
+    ) -> Response:
+        response = Response()
+
+        try:
+            #the lock makes the read, the plan and the writes atomic, no precondition is needed
+            with self._lock:
+                record = self._get(self.collection, object_id)
+                if (record is None):
+                    raise Exception("no_records_found_in_" + self.collection)
+
+                planned = plan(record)
+                if (planned is not None):
+                    (history_document, update) = planned
+                    self._save(self._history_path(object_id, history), self._history_id(), to_stored(history_document))
+                    self._update_record(object_id, update)
+
+            response.response = planned is not None
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def delete_object_by_id(self, object_id: str) -> Response:
+        response = Response()
+
+        try:
+            with self._lock:
+                self._remove(self.collection, object_id)
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def massive_update_with_equal(self, field, value, field_to_update, value_to_update) -> Response:
+        response = Response()
+
+        try:
+            with self._lock:
+                for (object_id, _record) in self._query(self.collection, [(field, "==", value)]):
+                    self._update_record(object_id, {field_to_update: value_to_update})
+
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
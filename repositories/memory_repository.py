@@ -0,0 +1,104 @@
+from .local_repository import LocalRepository, matches, to_stored
+from typing import Dict, List, Optional, Tuple
+
+#shared by every repository of the process, like the database: collection path -> id -> record
+_collections: Dict[str, Dict[str, dict]] = {}
+#equality indexes, created on the first query on a field: collection path -> field -> value key -> ids
+_indexes: Dict[str, Dict[str, Dict[tuple, set]]] = {}
+
+
+def _index_key(value) -> Optional[tuple]:
+    #True == 1 for python but not for Firestore, the key keeps them apart. Lists and dicts are not indexed
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return (isinstance(value, bool), value)
+
+
+class InMemoryRepository(LocalRepository):
+    """
+        Keeps the collections in the process memory, for tests, load tests and local development
+    """
+
+    def __init__(self, collection: str) -> None:
+        super().__init__(collection)
+
+    def clear(self):
+        """
+            Deletes every collection
+        """
+        with self._lock:
+            _collections.clear()
+            _indexes.clear()
+
+    def _index(self, collection: str, field: str) -> Dict[tuple, set]:
+        indexes = _indexes.setdefault(collection, {})
+        if (field not in indexes):
+            index = indexes[field] = {}
+            for (object_id, record) in _collections.get(collection, {}).items():
+                key = _index_key(record.get(field)) if (field in record) else None
+                if (key is not None):
+                    index.setdefault(key, set()).add(object_id)
+        return indexes[field]
+
+    def _unindex(self, collection: str, object_id: str, record: dict):
+        for (field, index) in _indexes.get(collection, {}).items():
+            key = _index_key(record.get(field)) if (field in record) else None
+            if (key is not None and key in index):
+                index[key].discard(object_id)
+
+    def _get(self, collection: str, object_id: str) -> Optional[dict]:
+        #the copy is made under the lock too, a writer must not change the collections while it's read
+        with self._lock:
+            record = _collections.get(collection, {}).get(object_id)
+            return to_stored(record) if (record is not None) else None
+
+    def _put(self, collection: str, object_id: str, record: dict):
+        with self._lock:
+            records = _collections.setdefault(collection, {})
+            if (object_id in records):
+                self._unindex(collection, object_id, records[object_id])
+
+            records[object_id] = record
+            for (field, index) in _indexes.get(collection, {}).items():
+                key = _index_key(record.get(field)) if (field in record) else None
+                if (key is not None):
+                    index.setdefault(key, set()).add(object_id)
+
+    def _delete(self, collection: str, object_id: str):
+        with self._lock:
+            record = _collections.get(collection, {}).pop(object_id, None)
+            if (record is not None):
+                self._unindex(collection, object_id, record)
+
+    def _query(
+            self,
+            collection: str,
+            filters: List[tuple],
+            start_after: str = None,
+            limit: int = None
+    ) -> List[Tuple[str, dict]]:
+        with self._lock:
+            records = _collections.get(collection, {})
+
+            #the equality filters go through the indexes, the rest are checked on the candidates
+            candidates = None
+            for (field, operator, value) in filters:
+                key = _index_key(value) if (operator == "==") else None
+                if (key is not None):
+                    ids = self._index(collection, field).get(key, set())
+                    candidates = ids if (candidates is None) else candidates & ids
+
+            object_ids = sorted(records if (candidates is None) else candidates)
+            if (start_after is not None):
+                object_ids = [object_id for object_id in object_ids if (object_id > start_after)]
+
+            result = []
+            for object_id in object_ids:
+                if (limit is not None and len(result) >= limit):
+                    break
+                if (matches(records[object_id], filters)):
+                    result.append((object_id, to_stored(records[object_id])))
+
+            return result
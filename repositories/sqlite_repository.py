@@ -0,0 +1,157 @@
+import json
+import sqlite3
+from datetime import datetime
+from os import environ
+from .local_repository import LocalRepository, matches
+from typing import Dict, List, Optional, Tuple
+
+#the fields the DAOs query by equality, they get an indexed column so the queries don't scan the collection
+INDEXED_FIELDS = [
+    "CompanyCode",
+    "Type",
+    "Admin",
+    "company_code",
+    "completed",
+    "local_user_id",
+    "payment_random_id",
+    "active",
+]
+
+_connections: Dict[str, sqlite3.Connection] = {}
+
+
+def forget_connections():
+    """
+        Drops the connections of the parent process in a forked worker, a connection can't be shared by processes
+    """
+    _connections.clear()
+
+
+def _encode(value):
+    if (isinstance(value, datetime)):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not supported by the sqlite repository")
+
+
+def _decode(value: dict):
+    return datetime.fromisoformat(value["$datetime"]) if (value.keys() == {"$datetime"}) else value
+
+
+def _json_path(field: str) -> str:
+    #sqlite has no escape for a " in a quoted path label, _query checks those fields on the rows
+    return '$."' + field + '"'
+
+
+def _column(field: str) -> Tuple[str, list]:
+    #the path of a field not indexed is bound as a parameter, a field name never becomes SQL text
+    if (field in INDEXED_FIELDS):
+        return (f"idx_{field}", [])
+    return ("json_extract(data, ?)", [_json_path(field)])
+
+
+class SqliteRepository(LocalRepository):
+    """
+        Keeps the collections in a SQLite database, one row per record with the record as JSON.
+        The database is the SQLITE_DATABASE file, in memory when it's not set
+    """
+
+    def __init__(self, collection: str) -> None:
+        super().__init__(collection)
+        self.connection = self._connect(environ.get("SQLITE_DATABASE", ":memory:"))
+
+    @classmethod
+    def _connect(cls, database: str) -> sqlite3.Connection:
+        with cls._lock:
+            if (database not in _connections):
+                #the connection is shared by the threads of the process, the lock serializes its use
+                connection = sqlite3.connect(database, check_same_thread=False)
+                columns = "".join(
+                    f", idx_{field} GENERATED ALWAYS AS (json_extract(data, '{_json_path(field)}')) VIRTUAL"
+                    for field in INDEXED_FIELDS
+                )
+                with connection:
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS documents ("
+                        "collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL"
+                        f"{columns}, PRIMARY KEY (collection, id)) WITHOUT ROWID"
+                    )
+                    for field in INDEXED_FIELDS:
+                        connection.execute(
+                            f"CREATE INDEX IF NOT EXISTS documents_{field} ON documents (collection, idx_{field})"
+                        )
+                _connections[database] = connection
+            return _connections[database]
+
+    def clear(self):
+        """
+            Deletes every collection of the database
+        """
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM documents")
+
+    def _get(self, collection: str, object_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT data FROM documents WHERE collection = ? AND id = ?", (collection, object_id)
+            ).fetchone()
+        return json.loads(row[0], object_hook=_decode) if (row is not None) else None
+
+    def _put(self, collection: str, object_id: str, record: dict):
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)",
+                (collection, object_id, json.dumps(record, default=_encode))
+            )
+
+    def _delete(self, collection: str, object_id: str):
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM documents WHERE collection = ? AND id = ?", (collection, object_id))
+
+    def _query(
+            self,
+            collection: str,
+            filters: List[tuple],
+            start_after: str = None,
+            limit: int = None
+    ) -> List[Tuple[str, dict]]:
+        conditions = ["collection = ?"]
+        parameters = [collection]
+        remaining = []
+
+        #the equality filters on scalars go to SQL, the rest are checked on the rows it returns
+        for (field, operator, value) in filters:
+            if ('"' in field):
+                remaining.append((field, operator, value))
+            elif (operator == "==" and isinstance(value, (str, int, float)) and not isinstance(value, bool)):
+                (column, column_parameters) = _column(field)
+                conditions.append(f"{column} = ?")
+                parameters.extend([*column_parameters, value])
+            elif (operator == "==" and isinstance(value, bool)):
+                #json_extract returns 1 and 0 for the JSON booleans, the type check keeps the numbers out
+                (column, column_parameters) = _column(field)
+                conditions.append(f"{column} = ? AND json_type(data, ?) = ?")
+                parameters.extend([*column_parameters, int(value), _json_path(field), "true" if (value) else "false"])
+            else:
+                remaining.append((field, operator, value))
+
+        if (start_after is not None):
+            conditions.append("id > ?")
+            parameters.append(start_after)
+
+        sql = f"SELECT id, data FROM documents WHERE {' AND '.join(conditions)} ORDER BY id"
+        if (limit is not None and len(remaining) == 0):
+            sql += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._lock:
+            rows = self.connection.execute(sql, parameters).fetchall()
+
+        result = []
+        for (object_id, data) in rows:
+            if (limit is not None and len(result) >= limit):
+                break
+            record = json.loads(data, object_hook=_decode)
+            if (matches(record, remaining)):
+                result.append((object_id, record))
+
+        return result
@@ -4,3 +4,4 @@ from .payment_service import PaymentService
 from .membership_service import MembershipService
 from .payroll_service import PayrollService
 from .coupon_service import CouponService
+from .warmup_service import WarmupService, start_warmup, is_ready, read_warmup_stages, reset_warmup
@@ -100,14 +100,13 @@ class CompanyService():
         response = Response()
 
         try:
-            admin_response = self.user_dao.read_all_users_by_company_code(self.company_code)
+            admin_response = self.user_dao.read_admin_by_company_code(self.company_code)
             if (not admin_response.success):
                 raise Exception(admin_response.message)
 
-            response.response_list = [record for record in admin_response.response_list if (record["user"].Admin)]
-            if (len(response.response_list) > 0):
-                response.response = response.response_list[0]
-                response.success = True
+            response.response = admin_response.response
+            response.response_list = [admin_response.response]
+            response.success = True
 
         except Exception as e:
             response.message = str(e)
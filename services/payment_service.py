@@ -1,4 +1,4 @@
-from dao import UserDao, MembershipDao, SubscriptionsDao, CouponsDao
+from dao import UserDao, MembershipDao, SubscriptionsDao, CouponsDao, prefetch_records
 from services import StripeService
 from entities import TutorUser, StudentUser, Membership, Response, Subscription, Coupon
 from use_cases import IndividualUseCase, AdminUseCase
@@ -28,6 +28,12 @@ class PaymentService():
         """
         response = Response()
         try:
+            #the user, the membership and the coupon are read in one round trip
+            prefetch_records([
+                (self.user_dao.collection, self.local_user_id),
+                (self.membership_dao.collection, local_membership_id)
+            ] + ([(self.coupon_dao.collection, local_coupon_id)] if (local_coupon_id != "") else []))
+
             customer_response = self.user_dao.read_user_by_id(self.local_user_id)
             membership_response = self.membership_dao.read_membership_by_id(local_membership_id)
 
@@ -1,10 +1,10 @@
 from entities import Response, TutorUser, StudentUser, StudentDebt, TutorPayout, TutorNotFound, Payroll, AdminPayout, \
-    Subscription
+    Subscription, PayrollStudent, PayrollTutor, StudentDebtRecord, TutorPayoutRecord, validate_models
 from dao import UserDao, PayrollDao
 from services import CompanyService, StripeService, MembershipService
 from datetime import datetime, timezone
-from utils import calculate_hours_spent, calculate_hours_spent_by_range, find_student_debt_by_student_id, \
-    find_tutor_pay_by_tutor_id, check_duplicated_tutor_hours
+from typing import Iterable
+from utils import calculate_hours_by_ledger_batch, merge_payroll_lines
 
 
 class PayrollService():
@@ -42,41 +42,41 @@ class PayrollService():
             if (subscription.status != "active"):
                 raise Exception("no_active_subscription")
 
-            #check company type
+            #check company type, the users are read one page at a time while the payroll is calculated
             if (admin.company_type == "tutor_group"):
-                students = self.company_service(company_code).read_students()
-                if (not students.response):
-                    raise Exception(students.message)
-
-                calculate_payroll_payments = self.calculate_payroll_payments(admin, students.response_list)
-                if (not calculate_payroll_payments.success):
-                    raise Exception(calculate_payroll_payments.message)
-
-                response = self.validate_payroll_payments(admin, calculate_payroll_payments.response)
+                users_pages = self.user_dao.iterate_users_by_company_code(
+                    company_code,
+                    "Student",
+                    payroll_fields=True
+                )
             elif (admin.company_type == "individual_group"):
-                individuals = self.company_service(company_code).read_individuals()
-                if (not individuals.response):
-                    raise Exception(individuals.message)
-
-                calculate_payroll_payments = self.calculate_payroll_payments(admin, individuals.response_list)
-                if (not calculate_payroll_payments.success):
-                    raise Exception(calculate_payroll_payments.message)
-
-                response = self.validate_payroll_payments(admin, calculate_payroll_payments.response)
+                users_pages = self.user_dao.iterate_users_by_company_code(
+                    company_code,
+                    "Individual",
+                    payroll_fields=True
+                )
             else:
                 raise Exception("invalid_company_type")
 
+            calculate_payroll_payments = self.calculate_payroll_payments(admin, users_pages)
+            if (not calculate_payroll_payments.success):
+                raise Exception(calculate_payroll_payments.message)
+
+            response = self.validate_payroll_payments(admin, calculate_payroll_payments.response)
+
         except Exception as e:
             response.message = str(e)
 
         return response
 
-    def calculate_payroll_payments(self, admin: TutorUser, users: list) -> Response:
+    def calculate_payroll_payments(self, admin: TutorUser, users_pages: Iterable[list]) -> Response:
         """
-            Calculates the students debt, the tutors pay and the admin profit
+            Calculates the students debt, the tutors pay and the admin profit.
+            The users are processed one page at a time, the tutors payout and the admin profit are added up
+            as the pages come, so only the payroll lines are kept in memory
             Args:
                 admin:
-                users:
+                users_pages: lists of PayrollStudent, e.g. from UserDao.iterate_users_by_company_code
             Returns:
         """
         response = Response()
@@ -84,8 +84,9 @@ class PayrollService():
         try:
             #data to calculate
             students_to_charge = []
-            tutors_payout = []
+            tutors_payout = {}
             tutors_not_found = []
+            total_users = 0
             total_admin_profit = 0
 
             #check the payout date range
@@ -97,85 +98,98 @@ class PayrollService():
             if (last_payout_date is None):
                 first_payout = True
 
-            #reads all the tutors to check their cost
-            tutors_response = self.company_service(admin.CompanyCode).read_tutors()
-            if (not tutors_response.success):
-                raise Exception(tutors_response.message)
-
-            # parsed the tutors into a big dict, so it's easy to look for them
-            tutors_parsed = {tutor.name: tutor for tutor in tutors_response.response_list}
-
-            #read the users
-            for user in users:
-                student: StudentUser = user
-                student_tutor: TutorUser = tutors_parsed.get(student.Tutor)
-
-                student_meeting_time_start = student.HistMeetingTimes
-                student_meeting_time_end = student.HistMeetingTimesEnd
-
-                if (len(student_meeting_time_start) > 0 and len(student_meeting_time_end) > 0):
-                    student_hours = calculate_hours_spent(
-                        student_meeting_time_start,
-                        student_meeting_time_end
-                    ) if (first_payout) else calculate_hours_spent_by_range(
-                        student_meeting_time_start,
-                        student_meeting_time_end,
-                        last_payout_date,
-                        today_date
-                    )
-
-                    #check if the tutor exist
-                    if (student_tutor is None):
-                        tutors_not_found.append({
-                            "tutor_name": student.Tutor,
-                            "students": {
-                                "name": student.name,
-                                "hours": student_hours
-                            }
-                        })
-                        continue
+            #reads all the tutors to check their cost, parsed into a big dict, so it's easy to look for them
+            tutors_parsed = {
+                tutor.name: tutor
+                for tutors_page in self.user_dao.iterate_users_by_company_code(
+                    admin.CompanyCode,
+                    "Tutor",
+                    payroll_fields=True
+                )
+                for tutor in tutors_page
+            }
 
-                    #student debt
-                    student_debt = student_hours * student_tutor.cost_per_session
+            for users in users_pages:
+                total_users += len(users)
 
-                    #tutor payment
-                    tutor_pay = student_hours * student_tutor.pay_per_hour
+                #calculates the hours of the users of the page in one pass, only reading the meetings after their cursor
+                users_hours, users_meetings = calculate_hours_by_ledger_batch(
+                    [(user.HistMeetingTimes, user.HistMeetingTimesEnd, user.payroll_meeting_cursor) for user in users],
+                    None if (first_payout) else last_payout_date,
+                    None if (first_payout) else today_date
+                )
 
-                    #admin profit percentage
-                    admin_profit_percentage = (abs(student_tutor.cost_per_session - student_tutor.pay_per_hour) / (
-                            (student_tutor.cost_per_session + student_tutor.pay_per_hour) / 2)) * 100
-                    #admin profit in cents
-                    admin_profit_amount = int((admin_profit_percentage / 100) * student_debt)
+                #read the users
+                for (user, student_hours, (meetings_first, meetings_last, meeting_cursor)) in zip(
+                        users, users_hours, users_meetings):
+                    student: PayrollStudent = user
+                    student_tutor: PayrollTutor = tutors_parsed.get(student.Tutor)
 
-                    #total admin profit
-                    total_admin_profit = total_admin_profit + admin_profit_amount
+                    student_meeting_time_start = student.HistMeetingTimes
+                    student_meeting_time_end = student.HistMeetingTimesEnd
 
-                    student_debt_object = StudentDebt(
-                        start_hours=student_meeting_time_start,
-                        end_hours=student_meeting_time_end,
-                        hours=student_hours,
-                        student_id=student.id,
-                        student_name=student.name,
-                        student_debt=student_debt,
-                        tutor_id=student_tutor.id,
-                        tutor_name=student_tutor.name,
-                        tutor_cost=student_tutor.cost_per_session,
-                        pending_onboarding=(not student.has_default_payment_method),
-                        stripe_customer_id=student.stripe_customer_id,
-                        admin_profit=admin_profit_amount
-                    )
-                    students_to_charge.append(student_debt_object)
+                    if (len(student_meeting_time_start) > 0 and len(student_meeting_time_end) > 0):
 
-                    student_tutor_pending_onboarding = True if (student_tutor.stripe_subaccount_id == "") else False
-                    tutor_payout_object = TutorPayout(
-                        tutor_id=student_tutor.id,
-                        tutor_name=student_tutor.name,
-                        tutor_payout=tutor_pay,
-                        tutor_total_hours=student_hours,
-                        pending_onboarding=student_tutor_pending_onboarding,
-                        stripe_sub_account_id=student_tutor.stripe_subaccount_id
-                    )
-                    tutors_payout.append(tutor_payout_object)
+                        #check if the tutor exist
+                        if (student_tutor is None):
+                            tutors_not_found.append({
+                                "tutor_name": student.Tutor,
+                                "students": {
+                                    "name": student.name,
+                                    "hours": student_hours
+                                }
+                            })
+                            continue
+
+                        #student debt
+                        student_debt = student_hours * student_tutor.cost_per_session
+
+                        #tutor payment
+                        tutor_pay = student_hours * student_tutor.pay_per_hour
+
+                        #admin profit percentage
+                        admin_profit_percentage = (abs(student_tutor.cost_per_session - student_tutor.pay_per_hour) / (
+                                (student_tutor.cost_per_session + student_tutor.pay_per_hour) / 2)) * 100
+                        #admin profit in cents
+                        admin_profit_amount = int((admin_profit_percentage / 100) * student_debt)
+
+                        #total admin profit
+                        total_admin_profit = total_admin_profit + admin_profit_amount
+
+                        students_to_charge.append(StudentDebtRecord(
+                            meetings_first=meetings_first,
+                            meetings_last=meetings_last,
+                            first_meeting=(
+                                student_meeting_time_start[meetings_first]
+                                if (meetings_last > meetings_first) else None
+                            ),
+                            last_meeting=(
+                                student_meeting_time_end[meetings_last - 1]
+                                if (meetings_last > meetings_first) else None
+                            ),
+                            hours=student_hours,
+                            meeting_cursor=meeting_cursor,
+                            student_id=student.id,
+                            student_name=student.name,
+                            student_debt=student_debt,
+                            tutor_id=student_tutor.id,
+                            tutor_name=student_tutor.name,
+                            tutor_cost=student_tutor.cost_per_session,
+                            pending_onboarding=(not student.has_default_payment_method),
+                            stripe_customer_id=student.stripe_customer_id,
+                            admin_profit=admin_profit_amount
+                        ))
+
+                        #adds up the tutor payout as the students come
+                        tutor_payout_record = tutors_payout.get(student_tutor.id)
+                        if (tutor_payout_record is None):
+                            tutor_payout_record = tutors_payout[student_tutor.id] = TutorPayoutRecord(
+                                tutor_id=student_tutor.id,
+                                tutor_name=student_tutor.name,
+                                pending_onboarding=(student_tutor.stripe_subaccount_id == ""),
+                                stripe_sub_account_id=student_tutor.stripe_subaccount_id
+                            )
+                        tutor_payout_record.add(student_hours, tutor_pay)
 
             admin_pending_onboarding = True if (admin.stripe_subaccount_id == "") else False
             admin_payout = AdminPayout(
@@ -184,11 +198,13 @@ class PayrollService():
                 pending_onboarding=admin_pending_onboarding
             )
 
-            tutors_payout = check_duplicated_tutor_hours(tutors_payout)
+            if (total_users == 0):
+                raise Exception("no_users_found_in_company")
 
+            #the lines become pydantic models only here, validated in one call each
             response.response = {
-                "students_to_charge": students_to_charge,
-                "tutors_payout": tutors_payout,
+                "students_to_charge": validate_models(StudentDebt, [record.to_dict() for record in students_to_charge]),
+                "tutors_payout": validate_models(TutorPayout, [record.to_dict() for record in tutors_payout.values()]),
                 "admin_payout": admin_payout,
                 "tutors_not_found": tutors_not_found
             }
@@ -226,18 +242,20 @@ class PayrollService():
                     if (not previous_payroll.admin_paid) else previous_payroll.admin_payout
 
                 if (not previous_payroll.students_charged):
-                    students_to_charge = [
-                        find_student_debt_by_student_id(payroll_data["students_to_charge"], student_debt.student_id)
-                        if (not student_debt.paid) else student_debt for student_debt in previous_payroll.students_debt
-                    ]
+                    students_to_charge = merge_payroll_lines(
+                        previous_payroll.students_debt,
+                        payroll_data["students_to_charge"],
+                        "student_id"
+                    )
                 else:
                     students_to_charge = previous_payroll.students_debt
 
                 if (not previous_payroll.tutors_paid):
-                    tutors_payout = [
-                        find_tutor_pay_by_tutor_id(payroll_data["tutors_payout"], tutor_payout.tutor_id)
-                        if (not tutor_payout.paid) else tutor_payout for tutor_payout in previous_payroll.tutors_payout
-                    ]
+                    tutors_payout = merge_payroll_lines(
+                        previous_payroll.tutors_payout,
+                        payroll_data["tutors_payout"],
+                        "tutor_id"
+                    )
                 else:
                     tutors_payout = previous_payroll.tutors_payout
 
@@ -322,7 +340,7 @@ class PayrollService():
             first_payout = False
 
             last_payout_date = admin.last_payout_date
-            today_date = datetime.now()
+            today_date = datetime.now(timezone.utc)
 
             if (last_payout_date is None):
                 first_payout = True
@@ -334,22 +352,24 @@ class PayrollService():
 
             tutors_parsed = {tutor.name: tutor for tutor in tutors_response.response_list}
 
-            for (i, student) in enumerate(students):
+            #calculates the hours of all the students in one pass, only reading the meetings after their cursor
+            students_hours, students_meetings = calculate_hours_by_ledger_batch(
+                [
+                    (student.HistMeetingTimes, student.HistMeetingTimesEnd, student.payroll_meeting_cursor)
+                    for student in students
+                ],
+                None if (first_payout) else last_payout_date,
+                None if (first_payout) else today_date
+            )
+
+            for (student, student_hours, (meetings_first, meetings_last, meeting_cursor)) in zip(
+                    students, students_hours, students_meetings):
                 student: StudentUser = student
 
                 student_meeting_time_start = student.HistMeetingTimes
                 student_meeting_time_end = student.HistMeetingTimesEnd
 
                 if (len(student_meeting_time_start) > 0 and len(student_meeting_time_end) > 0):
-                    student_hours = calculate_hours_spent(
-                        student_meeting_time_start,
-                        student_meeting_time_end
-                    ) if (first_payout) else calculate_hours_spent_by_range(
-                        student_meeting_time_start,
-                        student_meeting_time_end,
-                        last_payout_date,
-                        today_date
-                    )
 
                     student_tutor = tutors_parsed.get(student.Tutor)
                     if (student_tutor is None):
@@ -376,10 +396,17 @@ class PayrollService():
                     admin_profit_amount = (admin_profit_percentage / 100) * student_debt
                     total_admin_profit = total_admin_profit + admin_profit_amount
 
-                    record = StudentDebt(
-                        start_hours=student_meeting_time_start,
-                        end_hours=student_meeting_time_end,
+                    students_to_charge.append(StudentDebtRecord(
+                        meetings_first=meetings_first,
+                        meetings_last=meetings_last,
+                        first_meeting=(
+                            student_meeting_time_start[meetings_first] if (meetings_last > meetings_first) else None
+                        ),
+                        last_meeting=(
+                            student_meeting_time_end[meetings_last - 1] if (meetings_last > meetings_first) else None
+                        ),
                         hours=student_hours,
+                        meeting_cursor=meeting_cursor,
                         student_id=student.id,
                         student_name=student.name,
                         student_debt=student_debt,
@@ -390,61 +417,30 @@ class PayrollService():
                         stripe_customer_id=student.stripe_customer_id,
                         admin_profit=admin_profit_amount,
                         pending_coupon=student.pending_discount_coupon if (student.has_pending_discount_coupon) else None
-                    )
+                    ))
 
-                    #Check if student was already billed
-                    saved_record = None
-                    if (previous_payroll is not None):
-                        saved_record = find_student_debt_by_student_id(
-                            previous_payroll.students_debt,
-                            record.student_id
+                    #Check if it's a new tutor
+                    tutor_payout_record = tutors_payout.get(student_tutor.id)
+                    if (tutor_payout_record is None):
+                        tutor_payout_record = tutors_payout[student_tutor.id] = TutorPayoutRecord(
+                            tutor_id=student_tutor.id,
+                            tutor_name=student_tutor.name,
+                            pending_onboarding=(student_tutor.stripe_subaccount_id is None),
+                            stripe_sub_account_id=student_tutor.stripe_subaccount_id
                         )
+                    tutor_payout_record.add(student_hours, tutor_pay)
 
-                    if (saved_record is None or saved_record.paid):
-                        students_to_charge.append(saved_record if saved_record is not None else record)
-                    else:
-                        students_to_charge.append(record)
-
-                    #Check if it's a new tutor
-                    if (student_tutor.id in tutors_payout):
-                        tutor_payout = tutors_payout[student_tutor.id]
-                        tutor_payout["tutor_payout"] += tutor_pay
-                        tutor_payout["tutor_total_hours"] += student_hours
-                    else:
-                        tutor_pending_onboarding = True if (student_tutor.stripe_subaccount_id is None) else False
-                        tutors_payout[student_tutor.id] = {
-                            "tutor_id": student_tutor.id,
-                            "tutor_name": student_tutor.name,
-                            "tutor_payout": tutor_pay,
-                            "tutor_total_hours": student_hours,
-                            "pending_onboarding": tutor_pending_onboarding,
-                            "sub_account_id": student_tutor.stripe_subaccount_id
-                        }
+            students_to_charge = validate_models(StudentDebt, [record.to_dict() for record in students_to_charge])
+            tutors_payouts = validate_models(TutorPayout, [record.to_dict() for record in tutors_payout.values()])
 
+            #keeps the lines that were already paid in the pending payroll
             if (previous_payroll is not None):
-                tutors_payouts = [
-                    (saved if (saved := find_tutor_pay_by_tutor_id(
-                        previous_payroll.tutors_payout,
-                        tutor_id)) is not None and saved.paid else TutorPayout(
-                        tutor_id=tutor_id,
-                        tutor_name=info.get("tutor_name"),
-                        tutor_payout=info.get("tutor_payout"),
-                        tutor_total_hours=info.get("tutor_total_hours"),
-                        pending_onboarding=info.get("pending_onboarding"),
-                        stripe_sub_account_id=info.get("sub_account_id")
-                    ))
-                    for tutor_id, info in tutors_payout.items()
-                ]
-            else:
-                tutors_payouts = [
-                    TutorPayout(
-                        tutor_id=tutor_id,
-                        tutor_name=info.get("tutor_name"),
-                        tutor_payout=info.get("tutor_payout"),
-                        tutor_total_hours=info.get("tutor_total_hours"),
-                        pending_onboarding=info.get("pending_onboarding"),
-                        stripe_sub_account_id=info.get("sub_account_id")
-                    ) for (tutor_id, info) in tutors_payout.items()]
+                students_to_charge = merge_payroll_lines(
+                    previous_payroll.students_debt,
+                    students_to_charge,
+                    "student_id"
+                )
+                tutors_payouts = merge_payroll_lines(previous_payroll.tutors_payout, tutors_payouts, "tutor_id")
 
             tutors_lost = [
                 TutorNotFound(
@@ -507,6 +503,11 @@ class PayrollService():
                 raise Exception(payroll_response.message)
 
             payroll: Payroll = payroll_response.response
+            if (not payroll.lines_in_subcollections):
+                migrate_response = self.payroll_dao.migrate_payroll_lines(payroll)
+                if (not migrate_response.success):
+                    raise Exception(migrate_response.message)
+
             students_to_charge = payroll.students_debt
 
             new_students_list = []
@@ -529,13 +530,24 @@ class PayrollService():
                     else:
                         student.error = charge_response.message
 
+                    #saves this student right away, only with the fields that changed
+                    line_response = self.payroll_dao.update_student_debt_line(payroll.id, student.student_id, {
+                        "stripe_invoice_id": student.stripe_invoice_id,
+                        "paid": student.paid,
+                        "error": student.error
+                    })
+                    if (not line_response.success):
+                        raise Exception(line_response.message)
+
                 new_students_list.append(student)
 
             all_charged = all(student.paid for student in new_students_list)
             if (all_charged):
                 self.payroll_dao.set_payroll_student_debt_charged(payroll.id)
 
-            response = self.payroll_dao.update_payroll_student_debt(payroll.id, new_students_list)
+            payroll.students_charged = all_charged
+            response.response = payroll.model_dump()
+            response.success = True
         except Exception as e:
             response.message = str(e)
 
@@ -559,6 +571,12 @@ class PayrollService():
 
             if (not payroll.students_charged):
                 raise Exception("must_charge_students_first")
+
+            if (not payroll.lines_in_subcollections):
+                migrate_response = self.payroll_dao.migrate_payroll_lines(payroll)
+                if (not migrate_response.success):
+                    raise Exception(migrate_response.message)
+
             tutors_to_pay = payroll.tutors_payout
 
             new_tutors_to_pay = []
@@ -587,13 +605,25 @@ class PayrollService():
                     else:
                         tutor.error = payout_response.message
 
+                    #saves this tutor right away, only with the fields that changed
+                    line_response = self.payroll_dao.update_tutor_payout_line(payroll.id, tutor.tutor_id, {
+                        "stripe_transference_id": tutor.stripe_transference_id,
+                        "stripe_payout_id": tutor.stripe_payout_id,
+                        "paid": tutor.paid,
+                        "error": tutor.error
+                    })
+                    if (not line_response.success):
+                        raise Exception(line_response.message)
+
                 new_tutors_to_pay.append(tutor)
 
             all_paid = all(tutor.paid for tutor in new_tutors_to_pay)
             if (all_paid):
                 self.payroll_dao.set_payroll_tutors_payout_paid(payroll.id)
 
-            response = self.payroll_dao.update_payroll_tutors_payout(payroll.id, new_tutors_to_pay)
+            payroll.tutors_paid = all_paid
+            response.response = payroll.model_dump()
+            response.success = True
         except Exception as e:
             response.message = str(e)
 
@@ -644,10 +674,22 @@ class PayrollService():
                 if (payout_response.success):
                     payroll.admin_payout.admin_payout_id = payout_response.response["id"]
                     self.payroll_dao.set_payroll_admin_payout_paid(payroll.id)
+                    payroll.admin_paid = True
+                else:
+                    payroll.admin_payout.error = payout_response.message
+
+            if (payroll.admin_paid and not payroll.completed):
+                #the cursors are written before the payroll is completed, if the write fails the payroll stays open
+                #with the error and calling this again retries it, instead of the next payroll billing the meetings
+                cursors_response = self.user_dao.set_payroll_meeting_cursors({
+                    student_debt.student_id: student_debt.meeting_cursor for student_debt in payroll.students_debt
+                })
+
+                if (cursors_response.success):
                     self.payroll_dao.mark_payroll_completed(payroll.id)
                     self.user_dao.update_admin_last_payroll_date(admin.id)
                 else:
-                    payroll.admin_payout.error = payout_response.message
+                    payroll.admin_payout.error = cursors_response.message
 
             response = self.payroll_dao.update_payroll_admin_payout(payroll.id, payroll.admin_payout)
         except Exception as e:
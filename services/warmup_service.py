@@ -0,0 +1,173 @@
+import time
+from os import environ
+from threading import Event, Lock, Thread
+from dao import MembershipDao, CouponsDao
+from entities import Response, StudentUser, TutorUser, Payroll, list_adapter
+from interfaces import StripeInterface
+
+#"off" skips the warm up, the worker is ready at once, e.g. in local development
+WARMUP_ENABLED = environ.get("WARMUP", "on") == "on"
+
+_ready = Event()
+_started = False
+_started_lock = Lock()
+_stages: dict = {}
+
+
+class WarmupService():
+    """
+        Pays the first use costs of a worker before the load balancer sends it requests: the Firestore channel,
+        the catalogs, the pydantic validators and the Stripe connection
+    """
+
+    def __init__(self):
+        self.membership_dao = MembershipDao()
+        self.coupon_dao = CouponsDao()
+        self.stripe = StripeInterface()
+
+    def build_validators(self) -> Response:
+        """
+            Builds the list validators of the models the DAOs read the most, they are built on first use
+        """
+        response = Response()
+
+        try:
+            for model in [StudentUser, TutorUser, Payroll]:
+                list_adapter(model).validate_python([])
+
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def prime_catalogs(self) -> Response:
+        """
+            Reads the memberships and coupons catalogs, the first read opens the Firestore channel and the
+            queries fill the cache of the collections in REPOSITORY_CACHE
+        """
+        response = Response()
+
+        try:
+            memberships_response = self.membership_dao.read_memberships()
+            if (not memberships_response.success):
+                raise Exception(memberships_response.message)
+
+            #the queries of MembershipService.read_memberships for an admin, a tutor and a student. A query
+            #without records answers not found, so their responses are not checked
+            for user in [
+                TutorUser.model_construct(Admin=True, Type="Tutor"),
+                TutorUser.model_construct(Admin=False, Type="Tutor"),
+                StudentUser.model_construct(Admin=False, Type="Student")
+            ]:
+                self.membership_dao.read_enabled_user_memberships(user)
+
+            self.coupon_dao.read_active_coupons()
+
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def open_stripe_connection(self) -> Response:
+        """
+            Makes a cheap Stripe call, it imports stripe and opens the TLS connection its next calls reuse
+        """
+        response = Response()
+
+        try:
+            balance_response = self.stripe.read_balance()
+            if (not balance_response.success):
+                raise Exception(balance_response.message)
+
+            response.success = True
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+    def warm_up(self) -> Response:
+        """
+            Runs every stage, a failed stage doesn't stop the others
+            Returns:
+                response:
+                    response.response: {stage: {"success", "ms", "message"}}
+        """
+        response = Response()
+
+        try:
+            stages = {}
+            for (name, stage) in [
+                ("validators", self.build_validators),
+                ("catalogs", self.prime_catalogs),
+                ("stripe", self.open_stripe_connection),
+            ]:
+                start = time.perf_counter()
+                stage_response = stage()
+                stages[name] = {
+                    "success": stage_response.success,
+                    "ms": round((time.perf_counter() - start) * 1000, 1),
+                    "message": stage_response.message
+                }
+
+            response.response = stages
+            response.success = all(stage["success"] for stage in stages.values())
+        except Exception as e:
+            response.message = str(e)
+
+        return response
+
+
+def _run_warmup():
+    try:
+        _stages.update(WarmupService().warm_up().response)
+    except Exception as e:
+        _stages["warmup"] = {"success": False, "ms": 0.0, "message": str(e)}
+    finally:
+        #a worker that can't reach Firestore or Stripe still serves, the same as without the warm up
+        _ready.set()
+
+
+def start_warmup():
+    """
+        Starts the warm up of the process in a background thread, only the first call starts it
+    """
+    global _started
+    with _started_lock:
+        if (_started):
+            return
+        _started = True
+
+    if (not WARMUP_ENABLED):
+        _ready.set()
+        return
+
+    Thread(target=_run_warmup, name="warmup", daemon=True).start()
+
+
+def is_ready() -> bool:
+    """
+        True once the warm up is done
+    """
+    return _ready.is_set()
+
+
+def read_warmup_stages() -> dict:
+    """
+        Reads the result and time of every stage of the warm up
+        Returns:
+            {stage: {"success", "ms", "message"}}, empty until the warm up is done
+    """
+    return dict(_stages)
+
+
+def reset_warmup():
+    """
+        Forgets the warm up of the parent process in a forked worker, every worker warms its own clients
+    """
+    global _started, _started_lock
+    _started = False
+    _started_lock = Lock()
+    _ready.clear()
+    _stages.clear()
@@ -0,0 +1,155 @@
+import json
+import socket
+import threading
+import time
+import pytest
+import uvicorn
+from asgi import create_asgi_app
+from concurrent.futures import ThreadPoolExecutor
+from controllers import membership
+from dao import open_identity_map, close_identity_map
+from dao.identity_map import get_record, put_record
+from flask import Flask, g
+from repositories import create_repository
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+class TestAsgiApp:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, monkeypatch, mocker):
+        monkeypatch.setenv("REPOSITORY_BACKEND", "memory")
+        monkeypatch.setenv("STRIPE_API", "stripe_api")
+        self.users = create_repository("users")
+        self.users.clear()
+        self.users.set_objects_by_ids({"2": {"id": "2", "CompanyCode": "A", "Type": "Student"}})
+        create_repository("subscriptions").set_objects_by_ids({
+            "s": {
+                "id": "s", "status": "active", "quantity": 1, "payment_random_id": "r", "stripe_subscription_id": "p",
+                "stripe_customer_id": "c", "local_subscription_id": "m", "local_user_id": "2", "start_date": 0,
+                "renewal_date": 0, "admin": False, "company_type": "tutor_group"
+            },
+        })
+        self.flask_app = Flask(__name__)
+        self.flask_app.register_blueprint(membership)
+        self.hooks = []
+
+        @self.flask_app.before_request
+        def start_identity_map():
+            g.identity_map = open_identity_map()
+
+        @self.flask_app.after_request
+        def add_header(response):
+            response.headers["Access-Control-Allow-Origin"] = "*"
+            return response
+
+        @self.flask_app.teardown_request
+        def end_identity_map(error=None):
+            put_record("users", "hook", {"id": "hook"})
+            self.hooks.append(get_record("users", "hook") is not None)
+            close_identity_map(g.pop("identity_map"))
+
+        @self.flask_app.route("/flask_only", methods=["POST"])
+        def flask_only():
+            from flask import request
+            return {"user_id": request.form.get("user_id")}
+
+        @self.flask_app.route("/slow", methods=["GET"])
+        def slow():
+            time.sleep(0.3)
+            return {"success": True}
+
+        #the ASGI app of asgi.py, served by uvicorn on a free port
+        self.start_warmup = mocker.patch("asgi.start_warmup")
+        self.close_replicas = mocker.patch("asgi.close_replicas")
+        app = create_asgi_app(self.flask_app)
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        self.url = "http://127.0.0.1:%d" % listener.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, lifespan="on", log_level="warning"))
+        thread = threading.Thread(target=self.server.run, kwargs={"sockets": [listener]})
+        thread.start()
+        while (not self.server.started and thread.is_alive()):
+            time.sleep(0.01)
+        yield
+        self.server.should_exit = True
+        thread.join()
+        listener.close()
+        self.users.clear()
+
+    def call(self, method: str, path: str, body: bytes = None, headers: dict = None) -> dict:
+        """
+            Sends one http request to the server
+            Returns:
+                {"status", "headers", "body"}
+        """
+        request = Request(self.url + path, data=body, headers=headers or {}, method=method)
+        try:
+            with urlopen(request) as response:
+                return {"status": response.status, "headers": response.headers, "body": response.read()}
+        except HTTPError as error:
+            return {"status": error.code, "headers": error.headers, "body": error.read()}
+
+    #routes
+    def test_route_answers_like_the_flask_app(self):
+        #act
+        response = self.call("GET", "/memberships/read_active_membership?user_id=2")
+        flask_response = self.flask_app.test_client().get("/memberships/read_active_membership?user_id=2")
+
+        #assert
+        assert response["status"] == 200
+        assert response["headers"]["content-type"] == "application/json"
+        assert json.loads(response["body"]) == flask_response.get_json()
+        assert [subscription["id"] for subscription in json.loads(response["body"])["response_list"]] == ["s"]
+
+    def test_route_runs_the_flask_hooks(self):
+        #act
+        response = self.call("GET", "/memberships/read_memberships")
+
+        #assert
+        assert json.loads(response["body"])["message"] == "user_id_is_required"
+        assert response["headers"]["access-control-allow-origin"] == "*"
+        assert self.hooks == [True]
+
+    def test_route_reads_the_form(self):
+        #act
+        response = self.call(
+            "POST",
+            "/flask_only",
+            body=b"user_id=7",
+            headers={"content-type": "application/x-www-form-urlencoded"}
+        )
+
+        #assert
+        assert response["status"] == 200
+        assert json.loads(response["body"]) == {"user_id": "7"}
+
+    def test_unknown_route_is_not_found(self):
+        #act
+        response = self.call("GET", "/missing")
+
+        #assert
+        assert response["status"] == 404
+
+    def test_requests_are_served_concurrently(self):
+        #act
+        start = time.perf_counter()
+        with ThreadPoolExecutor(4) as executor:
+            responses = list(executor.map(lambda _: self.call("GET", "/slow"), range(4)))
+        elapsed = time.perf_counter() - start
+
+        #assert
+        assert [response["status"] for response in responses] == [200] * 4
+        assert elapsed < 1.0 # 1.2 seconds one after the other
+
+    #lifespan
+    def test_lifespan_starts_the_warmup_and_closes_the_replicas(self):
+        #act
+        self.server.should_exit = True
+        deadline = time.monotonic() + 5
+        while (not self.close_replicas.called and time.monotonic() < deadline):
+            time.sleep(0.01)
+
+        #assert
+        self.start_warmup.assert_called_once()
+        self.close_replicas.assert_called_once()
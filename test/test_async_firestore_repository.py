@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from repositories import AsyncFirestoreRepository
+
+
+def async_stream(records: list):
+    async def stream(*args, **kwargs):
+        for record in records:
+            yield record
+
+    return stream
+
+
+class TestAsyncFirestoreRepository:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, mocker):
+        self.collection = "test_collection"
+        self.mock_db = mocker.patch("firebase_admin.firestore_async.client")
+        self.db_instance = AsyncFirestoreRepository(self.collection)
+
+    def mock_record(self, record: dict, path: str = None) -> MagicMock:
+        snapshot = MagicMock()
+        snapshot.id = record["id"]
+        snapshot.exists = True
+        snapshot.to_dict.return_value = record
+        snapshot.reference.path = path
+        return snapshot
+
+    #read_object_by_id
+    def test_read_object_by_id_success(self):
+        #arrange
+        document = self.mock_db.return_value.collection.return_value.document.return_value
+        document.get = AsyncMock(return_value=self.mock_record({"id": "1", "name": "Record 1"}))
+
+        #act
+        response = asyncio.run(self.db_instance.read_object_by_id("1"))
+
+        #assert
+        assert response.success is True
+        assert response.response == {"id": "1", "name": "Record 1"}
+        self.mock_db.return_value.collection.return_value.document.assert_called_once_with("1")
+
+    def test_read_object_by_id_not_found(self):
+        #arrange
+        snapshot = MagicMock()
+        snapshot.exists = False
+        self.mock_db.return_value.collection.return_value.document.return_value.get = AsyncMock(return_value=snapshot)
+
+        #act
+        response = asyncio.run(self.db_instance.read_object_by_id("1"))
+
+        #assert
+        assert response.success is False
+        assert response.message == "no_records_found_in_test_collection"
+
+    #read_objects_with_equal
+    def test_read_objects_with_equal_success(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value
+        query.stream = async_stream([self.mock_record({"id": "1"}), self.mock_record({"id": "2"})])
+
+        #act
+        response = asyncio.run(self.db_instance.read_objects_with_equal("CompanyCode", "A"))
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [{"id": "1"}, {"id": "2"}]
+
+    def test_read_objects_with_equal_not_found(self):
+        #arrange
+        self.mock_db.return_value.collection.return_value.where.return_value.stream = async_stream([])
+
+        #act
+        response = asyncio.run(self.db_instance.read_objects_with_equal("CompanyCode", "A"))
+
+        #assert
+        assert response.success is False
+        assert response.message == "no_records_found_in_test_collection"
+
+    #read_documents
+    def test_read_documents_matches_by_path(self):
+        #arrange
+        def document(object_id):
+            reference = MagicMock()
+            reference.path = f"{self.collection}/{object_id}"
+            return reference
+
+        self.mock_db.return_value.collection.return_value.document.side_effect = document
+        self.mock_db.return_value.get_all = async_stream([
+            self.mock_record({"id": "2"}, f"{self.collection}/2"),
+            self.mock_record({"id": "1"}, f"{self.collection}/1")
+        ])
+
+        #act
+        response = asyncio.run(self.db_instance.read_objects_by_ids(["1", "2", "3"]))
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [{"id": "1"}, {"id": "2"}]
+
+    #update_object_by_id
+    def test_update_object_by_id_reads_back(self):
+        #arrange
+        document = self.mock_db.return_value.collection.return_value.document.return_value
+        document.update = AsyncMock(return_value=MagicMock(update_time=1))
+        document.get = AsyncMock(return_value=self.mock_record({"id": "1", "name": "new"}))
+
+        #act
+        response = asyncio.run(self.db_instance.update_object_by_id("1", {"name": "new"}))
+
+        #assert
+        assert response.success is True
+        assert response.response == {"id": "1", "name": "new"}
+        document.update.assert_awaited_once_with({"name": "new"})
+
+    def test_update_object_by_id_exception(self):
+        #arrange
+        document = self.mock_db.return_value.collection.return_value.document.return_value
+        document.update = AsyncMock(side_effect=Exception("404 No document to update"))
+
+        #act
+        response = asyncio.run(self.db_instance.update_object_by_id("1", {"name": "new"}))
+
+        #assert
+        assert response.success is False
+        assert response.message == "404 No document to update"
+
+    #set_objects_by_ids
+    def test_set_objects_by_ids_in_batches(self):
+        #arrange
+        self.db_instance.BATCH_SIZE = 2
+        batch = self.mock_db.return_value.batch.return_value
+        batch.commit = AsyncMock()
+
+        #act
+        response = asyncio.run(self.db_instance.set_objects_by_ids({"1": {}, "2": {}, "3": {}}))
+
+        #assert
+        assert response.response == 3
+        assert batch.set.call_count == 3
+        assert batch.commit.await_count == 2
@@ -0,0 +1,170 @@
+import asyncio
+import pytest
+from repositories import (
+    AsyncCachingRepository, AsyncFirestoreRepository, AsyncRepositoryAdapter, CachingRepository, InMemoryRepository,
+    clear_caches, create_async_repository, create_repository, read_cache_stats
+)
+from repositories.caching_repository import CACHE_POLICIES
+
+
+class TestCachingRepository:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, mocker):
+        clear_caches()
+        self.memory = InMemoryRepository("memberships")
+        self.memory.clear()
+        self.memory.set_objects_by_ids({
+            "1": {"id": "1", "name": "basic", "active": True},
+            "2": {"id": "2", "name": "premium", "active": False},
+        })
+        self.read_by_id = mocker.spy(self.memory, "read_object_by_id")
+        self.read_with_equal = mocker.spy(self.memory, "read_objects_with_equal")
+        self.repository = CachingRepository(self.memory, CACHE_POLICIES["memberships"])
+        yield
+        self.memory.clear()
+        clear_caches()
+
+    #create_repository
+    def test_create_repository_opt_in_by_collection(self, monkeypatch):
+        #arrange
+        monkeypatch.setenv("REPOSITORY_BACKEND", "memory")
+        monkeypatch.setenv("REPOSITORY_CACHE", "memberships, payroll")
+
+        #act
+        memberships = create_repository("memberships")
+        payroll = create_repository("payroll")
+        users = create_repository("users")
+
+        #assert
+        assert isinstance(memberships, CachingRepository)
+        assert isinstance(payroll, InMemoryRepository) # the payroll policy is no cache
+        assert isinstance(users, InMemoryRepository)
+
+    def test_create_async_repository_caches_the_firestore_reads(self, monkeypatch, mocker):
+        #arrange
+        monkeypatch.setenv("REPOSITORY_BACKEND", "firestore")
+        monkeypatch.setenv("REPOSITORY_CACHE", "memberships")
+        mocker.patch("firebase_admin.firestore_async.client")
+
+        #act
+        memberships = create_async_repository("memberships")
+        users = create_async_repository("users")
+
+        #assert
+        assert isinstance(memberships, AsyncCachingRepository)
+        assert isinstance(memberships.repository, AsyncFirestoreRepository)
+        assert isinstance(users, AsyncFirestoreRepository)
+
+    #read_object_by_id
+    def test_read_object_by_id_reads_once(self):
+        #act
+        first = self.repository.read_object_by_id("1")
+        second = CachingRepository(self.memory, CACHE_POLICIES["memberships"]).read_object_by_id("1")
+
+        #assert
+        assert first.response == second.response == {"id": "1", "name": "basic", "active": True}
+        assert self.read_by_id.call_count == 1
+        assert read_cache_stats()["memberships"]["hit_rate"] == 0.5
+
+    def test_read_object_by_id_returns_a_copy(self):
+        #act
+        self.repository.read_object_by_id("1").response["name"] = "changed"
+
+        #assert
+        assert self.repository.read_object_by_id("1").response["name"] == "basic"
+
+    def test_read_object_by_id_not_found_is_not_cached(self):
+        #act
+        self.repository.read_object_by_id("missing")
+        response = self.repository.read_object_by_id("missing")
+
+        #assert
+        assert response.success is False
+        assert self.read_by_id.call_count == 2
+
+    #read_objects_with_equal
+    def test_read_objects_with_equal_reads_once(self):
+        #act
+        self.repository.read_objects_with_equal("active", True)
+        response = self.repository.read_objects_with_equal("active", True)
+        self.repository.read_objects_with_equal("active", True, ["name"])
+
+        #assert
+        assert [record["id"] for record in response.response_list] == ["1"]
+        assert self.read_with_equal.call_count == 2
+
+    #writes
+    def test_update_object_by_id_invalidates(self):
+        #arrange
+        self.repository.read_object_by_id("2")
+        self.repository.read_objects_with_equal("active", True)
+
+        #act
+        self.repository.update_object_by_id("2", {"active": True})
+        record = self.repository.read_object_by_id("2").response
+        active = self.repository.read_objects_with_equal("active", True).response_list
+
+        #assert
+        assert record["active"] is True
+        assert [membership["id"] for membership in active] == ["1", "2"]
+        assert self.read_by_id.call_count == 2
+        assert self.read_with_equal.call_count == 2
+
+    def test_create_object_invalidates_the_queries(self):
+        #arrange
+        self.repository.read_object_by_id("1")
+        self.repository.read_objects_with_equal("active", True)
+
+        #act
+        self.repository.create_object({"name": "gold", "active": True})
+        active = self.repository.read_objects_with_equal("active", True).response_list
+        self.repository.read_object_by_id("1")
+
+        #assert
+        assert len(active) == 2
+        assert self.read_by_id.call_count == 1
+
+    def test_read_started_before_a_write_is_not_cached(self, mocker):
+        #arrange
+        def read_during_a_write(object_id):
+            response = InMemoryRepository.read_object_by_id(self.memory, object_id)
+            self.repository.update_object_by_id(object_id, {"name": "renamed"})
+            return response
+
+        mocker.patch.object(self.memory, "read_object_by_id", side_effect=read_during_a_write)
+
+        #act
+        self.repository.read_object_by_id("1")
+
+        #assert
+        assert len(self.repository.cache.records) == 0
+
+    #AsyncCachingRepository
+    def test_async_reads_share_the_cache_of_the_collection(self):
+        #arrange
+        async_repository = AsyncCachingRepository(AsyncRepositoryAdapter(self.memory), CACHE_POLICIES["memberships"])
+        self.repository.read_object_by_id("1")
+
+        #act
+        record = asyncio.run(async_repository.read_object_by_id("1")).response
+        asyncio.run(async_repository.read_objects_with_equal("active", True))
+        active = self.repository.read_objects_with_equal("active", True).response_list
+
+        #assert
+        assert record == {"id": "1", "name": "basic", "active": True}
+        assert [membership["id"] for membership in active] == ["1"]
+        assert self.read_by_id.call_count == 1
+        assert self.read_with_equal.call_count == 1
+
+    def test_async_write_invalidates_the_sync_reads(self):
+        #arrange
+        async_repository = AsyncCachingRepository(AsyncRepositoryAdapter(self.memory), CACHE_POLICIES["memberships"])
+        self.repository.read_object_by_id("2")
+
+        #act
+        asyncio.run(async_repository.update_object_by_id("2", {"active": True}))
+        record = self.repository.read_object_by_id("2").response
+
+        #assert
+        assert record["active"] is True
+        assert self.read_by_id.call_count == 2
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from dao import AsyncUserDao, AsyncMembershipDao, AsyncSubscriptionsDao, AsyncCouponsDao, identity_map_scope
+from entities import Coupon, Response, TutorUser, StudentUser
+from repositories import AsyncBaseRepository, AsyncRepositoryAdapter, create_repository
+
+
+class TestAsyncDaos:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, monkeypatch):
+        monkeypatch.setenv("REPOSITORY_BACKEND", "memory")
+        self.users = create_repository("users")
+        self.users.clear()
+        self.users.set_objects_by_ids({
+            "1": {"id": "1", "CompanyCode": "A", "Type": "Tutor", "Admin": True},
+            "2": {"id": "2", "CompanyCode": "A", "Type": "Student"},
+        })
+        create_repository("subscriptions").set_objects_by_ids({
+            "s": {
+                "id": "s", "status": "active", "quantity": 1, "payment_random_id": "r", "stripe_subscription_id": "p",
+                "stripe_customer_id": "c", "local_subscription_id": "m", "local_user_id": "2", "start_date": 0,
+                "renewal_date": 0, "admin": False, "company_type": "tutor_group"
+            },
+        })
+        self.coupons = create_repository("coupons")
+        self.coupons.set_objects_by_ids({
+            "c1": {"id": "c1", "name": "ten", "type_": "percentage", "percent_off": 10.0, "active": True},
+            "c2": {"id": "c2", "name": "old", "type_": "amount", "amount_off": 500, "active": False},
+        })
+        yield
+        self.users.clear()
+
+    def test_async_daos_use_the_adapter(self):
+        #act
+        user_dao = AsyncUserDao()
+
+        #assert
+        assert isinstance(user_dao.repository, AsyncRepositoryAdapter)
+        assert isinstance(user_dao.repository, AsyncBaseRepository)
+
+    def test_reads_are_awaited_together(self):
+        #arrange
+        async def read():
+            with identity_map_scope():
+                return await asyncio.gather(
+                    AsyncUserDao().read_user_by_id("2"),
+                    AsyncUserDao().read_users_of_type_by_company_code("A", "Tutor"),
+                    AsyncUserDao().read_admin_by_company_code("A"),
+                    AsyncSubscriptionsDao().read_active_subscription_by_customer_id("2"),
+                    AsyncMembershipDao().read_membership_by_id("missing")
+                )
+
+        #act
+        (user, tutors, admin, subscriptions, membership) = asyncio.run(read())
+
+        #assert
+        assert isinstance(user.response["user"], StudentUser)
+        assert [tutor.id for tutor in tutors.response_list] == ["1"]
+        assert isinstance(admin.response["user"], TutorUser)
+        assert [subscription.id for subscription in subscriptions.response_list] == ["s"]
+        assert membership.success is False
+
+    def test_read_users_by_ids_uses_the_identity_map(self, mocker):
+        #arrange
+        dao = AsyncUserDao()
+        read = mocker.spy(self.users.__class__, "read_objects_by_ids")
+
+        async def read_twice():
+            with identity_map_scope():
+                await dao.read_users_by_ids(["1", "2"])
+                return await dao.read_users_by_ids(["2", "1"])
+
+        #act
+        response = asyncio.run(read_twice())
+
+        #assert
+        assert list(response.response) == ["2", "1"]
+        assert read.call_count == 1
+
+    def test_read_coupon_by_id_uses_the_identity_map(self, mocker):
+        #arrange
+        dao = AsyncCouponsDao()
+        read = mocker.spy(self.coupons.__class__, "read_object_by_id")
+
+        async def read_twice():
+            with identity_map_scope():
+                await dao.read_coupon_by_id("c1")
+                return await dao.read_coupon_by_id("c1")
+
+        #act
+        response = asyncio.run(read_twice())
+
+        #assert
+        assert isinstance(response.response, Coupon)
+        assert response.response.percent_off == 10.0
+        assert read.call_count == 1
+
+    def test_read_coupon_by_id_not_found(self):
+        #act
+        response = asyncio.run(AsyncCouponsDao().read_coupon_by_id("missing"))
+
+        #assert
+        assert response.success is False
+
+    def test_read_active_coupons(self):
+        #act
+        response = asyncio.run(AsyncCouponsDao().read_active_coupons())
+
+        #assert
+        assert response.success is True
+        assert [coupon.id for coupon in response.response_list] == ["c1"]
+
+    def test_read_admin_by_company_code_read_error(self, mocker):
+        #arrange
+        mocker.patch.object(
+            AsyncRepositoryAdapter,
+            "read_objects_with_filters",
+            mocker.AsyncMock(return_value=Response(message="deadline_exceeded"))
+        )
+
+        #act
+        response = asyncio.run(AsyncUserDao().read_admin_by_company_code("A"))
+
+        #assert
+        assert response.success is False
+        assert response.message == "deadline_exceeded"
@@ -0,0 +1,244 @@
+import pytest
+from unittest.mock import MagicMock
+from dao import PayrollDao
+from entities import Payroll, AdminPayout, StudentDebt, TutorPayout
+
+
+class TestPayrollDao:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, mocker):
+        self.mock_db = mocker.patch("firebase_admin.firestore.client")
+        self.dao = PayrollDao()
+
+        self.student_debt = StudentDebt(
+            meetings_first=3,
+            meetings_last=5,
+            meetings_count=2,
+            hours=2.5,
+            student_id="student_1",
+            student_name="Student 1",
+            student_debt=15000,
+            tutor_id="tutor_1",
+            tutor_name="Tutor 1",
+            tutor_cost=6000,
+            admin_profit=5000,
+            pending_onboarding=False
+        )
+        self.tutor_payout = TutorPayout(
+            tutor_id="tutor_1",
+            tutor_name="Tutor 1",
+            tutor_payout=10000,
+            tutor_total_hours=2.5,
+            pending_onboarding=False
+        )
+
+    def mock_document(self, data: dict) -> MagicMock:
+        document = MagicMock()
+        document.exists = True
+        document.to_dict.return_value = data
+        return document
+
+    #create_payroll
+    def test_create_payroll_saves_lines_apart(self):
+        #arrange
+        payroll = Payroll(
+            company_code="COMPANY",
+            admin_id="admin",
+            admin_payout=AdminPayout(),
+            students_debt=[self.student_debt],
+            tutors_payout=[self.tutor_payout]
+        )
+        collection = self.mock_db.return_value.collection
+        collection.return_value.document.return_value.id = "payroll_1"
+        collection.return_value.document.return_value.set.return_value.update_time = 123
+
+        #act
+        response = self.dao.create_payroll(payroll)
+
+        #assert
+        assert response.success is True
+        assert response.response.id == "payroll_1"
+        assert response.response.students_debt == [self.student_debt]
+
+        summary = collection.return_value.document.return_value.set.call_args.args[0]
+        assert summary["students_debt"] == [] and summary["tutors_payout"] == []
+        assert summary["lines_in_subcollections"] is True
+        assert summary["students_debt_count"] == 1
+
+        collection.assert_any_call("payroll/payroll_1/students_debt")
+        collection.assert_any_call("payroll/payroll_1/tutors_payout")
+        assert self.mock_db.return_value.batch.return_value.set.call_count == 2
+
+    #update_payroll_by_id
+    def test_update_payroll_by_id_writes_the_summary_last(self):
+        #arrange
+        payroll = Payroll(
+            company_code="COMPANY",
+            admin_id="admin",
+            admin_payout=AdminPayout(),
+            students_debt=[self.student_debt],
+            tutors_payout=[self.tutor_payout]
+        )
+        writes = []
+        collection = self.mock_db.return_value.collection
+        collection.return_value.stream.return_value = []
+        collection.return_value.document.return_value.get.return_value = self.mock_document({"id": "payroll_1"})
+        collection.return_value.document.return_value.update.side_effect = lambda data: writes.append("summary") or MagicMock()
+        self.mock_db.return_value.batch.return_value.commit.side_effect = lambda: writes.append("lines")
+
+        #act
+        response = self.dao.update_payroll_by_id("payroll_1", payroll)
+
+        #assert
+        assert response.success is True
+        assert response.response["students_debt"] == [self.student_debt.model_dump()]
+        assert writes == ["lines", "lines", "summary"]
+
+    def test_update_payroll_by_id_lines_exception(self):
+        #arrange
+        payroll = Payroll(
+            company_code="COMPANY",
+            admin_id="admin",
+            admin_payout=AdminPayout(),
+            students_debt=[self.student_debt]
+        )
+        collection = self.mock_db.return_value.collection
+        collection.return_value.stream.return_value = []
+        self.mock_db.return_value.batch.return_value.commit.side_effect = Exception("write_failed")
+
+        #act
+        response = self.dao.update_payroll_by_id("payroll_1", payroll)
+
+        #assert
+        assert response.success is False
+        assert response.message == "write_failed"
+        collection.return_value.document.return_value.update.assert_not_called()
+
+    #read_payroll_by_id
+    def test_read_payroll_by_id_loads_lines(self):
+        #arrange
+        collection = self.mock_db.return_value.collection
+        collection.return_value.document.return_value.get.return_value = self.mock_document({
+            "id": "payroll_1",
+            "company_code": "COMPANY",
+            "admin_id": "admin",
+            "admin_payout": AdminPayout().model_dump(),
+            "lines_in_subcollections": True
+        })
+        collection.return_value.stream.side_effect = [
+            [self.mock_document(self.student_debt.model_dump())],
+            [self.mock_document(self.tutor_payout.model_dump())]
+        ]
+
+        #act
+        response = self.dao.read_payroll_by_id("payroll_1")
+
+        #assert
+        assert response.success is True
+        assert response.response.students_debt == [self.student_debt]
+        assert response.response.tutors_payout == [self.tutor_payout]
+        collection.assert_any_call("payroll/payroll_1/students_debt")
+
+    def test_read_payroll_by_id_embedded_lines(self):
+        #arrange
+        legacy_line = {
+            **self.student_debt.model_dump(),
+            "start_hours": ["2024-01-01T10:00:00Z"],
+            "end_hours": ["2024-01-01T12:00:00Z"]
+        }
+        collection = self.mock_db.return_value.collection
+        collection.return_value.document.return_value.get.return_value = self.mock_document({
+            "id": "payroll_1",
+            "company_code": "COMPANY",
+            "admin_id": "admin",
+            "admin_payout": AdminPayout().model_dump(),
+            "students_debt": [legacy_line]
+        })
+
+        #act
+        response = self.dao.read_payroll_by_id("payroll_1")
+
+        #assert
+        assert response.success is True
+        assert response.response.students_debt == [self.student_debt]
+        collection.return_value.stream.assert_not_called()
+
+    #update_payroll_student_debt
+    def test_update_payroll_student_debt_writes_lines(self):
+        #arrange
+        collection = self.mock_db.return_value.collection
+        collection.return_value.document.return_value.get.return_value = self.mock_document({
+            "id": "payroll_1",
+            "lines_in_subcollections": True
+        })
+
+        #act
+        response = self.dao.update_payroll_student_debt("payroll_1", [self.student_debt])
+
+        #assert
+        assert response.success is True
+        assert response.response["students_debt"] == [self.student_debt.model_dump()]
+        collection.return_value.document.return_value.update.assert_not_called()
+        self.mock_db.return_value.batch.return_value.commit.assert_called_once()
+
+    def test_update_payroll_student_debt_migrates_embedded_lines(self):
+        #arrange
+        collection = self.mock_db.return_value.collection
+        collection.return_value.document.return_value.get.return_value = self.mock_document({
+            "id": "payroll_1",
+            "company_code": "COMPANY",
+            "admin_id": "admin",
+            "admin_payout": AdminPayout().model_dump(),
+            "students_debt": [self.student_debt.model_dump()],
+            "tutors_payout": [self.tutor_payout.model_dump()]
+        })
+        collection.return_value.document.return_value.update.return_value.update_time = 123
+
+        #act
+        response = self.dao.update_payroll_student_debt("payroll_1", [self.student_debt])
+
+        #assert
+        assert response.success is True
+        assert response.response["lines_in_subcollections"] is True
+        assert response.response["tutors_payout"] == [self.tutor_payout.model_dump()]
+        assert self.mock_db.return_value.batch.return_value.set.call_count == 2
+        collection.return_value.document.return_value.update.assert_called_once()
+
+    def test_update_payroll_student_debt_exception(self):
+        #arrange
+        exception = "Database error"
+        self.mock_db.return_value.batch.return_value.commit.side_effect = Exception(exception)
+
+        #act
+        response = self.dao.update_payroll_student_debt("payroll_1", [self.student_debt])
+
+        #assert
+        assert response.success is False
+        assert response.message == exception
+
+    #update_student_debt_line
+    def test_update_student_debt_line(self):
+        #act
+        response = self.dao.update_student_debt_line("payroll_1", "student_1", {"paid": True})
+
+        #assert
+        assert response.success is True
+        self.mock_db.return_value.collection.assert_called_with("payroll/payroll_1/students_debt")
+        self.mock_db.return_value.collection.return_value.document.assert_called_with("student_1")
+        self.mock_db.return_value.batch.return_value.update.assert_called_once_with(
+            self.mock_db.return_value.collection.return_value.document.return_value,
+            {"paid": True}
+        )
+
+    #update_tutor_payout_line
+    def test_update_tutor_payout_line_exception(self):
+        #arrange
+        exception = "404 No document to update"
+        self.mock_db.return_value.batch.return_value.commit.side_effect = Exception(exception)
+
+        #act
+        response = self.dao.update_tutor_payout_line("payroll_1", "tutor_1", {"paid": True})
+
+        #assert
+        assert response.success is False
+        assert response.message == exception
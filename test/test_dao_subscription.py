@@ -347,3 +347,54 @@ class TestSubscriptionDao():
         assert response.message == "no_records_found_in_subscriptions"
         self.mock_db.return_value.collection.return_value.where.return_value.stream.assert_called()
 
+
+    #update subscription
+    def test_update_subscription_by_id_without_reading(self):
+        #arrange
+        batch = self.mock_db.return_value.batch.return_value
+
+        #act
+        response = self.dao.update_subscription_by_id("subscription_id", 5, 3)
+
+        #assert
+        assert response.success is True
+        self.mock_db.return_value.collection.return_value.document.return_value.get.assert_not_called()
+        history = batch.set.call_args[0][1]["entries"]
+        assert [(change["before"], change["after"]) for change in history] == [(3, 5)]
+        assert batch.update.call_args[0][1] == {"quantity": 5}
+        self.mock_db.return_value.collection.assert_any_call("subscriptions/subscription_id/prorate_data")
+        batch.commit.assert_called_once()
+
+    def test_update_subscription_by_id_reads_the_previous_quantity(self):
+        #arrange
+        batch = self.mock_db.return_value.batch.return_value
+        self.dao.read_active_subscription_by_id = MagicMock(
+            return_value=MagicMock(success=True, response=MagicMock(quantity=2))
+        )
+
+        #act
+        response = self.dao.update_subscription_by_id("subscription_id", 4)
+
+        #assert
+        assert response.success is True
+        assert batch.set.call_args[0][1]["entries"][0]["before"] == 2
+
+    #read_prorate_data
+    def test_read_prorate_data_inline_and_history(self):
+        #arrange
+        collection = self.mock_db.return_value.collection.return_value
+        collection.document.return_value.get.return_value.exists = True
+        collection.document.return_value.get.return_value.to_dict.return_value = {
+            "id": "subscription_id",
+            "prorate_data": [{"before": 1, "after": 2}]
+        }
+        history = MagicMock()
+        history.to_dict.return_value = {"entries": [{"before": 2, "after": 3}]}
+        collection.order_by.return_value.stream.return_value = [history]
+
+        #act
+        response = self.dao.read_prorate_data("subscription_id")
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [{"before": 1, "after": 2}, {"before": 2, "after": 3}]
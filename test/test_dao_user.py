@@ -0,0 +1,308 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from dao import UserDao, identity_map_scope, prefetch_records
+from entities import StudentUser, TutorUser, PayrollStudent
+
+
+class TestUserDao:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, mocker):
+        self.mock_db = mocker.patch("firebase_admin.firestore.client")
+        self.dao = UserDao()
+
+    def mock_record(self, record: dict) -> MagicMock:
+        snapshot = MagicMock()
+        snapshot.id = record["id"]
+        snapshot.to_dict.return_value = record
+        return snapshot
+
+    #read_user_by_id
+    def test_read_user_by_id_reads_once_by_request(self):
+        #arrange
+        document = self.mock_db.return_value.collection.return_value.document.return_value
+        document.get.return_value = self.mock_record({"id": "1", "Type": "Student", "HistMeetingTimes": []})
+
+        #act
+        with identity_map_scope():
+            first = self.dao.read_user_by_id("1")
+            first.response["user"].HistMeetingTimes.append(datetime(2024, 3, 1))
+            second = self.dao.read_user_by_id("1")
+
+        #assert
+        assert first.success is True and second.success is True
+        assert first.response["user"] is not second.response["user"]
+        assert second.response["user"].HistMeetingTimes == []
+        document.get.assert_called_once()
+
+    def test_read_user_by_id_after_a_write(self):
+        #arrange
+        document = self.mock_db.return_value.collection.return_value.document.return_value
+        document.get.return_value = self.mock_record({"id": "1", "Type": "Student"})
+
+        #act
+        with identity_map_scope():
+            self.dao.read_user_by_id("1")
+            self.dao.save_stripe_customer_id("1", "cus_1")
+            reads_before = document.get.call_count
+            self.dao.read_user_by_id("1")
+            reads_after_the_write = document.get.call_count - reads_before
+            self.dao.set_payroll_meeting_cursors({"1": 3})
+            self.dao.read_user_by_id("1")
+            reads_after_the_cursors = document.get.call_count - reads_before - reads_after_the_write
+
+        #assert
+        assert reads_after_the_write == 1
+        assert reads_after_the_cursors == 1
+
+    def test_read_user_by_id_outside_a_request(self):
+        #arrange
+        document = self.mock_db.return_value.collection.return_value.document.return_value
+        document.get.return_value = self.mock_record({"id": "1", "Type": "Student"})
+
+        #act
+        self.dao.read_user_by_id("1")
+        self.dao.read_user_by_id("1")
+
+        #assert
+        assert document.get.call_count == 2
+
+    #read_users_by_ids
+    def mock_get_all(self, records: list):
+        def get_all(references):
+            snapshots = []
+            for record in records:
+                snapshot = self.mock_record(record)
+                snapshot.reference.path = "users/" + record["id"]
+                snapshot.exists = True
+                snapshots.append(snapshot)
+            return snapshots
+
+        self.mock_db.return_value.collection.return_value.document.side_effect = \
+            lambda object_id: MagicMock(path="users/" + object_id)
+        self.mock_db.return_value.get_all.side_effect = get_all
+
+    def test_read_users_by_ids(self):
+        #arrange
+        self.mock_get_all([{"id": "2", "Type": "Tutor"}, {"id": "1", "Type": "Student"}])
+
+        #act
+        response = self.dao.read_users_by_ids(["1", "2", "missing"])
+
+        #assert
+        assert response.success is True
+        assert list(response.response) == ["1", "2"]
+        assert isinstance(response.response["1"]["user"], StudentUser)
+        assert response.response["2"]["type"] == "Tutor"
+        self.mock_db.return_value.get_all.assert_called_once()
+
+    def test_prefetch_records_serves_the_reads_by_id(self):
+        #arrange
+        self.mock_get_all([{"id": "1", "Type": "Student"}, {"id": "2", "Type": "Tutor"}])
+        document = self.mock_db.return_value.collection.return_value.document
+
+        #act
+        with identity_map_scope():
+            prefetch_records([("users", "1"), ("users", "2")])
+            user_response = self.dao.read_user_by_id("1")
+            users_response = self.dao.read_users_by_ids(["1", "2"])
+
+        #assert
+        assert user_response.response["user"].id == "1"
+        assert list(users_response.response) == ["1", "2"]
+        self.mock_db.return_value.get_all.assert_called_once()
+        assert document.call_count == 2
+
+    #save_coupon_applied
+    def test_save_coupon_applied_appends_to_the_history(self):
+        #arrange
+        batch = self.mock_db.return_value.batch.return_value
+
+        #act
+        response = self.dao.save_coupon_applied("1", "coupon_1")
+
+        #assert
+        assert response.success is True
+        self.mock_db.return_value.collection.return_value.document.return_value.get.assert_not_called()
+        self.mock_db.return_value.collection.assert_any_call("users/1/subscription_coupons_applied")
+        assert [coupon["coupon_id"] for coupon in batch.set.call_args[0][1]["entries"]] == ["coupon_1"]
+        batch.update.assert_not_called()
+
+    def test_save_coupon_applied_exception(self):
+        #arrange
+        self.mock_db.return_value.batch.return_value.commit.side_effect = Exception("write_failed")
+
+        #act
+        response = self.dao.save_coupon_applied("1", "coupon_1")
+
+        #assert
+        assert response.success is False
+        assert response.message == "write_failed"
+
+    #archive_billed_meetings
+    def test_archive_billed_meetings_moves_the_cursor_back(self):
+        #arrange
+        starts = [datetime(2024, 3, day) for day in range(1, 6)]
+        ends = [datetime(2024, 3, day, 1) for day in range(1, 5)]
+        snapshot = self.mock_db.return_value.collection.return_value.document.return_value.get.return_value
+        snapshot.exists = True
+        snapshot.to_dict.return_value = {
+            "id": "1",
+            "HistMeetingTimes": starts,
+            "HistMeetingTimesEnd": ends,
+            "payroll_meeting_cursor": 3
+        }
+        batch = self.mock_db.return_value.batch.return_value
+
+        #act
+        response = self.dao.archive_billed_meetings("1")
+
+        #assert
+        assert response.success is True
+        assert batch.set.call_args[0][1] == {"HistMeetingTimes": starts[:3], "HistMeetingTimesEnd": ends[:3]}
+        assert batch.update.call_args[0][1] == {
+            "HistMeetingTimes": starts[3:],
+            "HistMeetingTimesEnd": ends[3:],
+            "payroll_meeting_cursor": 0
+        }
+        self.mock_db.return_value.collection.assert_any_call("users/1/meetings")
+
+    #read_all_users_by_company_code
+    def test_read_all_users_by_company_code_keeps_the_order(self):
+        #arrange
+        self.mock_db.return_value.collection.return_value.where.return_value.stream.return_value = [
+            self.mock_record({"id": "1", "Type": "Student"}),
+            self.mock_record({"id": "2", "Type": "Tutor"}),
+            self.mock_record({"id": "3", "Type": "Individual"})
+        ]
+
+        #act
+        response = self.dao.read_all_users_by_company_code("COMPANY")
+
+        #assert
+        assert response.success is True
+        assert [(record["type"], record["user"].id) for record in response.response_list] == [
+            ("Student", "1"), ("Tutor", "2"), ("Individual", "3")
+        ]
+        assert isinstance(response.response_list[1]["user"], TutorUser)
+        assert isinstance(response.response_list[2]["user"], StudentUser)
+
+    #read_admin_by_company_code
+    def test_read_admin_by_company_code(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value.where.return_value
+        query.limit.return_value.stream.return_value = [self.mock_record({"id": "1", "Type": "Tutor", "Admin": True})]
+
+        #act
+        response = self.dao.read_admin_by_company_code("COMPANY")
+
+        #assert
+        assert response.success is True
+        assert response.response["type"] == "Tutor"
+        assert isinstance(response.response["user"], TutorUser)
+        assert response.response["user"].Admin is True
+        query.limit.assert_called_once_with(1)
+
+    def test_read_admin_by_company_code_not_found(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value.where.return_value
+        query.limit.return_value.stream.return_value = []
+
+        #act
+        response = self.dao.read_admin_by_company_code("COMPANY")
+
+        #assert
+        assert response.success is False
+        assert response.message == "admin_not_found"
+
+    def test_read_admin_by_company_code_read_error(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value.where.return_value
+        query.limit.return_value.stream.side_effect = Exception("missing_index")
+
+        #act
+        response = self.dao.read_admin_by_company_code("COMPANY")
+
+        #assert
+        assert response.success is False
+        assert response.message == "missing_index"
+
+    #iterate_users_by_company_code
+    def test_iterate_users_by_company_code_pages(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value.order_by.return_value
+        query.limit.return_value.stream.return_value = [
+            self.mock_record({"id": "1", "Type": "Student"}),
+            self.mock_record({"id": "2", "Type": "Tutor"})
+        ]
+        query.start_after.return_value.limit.return_value.stream.return_value = [
+            self.mock_record({"id": "3", "Type": "Student", "Admin": True}),
+            self.mock_record({"id": "4", "Type": "Student"}),
+            self.mock_record({"id": "5", "Type": "Individual"})
+        ]
+
+        #act
+        pages = list(self.dao.iterate_users_by_company_code("COMPANY", "Student", page_size=2))
+
+        #assert
+        assert [[student.id for student in page] for page in pages] == [["1"], ["4"]]
+        assert all(isinstance(student, StudentUser) for page in pages for student in page)
+        query.start_after.assert_called_once_with({"__name__": "2"})
+
+    def test_iterate_users_by_company_code_tutors(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value.order_by.return_value
+        query.limit.return_value.stream.return_value = [
+            self.mock_record({"id": "1", "Type": "Student"}),
+            self.mock_record({"id": "2", "Type": "Tutor", "Admin": True})
+        ]
+        query.start_after.return_value.limit.return_value.stream.return_value = []
+
+        #act
+        pages = list(self.dao.iterate_users_by_company_code("COMPANY", "Tutor", page_size=2))
+
+        #assert
+        assert len(pages) == 1
+        assert isinstance(pages[0][0], TutorUser)
+        assert pages[0][0].id == "2"
+
+    def test_iterate_users_by_company_code_payroll_fields(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value.order_by.return_value
+        query.select.return_value.limit.return_value.stream.return_value = [
+            self.mock_record({"id": "1", "Type": "Individual", "Tutor": "Tutor 1"})
+        ]
+
+        #act
+        pages = list(self.dao.iterate_users_by_company_code("COMPANY", "Individual", payroll_fields=True))
+
+        #assert
+        assert pages == [[PayrollStudent(id="1", Type="Individual", Tutor="Tutor 1")]]
+        fields = query.select.call_args.args[0]
+        assert "HistMeetingTimes" in fields and "Notepad" not in fields
+
+    def test_iterate_users_by_company_code_exception(self):
+        #arrange
+        exception = "Database error"
+        self.mock_db.return_value.collection.side_effect = Exception(exception)
+
+        #act
+        with pytest.raises(Exception) as error:
+            list(self.dao.iterate_users_by_company_code("COMPANY", "Student"))
+
+        #assert
+        assert str(error.value) == exception
+
+    #set_payroll_meeting_cursors
+    def test_set_payroll_meeting_cursors(self):
+        #act
+        response = self.dao.set_payroll_meeting_cursors({"student_1": 12, "student_2": 4})
+
+        #assert
+        assert response.success is True
+        assert response.response == 2
+        self.mock_db.return_value.batch.return_value.update.assert_called_with(
+            self.mock_db.return_value.collection.return_value.document.return_value,
+            {"payroll_meeting_cursor": 4}
+        )
+        self.mock_db.return_value.batch.return_value.commit.assert_called_once()
@@ -0,0 +1,113 @@
+import pytest
+from dao import UserDao, user_replica
+from entities import StudentUser, TutorUser
+from repositories import create_repository
+
+
+class TestUserReplica:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, monkeypatch):
+        monkeypatch.setenv("REPOSITORY_BACKEND", "memory")
+        monkeypatch.setattr(user_replica, "REPLICA_ENABLED", True)
+        self.repository = create_repository("users")
+        self.repository.clear()
+        self.repository.set_objects_by_ids({
+            "1": {"id": "1", "CompanyCode": "A", "Type": "Tutor", "name": "tutor"},
+            "2": {"id": "2", "CompanyCode": "A", "Type": "Student", "Admin": True, "name": "admin"},
+            "3": {"id": "3", "CompanyCode": "A", "Type": "Student", "name": "student"},
+            "4": {"id": "4", "CompanyCode": "B", "Type": "Student", "name": "other"},
+        })
+        self.dao = UserDao()
+        yield
+        user_replica.close_replicas()
+        self.repository.clear()
+
+    #read_company_users
+    def test_read_company_users_indexes(self):
+        #act
+        replica = user_replica.read_company_users("A")
+
+        #assert
+        assert [record["id"] for record in replica.read_users()] == ["1", "2", "3"]
+        assert [record["id"] for record in replica.read_users_by_type("Student")] == ["2", "3"]
+        assert [record["id"] for record in replica.read_users_by_name("tutor")] == ["1"]
+        assert [record["id"] for record in replica.read_admins()] == ["2"]
+
+    def test_read_company_users_follows_the_writes(self):
+        #arrange
+        replica = user_replica.read_company_users("A")
+
+        #act
+        self.repository.update_object_by_id("1", {"Type": "Student"})
+        self.repository.update_object_by_id("3", {"CompanyCode": "B"})
+        self.repository.create_object({"CompanyCode": "A", "Type": "Tutor", "Admin": True})
+
+        #assert
+        assert len(replica.read_users_by_type("Tutor")) == 1
+        assert [record["id"] for record in replica.read_users_by_type("Student")] == ["1", "2"]
+        assert len(replica.read_admins()) == 2
+
+    def test_read_company_users_restarts_a_stopped_listener(self):
+        #arrange
+        replica = user_replica.read_company_users("A")
+
+        #act
+        replica.watch.unsubscribe()
+        new_replica = user_replica.read_company_users("A")
+
+        #assert
+        assert new_replica is not replica
+        assert new_replica.watch.is_active is True
+
+    def test_read_company_users_drops_the_least_recent(self, monkeypatch):
+        #arrange
+        monkeypatch.setattr(user_replica, "MAX_COMPANIES", 1)
+        replica = user_replica.read_company_users("A")
+
+        #act
+        user_replica.read_company_users("B")
+
+        #assert
+        assert replica.watch.is_active is False
+
+    def test_read_company_users_disabled(self, monkeypatch):
+        #arrange
+        monkeypatch.setattr(user_replica, "REPLICA_ENABLED", False)
+
+        #act
+        replica = user_replica.read_company_users("A")
+
+        #assert
+        assert replica is None
+
+    def test_forget_replicas_keeps_the_listeners(self):
+        #arrange
+        replica = user_replica.read_company_users("A")
+
+        #act
+        user_replica.forget_replicas()
+        new_replica = user_replica.read_company_users("A")
+
+        #assert
+        assert replica.watch.is_active is True
+        assert new_replica is not replica
+        replica.watch.unsubscribe()
+
+    #UserDao
+    def test_user_dao_reads_from_the_replica(self, mocker):
+        #arrange
+        user_replica.read_company_users("A")
+        query = mocker.spy(self.dao.repository, "read_objects_with_equal")
+
+        #act
+        tutors = self.dao.read_tutors_by_company_code("A").response_list
+        students = self.dao.read_students_by_company_code("A").response_list
+        admin = self.dao.read_admin_by_company_code("A").response["user"]
+        pages = list(self.dao.iterate_users_by_company_code("A", "Student", page_size=1, payroll_fields=True))
+
+        #assert
+        assert [tutor.id for tutor in tutors] == ["1"] and isinstance(tutors[0], TutorUser)
+        assert [student.id for student in students] == ["3"] and isinstance(students[0], StudentUser)
+        assert admin.id == "2"
+        assert [[student.id for student in page] for page in pages] == [["3"]]
+        query.assert_not_called()
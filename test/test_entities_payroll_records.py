@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+from entities import StudentDebt, TutorPayout, StudentDebtRecord, TutorPayoutRecord, validate_models
+
+
+class TestPayrollRecords:
+
+    #StudentDebtRecord
+    def test_student_debt_record_to_dict(self):
+        #arrange
+        record = StudentDebtRecord(
+            hours=1.5,
+            student_id="student_1",
+            student_name="Student",
+            student_debt=3000,
+            tutor_id="tutor_1",
+            tutor_name="Tutor",
+            tutor_cost=2000,
+            admin_profit=600,
+            pending_onboarding=False,
+            meetings_first=2,
+            meetings_last=5,
+            first_meeting=datetime(2024, 3, 1, tzinfo=timezone.utc),
+            meeting_cursor=4
+        )
+
+        #act
+        student_debt = validate_models(StudentDebt, [record.to_dict()])[0]
+
+        #assert
+        assert not hasattr(record, "__dict__")
+        assert student_debt.meetings_count == 3
+        assert student_debt.meeting_cursor == 4
+        assert student_debt.student_debt == 3000
+        assert student_debt.paid is False
+
+    #TutorPayoutRecord
+    def test_tutor_payout_record_adds_the_students(self):
+        #arrange
+        record = TutorPayoutRecord(tutor_id="tutor_1", tutor_name="Tutor", pending_onboarding=False)
+
+        #act
+        record.add(1.5, 1500)
+        record.add(2.0, 2000)
+        tutor_payout = validate_models(TutorPayout, [record.to_dict()])[0]
+
+        #assert
+        assert (tutor_payout.tutor_total_hours, tutor_payout.tutor_payout) == (3.5, 3500)
+        assert tutor_payout.tutor_id == "tutor_1"
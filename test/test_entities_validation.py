@@ -0,0 +1,40 @@
+import pytest
+from pydantic import ValidationError
+from entities import TutorPayout, list_adapter, validate_models
+
+
+class TestValidation:
+
+    #list_adapter
+    def test_list_adapter_is_built_once(self):
+        #act
+        first = list_adapter(TutorPayout)
+        second = list_adapter(TutorPayout)
+
+        #assert
+        assert first is second
+
+    #validate_models
+    def test_validate_models(self):
+        #arrange
+        records = [
+            {
+                "tutor_id": str(index),
+                "tutor_name": f"Tutor {index}",
+                "tutor_payout": index * 100,
+                "tutor_total_hours": index,
+                "pending_onboarding": False
+            }
+            for index in range(1, 3)
+        ]
+
+        #act
+        payouts = validate_models(TutorPayout, records)
+
+        #assert
+        assert payouts == [TutorPayout.model_validate(record) for record in records]
+
+    def test_validate_models_invalid_record(self):
+        #act
+        with pytest.raises(ValidationError):
+            validate_models(TutorPayout, [{"tutor_id": "1"}])
@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import MagicMock
 from repositories import FirestoreRepository
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition
 
 
 class TestFirestoreRepository:
@@ -159,6 +161,158 @@ class TestFirestoreRepository:
         self.mock_db.return_value.collection.return_value.document.assert_called_once_with(_id)
         self.mock_db.return_value.collection.return_value.document.return_value.get.assert_called()
 
+    #read_objects_by_ids / read_documents
+    def mock_documents(self, records: dict):
+        #every collection(name).document(id) is a reference with its own path, get_all answers in any order
+        def collection(name):
+            reference = MagicMock()
+            reference.document.side_effect = lambda object_id: MagicMock(path=name + "/" + object_id)
+            return reference
+
+        def get_all(references):
+            snapshots = []
+            for reference in reversed(references):
+                snapshot = MagicMock(reference=reference, exists=reference.path in records)
+                snapshot.to_dict.return_value = records.get(reference.path)
+                snapshots.append(snapshot)
+            return snapshots
+
+        self.mock_db.return_value.collection.side_effect = collection
+        self.mock_db.return_value.get_all.side_effect = get_all
+
+    def test_read_objects_by_ids_success(self):
+        #arrange
+        self.mock_documents({
+            self.collection + "/1": {"id": "1"},
+            self.collection + "/2": {"id": "2"}
+        })
+
+        #act
+        response = self.db_instance.read_objects_by_ids(["2", "missing", "1", "2"])
+
+        #assert
+        assert response.success is True
+        assert response.response == {"1": {"id": "1"}, "2": {"id": "2"}}
+        assert response.response_list == [{"id": "2"}, {"id": "1"}]
+        self.mock_db.return_value.get_all.assert_called_once()
+        assert len(self.mock_db.return_value.get_all.call_args[0][0]) == 3
+
+    def test_read_documents_of_several_collections(self):
+        #arrange
+        self.mock_documents({"users/1": {"id": "1", "Type": "Student"}, "memberships/1": {"id": "1"}})
+
+        #act
+        response = self.db_instance.read_documents([("users", "1"), ("memberships", "1"), ("coupons", "1")])
+
+        #assert
+        assert response.success is True
+        assert response.response == {("users", "1"): {"id": "1", "Type": "Student"}, ("memberships", "1"): {"id": "1"}}
+        self.mock_db.return_value.get_all.assert_called_once()
+
+    def test_read_documents_without_documents(self):
+        #act
+        response = self.db_instance.read_documents([])
+
+        #assert
+        assert response.success is True
+        assert response.response == {}
+        self.mock_db.return_value.get_all.assert_not_called()
+
+    def test_read_objects_by_ids_exception(self):
+        #arrange
+        exception = "Database Error"
+        self.mock_db.return_value.get_all.side_effect = Exception(exception)
+
+        #act
+        response = self.db_instance.read_objects_by_ids(["1"])
+
+        #assert
+        assert response.success is False
+        assert response.message == exception
+
+    #read_collection_page
+    def test_read_collection_page(self):
+        #arrange
+        records = [MagicMock(id=str(index)) for index in range(2)]
+        for record in records:
+            record.to_dict.return_value = {"id": record.id}
+        query = self.mock_db.return_value.collection.return_value.order_by.return_value
+        query.start_after.return_value.select.return_value.limit.return_value.stream.return_value = records
+
+        #act
+        response = self.db_instance.read_collection_page(2, "0", fields=["name"])
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [{"id": "0"}, {"id": "1"}]
+        assert response.response == "1"
+        query.start_after.assert_called_once_with({"__name__": "0"})
+
+    #append_history / read_history
+    def test_append_history_with_record_update(self):
+        #arrange
+        batch = self.mock_db.return_value.batch.return_value
+
+        #act
+        response = self.db_instance.append_history("id1", "changes", [{"value": 1}], data={"total": 1})
+
+        #assert
+        assert response.success is True
+        self.mock_db.return_value.collection.assert_any_call(self.collection + "/id1/changes")
+        assert batch.set.call_args[0][1] == {"entries": [{"value": 1}]}
+        assert batch.update.call_args[0][1] == {"total": 1}
+        batch.commit.assert_called_once()
+
+    def test_read_history(self):
+        #arrange
+        document = MagicMock()
+        document.to_dict.return_value = {"entries": [{"value": 1}]}
+        self.mock_db.return_value.collection.return_value.order_by.return_value.stream.return_value = [document]
+
+        #act
+        response = self.db_instance.read_history("id1", "changes")
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [{"entries": [{"value": 1}]}]
+        self.mock_db.return_value.collection.assert_called_with(self.collection + "/id1/changes")
+
+    #move_to_history
+    def test_move_to_history_plans_again_when_the_record_changed(self):
+        #arrange
+        snapshot = self.mock_db.return_value.collection.return_value.document.return_value.get.return_value
+        snapshot.exists = True
+        snapshot.to_dict.side_effect = [{"history": [1]}, {"history": [1, 2]}]
+        batch = self.mock_db.return_value.batch.return_value
+        batch.commit.side_effect = [FailedPrecondition("changed"), None]
+
+        def plan(record):
+            return {"entries": record["history"]}, {"history": []}
+
+        #act
+        response = self.db_instance.move_to_history("id1", "history", plan)
+
+        #assert
+        assert response.success is True
+        assert response.response is True
+        assert batch.set.call_args[0][1] == {"entries": [1, 2]}
+        assert batch.commit.call_count == 2
+        assert "option" in batch.update.call_args[1]
+
+    def test_move_to_history_nothing_to_move(self):
+        #arrange
+        snapshot = self.mock_db.return_value.collection.return_value.document.return_value.get.return_value
+        snapshot.exists = True
+        snapshot.to_dict.return_value = {"history": []}
+
+        #act
+        response = self.db_instance.move_to_history("id1", "history", lambda record: None)
+
+        #assert
+        assert response.success is True
+        assert response.response is False
+        self.mock_db.return_value.batch.return_value.commit.assert_not_called()
+
     #read_objects_with_equal
     def test_read_objects_with_equal_success(self):
         #arrange
@@ -183,6 +337,42 @@ class TestFirestoreRepository:
         self.mock_db.return_value.collection.return_value.where.assert_called()
         self.mock_db.return_value.collection.return_value.where.return_value.stream.assert_called()
 
+    #watch_objects_with_equal
+    def test_watch_objects_with_equal(self):
+        #arrange
+        added = MagicMock()
+        added.type.name = "ADDED"
+        added.document.to_dict.return_value = {"id": "1", "name": "Record 1"}
+        removed = MagicMock()
+        removed.type.name = "REMOVED"
+        removed.document.id = "2"
+        on_change = MagicMock()
+        query = self.mock_db.return_value.collection.return_value.where.return_value
+
+        #act
+        watch = self.db_instance.watch_objects_with_equal("CompanyCode", "A", on_change)
+        on_snapshot = query.on_snapshot.call_args[0][0]
+        on_snapshot([], [added, removed], None)
+
+        #assert
+        assert watch == query.on_snapshot.return_value
+        on_change.assert_called_once_with([{"id": "1", "name": "Record 1"}], ["2"])
+
+    def test_read_objects_with_equal_projection(self):
+        #arrange
+        record = MagicMock()
+        record.to_dict.return_value = {"id": "1", "name": "Record 1"}
+        query = self.mock_db.return_value.collection.return_value.where.return_value
+        query.select.return_value.stream.return_value = [record]
+
+        #act
+        response = self.db_instance.read_objects_with_equal("field", "value", fields=["id", "name"])
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [{"id": "1", "name": "Record 1"}]
+        query.select.assert_called_once_with(["id", "name"])
+
     def test_read_objects_with_equal_no_records(self):
         #arrange
         mock_field = "test_field"
@@ -219,6 +409,52 @@ class TestFirestoreRepository:
         self.mock_db.return_value.collection.return_value.where.assert_called()
         self.mock_db.return_value.collection.return_value.where.return_value.stream.assert_called()
 
+    #read_objects_with_filters
+    def test_read_objects_with_filters_success(self):
+        #arrange
+        record = MagicMock()
+        record.to_dict.return_value = {"id": "1", "Admin": True}
+        query = self.mock_db.return_value.collection.return_value.where.return_value.where.return_value
+        query.limit.return_value.stream.return_value = [record]
+
+        #act
+        response = self.db_instance.read_objects_with_filters(
+            [("CompanyCode", "==", "COMPANY"), ("Admin", "==", True)],
+            limit=1
+        )
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [{"id": "1", "Admin": True}]
+        query.limit.assert_called_once_with(1)
+        query.select.assert_not_called()
+
+    def test_read_objects_with_filters_no_records(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value
+        query.select.return_value.stream.return_value = []
+
+        #act
+        response = self.db_instance.read_objects_with_filters([("Admin", "==", True)], fields=["name"])
+
+        #assert
+        assert response.success is False
+        assert response.message == "no_records_found_in_" + self.collection
+        query.select.assert_called_once_with(["id", "name"])
+        query.limit.assert_not_called()
+
+    def test_read_objects_with_filters_exception(self):
+        #arrange
+        exception = "Database Error"
+        self.mock_db.return_value.collection.return_value.where.return_value.stream.side_effect = Exception(exception)
+
+        #act
+        response = self.db_instance.read_objects_with_filters([("Admin", "==", True)])
+
+        #assert
+        assert response.success is False
+        assert response.message == exception
+
     #update_object_by_id
     def test_update_object_by_id_success(self):
         #arrange
@@ -297,6 +533,133 @@ class TestFirestoreRepository:
         self.mock_db.return_value.collection.return_value.document.assert_called_once_with(mock_object_id)
         self.mock_db.return_value.collection.return_value.document.return_value.delete.assert_called()
 
+    #read_objects_with_equal_page
+    def test_read_objects_with_equal_page_success(self):
+        #arrange
+        record1 = MagicMock()
+        record1.id = "1"
+        record1.to_dict.return_value = {"id": "1", "name": "Record 1"}
+        record2 = MagicMock()
+        record2.id = "2"
+        record2.to_dict.return_value = {"id": "2", "name": "Record 2"}
+
+        query = self.mock_db.return_value.collection.return_value.where.return_value.order_by.return_value
+        query.start_after.return_value.limit.return_value.stream.return_value = [record1, record2]
+
+        #act
+        response = self.db_instance.read_objects_with_equal_page("field", "value", 2, start_after="0")
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [{"id": "1", "name": "Record 1"}, {"id": "2", "name": "Record 2"}]
+        assert response.response == "2"
+        query.start_after.assert_called_once_with({"__name__": "0"})
+        query.start_after.return_value.limit.assert_called_once_with(2)
+
+    def test_read_objects_with_equal_page_last_page(self):
+        #arrange
+        record = MagicMock()
+        record.id = "1"
+        record.to_dict.return_value = {"id": "1"}
+
+        query = self.mock_db.return_value.collection.return_value.where.return_value.order_by.return_value
+        query.limit.return_value.stream.return_value = [record]
+
+        #act
+        response = self.db_instance.read_objects_with_equal_page("field", "value", 2)
+
+        #assert
+        assert response.success is True
+        assert response.response is None
+        query.start_after.assert_not_called()
+
+    def test_read_objects_with_equal_page_projection(self):
+        #arrange
+        query = self.mock_db.return_value.collection.return_value.where.return_value.order_by.return_value
+        query.select.return_value.limit.return_value.stream.return_value = []
+
+        #act
+        response = self.db_instance.read_objects_with_equal_page("field", "value", 2, fields=["name"])
+
+        #assert
+        assert response.success is True
+        query.select.assert_called_once_with(["id", "name"])
+
+    def test_read_objects_with_equal_page_exception(self):
+        #arrange
+        exception = "Database error"
+        self.mock_db.return_value.collection.side_effect = Exception(exception)
+
+        #act
+        response = self.db_instance.read_objects_with_equal_page("field", "value", 2)
+
+        #assert
+        assert response.success is False
+        assert response.message == exception
+
+    #update_objects_by_ids
+    def test_update_objects_by_ids_success(self):
+        #arrange
+        updates = {str(index): {"field": index} for index in range(501)}
+
+        #act
+        response = self.db_instance.update_objects_by_ids(updates)
+
+        #assert
+        assert response.success is True
+        assert response.response == 501
+        assert self.mock_db.return_value.batch.return_value.update.call_count == 501
+        assert self.mock_db.return_value.batch.return_value.commit.call_count == 2
+
+    def test_update_objects_by_ids_exception(self):
+        #arrange
+        exception = "Database error"
+        self.mock_db.return_value.batch.return_value.commit.side_effect = Exception(exception)
+
+        #act
+        response = self.db_instance.update_objects_by_ids({"1": {"field": "value"}})
+
+        #assert
+        assert response.success is False
+        assert response.message == exception
+
+    #set_objects_by_ids
+    def test_set_objects_by_ids_success(self):
+        #act
+        response = self.db_instance.set_objects_by_ids({"1": {"id": "1"}, "2": {"id": "2"}}, merge=True)
+
+        #assert
+        assert response.success is True
+        assert response.response == 2
+        self.mock_db.return_value.batch.return_value.set.assert_called_with(
+            self.mock_db.return_value.collection.return_value.document.return_value,
+            {"id": "2"},
+            merge=True
+        )
+        self.mock_db.return_value.batch.return_value.commit.assert_called_once()
+
+    #delete_objects_by_ids
+    def test_delete_objects_by_ids_success(self):
+        #act
+        response = self.db_instance.delete_objects_by_ids(["1", "2"])
+
+        #assert
+        assert response.success is True
+        assert self.mock_db.return_value.batch.return_value.delete.call_count == 2
+        self.mock_db.return_value.batch.return_value.commit.assert_called_once()
+
+    def test_delete_objects_by_ids_exception(self):
+        #arrange
+        exception = "Database error"
+        self.mock_db.return_value.collection.side_effect = Exception(exception)
+
+        #act
+        response = self.db_instance.delete_objects_by_ids(["1"])
+
+        #assert
+        assert response.success is False
+        assert response.message == exception
+
     #massive_update_with_equal
     def test_massive_update_with_equal_success(self):
         #arrange
@@ -0,0 +1,65 @@
+import runpy
+import pytest
+from os import path
+
+CONFIG_PATH = path.join(path.dirname(path.dirname(__file__)), "gunicorn.conf.py")
+
+
+class TestGunicornConfig:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, monkeypatch, mocker):
+        for name in ["GUNICORN_PROFILE", "GUNICORN_WORKERS", "GUNICORN_THREADS"]:
+            monkeypatch.delenv(name, raising=False)
+        mocker.patch("multiprocessing.cpu_count", return_value=4)
+
+    def test_default_profile_is_gthread(self):
+        #act
+        config = runpy.run_path(CONFIG_PATH)
+
+        #assert
+        assert config["worker_class"] == "gthread"
+        assert (config["workers"], config["threads"]) == (5, 8)
+        assert config["preload_app"] is True
+
+    def test_sync_profile_is_sized_by_cpu(self, monkeypatch):
+        #arrange
+        monkeypatch.setenv("GUNICORN_PROFILE", "sync")
+
+        #act
+        config = runpy.run_path(CONFIG_PATH)
+
+        #assert
+        assert (config["worker_class"], config["workers"], config["threads"]) == ("sync", 9, 1)
+
+    def test_gevent_profile_loads_the_app_in_the_workers(self, monkeypatch):
+        #arrange
+        monkeypatch.setenv("GUNICORN_PROFILE", "gevent")
+
+        #act
+        config = runpy.run_path(CONFIG_PATH)
+
+        #assert
+        assert config["worker_class"] == "gevent"
+        assert config["preload_app"] is False
+
+    def test_sizing_can_be_overridden(self, monkeypatch):
+        #arrange
+        monkeypatch.setenv("GUNICORN_WORKERS", "3")
+        monkeypatch.setenv("GUNICORN_THREADS", "16")
+
+        #act
+        config = runpy.run_path(CONFIG_PATH)
+
+        #assert
+        assert (config["workers"], config["threads"]) == (3, 16)
+
+    def test_invalid_profile(self, monkeypatch):
+        #arrange
+        monkeypatch.setenv("GUNICORN_PROFILE", "eventlet")
+
+        #act
+        with pytest.raises(Exception) as error:
+            runpy.run_path(CONFIG_PATH)
+
+        #assert
+        assert str(error.value) == "invalid_gunicorn_profile"
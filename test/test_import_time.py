@@ -0,0 +1,47 @@
+import importlib.util
+import pytest
+from os import environ
+from benchmarks.import_benchmark import read_import_times
+
+#imported on first use, never when a worker starts
+LAZY_MODULES = ["stripe", "google.cloud.firestore", "grpc", "flasgger", "jsonschema"]
+#the whole import of the app modules. Wall clock time depends on the machine, so it's only checked when
+#RUN_BENCHMARKS=1, e.g. on a quiet machine before a release
+BUDGET_MS = 2000
+run_benchmarks = pytest.mark.skipif(environ.get("RUN_BENCHMARKS") != "1", reason="set RUN_BENCHMARKS=1 to run it")
+
+
+class TestImportTime:
+
+    def test_app_modules_import_lazily(self):
+        #act
+        imports = read_import_times("import controllers, services, dao, repositories")
+
+        #assert
+        assert [module for module in LAZY_MODULES if (module in imports)] == []
+
+    @run_benchmarks
+    def test_app_modules_import_within_the_budget(self):
+        #act
+        imports = read_import_times("import controllers, services, dao, repositories")
+
+        #assert
+        assert sum(module["self_ms"] for module in imports.values()) < BUDGET_MS
+
+    @pytest.mark.skipif(importlib.util.find_spec("flask_cors") is None, reason="flask_cors is not installed")
+    def test_app_imports_lazily(self):
+        #act
+        imports = read_import_times("import app")
+
+        #assert
+        assert [module for module in LAZY_MODULES if (module in imports)] == []
+
+    def test_openapi_spec_is_up_to_date(self):
+        #arrange
+        from utils import build_openapi
+
+        #act
+        result = build_openapi.main(["--check"])
+
+        #assert
+        assert result == 0
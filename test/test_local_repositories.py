@@ -0,0 +1,246 @@
+import pytest
+import threading
+from datetime import datetime, timezone
+from dao import UserDao
+from entities import TutorUser
+from repositories import InMemoryRepository, SqliteRepository, FirestoreRepository, create_repository
+
+
+class TestLocalRepositories:
+    @pytest.fixture(autouse=True, params=["memory", "sqlite"])
+    def setup_class(self, request, monkeypatch):
+        monkeypatch.setenv("REPOSITORY_BACKEND", request.param)
+        monkeypatch.setenv("SQLITE_DATABASE", ":memory:")
+        self.repository = create_repository("users")
+        self.repository.clear()
+        self.repository.set_objects_by_ids({
+            "1": {"id": "1", "CompanyCode": "A", "Type": "Tutor", "Admin": True, "cost": 10},
+            "2": {"id": "2", "CompanyCode": "A", "Type": "Student", "Admin": False, "cost": 20},
+            "3": {"id": "3", "CompanyCode": "A", "Type": "Student", "Admin": 1, "cost": 30},
+            "4": {"id": "4", "CompanyCode": "B", "Type": "Student", "type_": ["basic", "premium"]},
+        })
+        yield
+        self.repository.clear()
+
+    #create_repository
+    def test_create_repository_by_backend(self, monkeypatch):
+        #arrange
+        monkeypatch.setenv("REPOSITORY_BACKEND", "firestore")
+        monkeypatch.setattr("firebase_admin.firestore.client", lambda: None)
+
+        #act
+        repository = create_repository("users")
+
+        #assert
+        assert isinstance(repository, FirestoreRepository)
+        assert isinstance(self.repository, (InMemoryRepository, SqliteRepository))
+
+    def test_create_repository_invalid_backend(self, monkeypatch):
+        #arrange
+        monkeypatch.setenv("REPOSITORY_BACKEND", "other")
+
+        #act
+        with pytest.raises(Exception, match="invalid_repository_backend"):
+            create_repository("users")
+
+    #create_object/read_object_by_id
+    def test_create_and_read_object(self):
+        #arrange
+        data = {"name": "test_record", "date": datetime(2024, 5, 1, 10, 30)}
+
+        #act
+        create_response = self.repository.create_object(data)
+        read_response = self.repository.read_object_by_id(create_response.response["id"])
+
+        #assert
+        assert create_response.success is True
+        assert read_response.success is True
+        assert read_response.response["name"] == "test_record"
+        assert read_response.response["date"] == datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc)
+
+    def test_read_object_by_id_not_found(self):
+        #act
+        response = self.repository.read_object_by_id("missing")
+
+        #assert
+        assert response.success is False
+        assert response.message == "no_records_found_in_users"
+
+    def test_read_object_by_id_returns_a_copy(self):
+        #act
+        self.repository.read_object_by_id("1").response["cost"] = 0
+
+        #assert
+        assert self.repository.read_object_by_id("1").response["cost"] == 10
+
+    def test_read_object_by_id_waits_for_the_writes(self):
+        #arrange
+        responses = []
+        reader = threading.Thread(target=lambda: responses.append(self.repository.read_object_by_id("1")))
+
+        #act
+        with type(self.repository)._lock:
+            reader.start()
+            reader.join(0.1)
+            read_during_write = len(responses)
+        reader.join()
+
+        #assert
+        assert read_during_write == 0
+        assert responses[0].success is True
+
+    #read_objects_with_equal
+    def test_read_objects_with_equal_projection(self):
+        #act
+        response = self.repository.read_objects_with_equal("CompanyCode", "A", ["Type"])
+
+        #assert
+        assert response.success is True
+        assert response.response_list == [
+            {"id": "1", "Type": "Tutor"},
+            {"id": "2", "Type": "Student"},
+            {"id": "3", "Type": "Student"}
+        ]
+
+    def test_read_objects_with_equal_array_contains(self):
+        #act
+        response = self.repository.read_objects_with_equal("type_", "premium")
+
+        #assert
+        assert [record["id"] for record in response.response_list] == ["4"]
+
+    def test_read_objects_with_equal_sees_the_writes(self):
+        #arrange
+        self.repository.read_objects_with_equal("CompanyCode", "A")
+
+        #act
+        self.repository.update_object_by_id("2", {"CompanyCode": "B"})
+        self.repository.delete_object_by_id("3")
+        response = self.repository.read_objects_with_equal("CompanyCode", "A")
+
+        #assert
+        assert [record["id"] for record in response.response_list] == ["1"]
+
+    def test_read_objects_with_equal_not_found(self):
+        #act
+        response = self.repository.read_objects_with_equal("CompanyCode", "C")
+
+        #assert
+        assert response.success is False
+        assert response.message == "no_records_found_in_users"
+
+    def test_read_objects_with_equal_quoted_field(self):
+        #arrange
+        self.repository.update_object_by_id("2", {"it's": "x", 'say "a"': "y"})
+
+        #act
+        quote_response = self.repository.read_objects_with_equal("it's", "x")
+        double_quote_response = self.repository.read_objects_with_equal('say "a"', "y")
+        injection_response = self.repository.read_objects_with_equal("x') OR 1=1 --", "x")
+
+        #assert
+        assert [record["id"] for record in quote_response.response_list] == ["2"]
+        assert [record["id"] for record in double_quote_response.response_list] == ["2"]
+        assert injection_response.response_list == []
+
+    #read_objects_with_equal_page
+    def test_read_objects_with_equal_page(self):
+        #act
+        first_page = self.repository.read_objects_with_equal_page("CompanyCode", "A", 2)
+        last_page = self.repository.read_objects_with_equal_page("CompanyCode", "A", 2, first_page.response)
+
+        #assert
+        assert [record["id"] for record in first_page.response_list] == ["1", "2"]
+        assert first_page.response == "2"
+        assert [record["id"] for record in last_page.response_list] == ["3"]
+        assert last_page.response is None
+
+    #read_objects_with_filters
+    def test_read_objects_with_filters_booleans_are_not_numbers(self):
+        #act
+        response = self.repository.read_objects_with_filters([("CompanyCode", "==", "A"), ("Admin", "==", True)])
+
+        #assert
+        assert [record["id"] for record in response.response_list] == ["1"]
+
+    def test_read_objects_with_filters_range_and_limit(self):
+        #act
+        response = self.repository.read_objects_with_filters([("cost", ">=", 20)], limit=1)
+
+        #assert
+        assert [record["id"] for record in response.response_list] == ["2"]
+
+    #read_objects_by_ids/read_documents
+    def test_read_objects_by_ids_keeps_the_order(self):
+        #act
+        response = self.repository.read_objects_by_ids(["3", "missing", "1"])
+
+        #assert
+        assert response.success is True
+        assert [record["id"] for record in response.response_list] == ["3", "1"]
+        assert set(response.response) == {"1", "3"}
+
+    def test_read_documents(self):
+        #arrange
+        create_repository("memberships").set_objects_by_ids({"m": {"id": "m", "name": "basic"}})
+
+        #act
+        response = self.repository.read_documents([("users", "1"), ("memberships", "m"), ("users", "missing")])
+
+        #assert
+        assert set(response.response) == {("users", "1"), ("memberships", "m")}
+
+    #updates
+    def test_update_object_by_id_not_found(self):
+        #act
+        response = self.repository.update_object_by_id("missing", {"cost": 1})
+
+        #assert
+        assert response.success is False
+        assert response.message.startswith("404")
+
+    def test_update_objects_by_ids_writes_nothing_when_one_is_missing(self):
+        #act
+        response = self.repository.update_objects_by_ids({"1": {"cost": 0}, "missing": {"cost": 0}})
+
+        #assert
+        assert response.success is False
+        assert self.repository.read_object_by_id("1").response["cost"] == 10
+
+    def test_set_objects_by_ids_merge(self):
+        #act
+        self.repository.set_objects_by_ids({"1": {"cost": 11}}, merge=True)
+        self.repository.set_objects_by_ids({"2": {"cost": 21}})
+
+        #assert
+        assert self.repository.read_object_by_id("1").response["Type"] == "Tutor"
+        assert self.repository.read_object_by_id("2").response == {"cost": 21}
+
+    #history
+    def test_append_and_move_to_history(self):
+        #arrange
+        self.repository.append_history("1", "payments", [{"amount": 1}], data={"cost": 12})
+
+        #act
+        moved = self.repository.move_to_history("1", "payments", lambda record: ({"entries": [{"amount": 2}]}, {"cost": 0}))
+        skipped = self.repository.move_to_history("1", "payments", lambda record: None)
+        history = self.repository.read_history("1", "payments")
+
+        #assert
+        assert moved.response is True
+        assert skipped.response is False
+        assert history.response_list == [{"entries": [{"amount": 1}]}, {"entries": [{"amount": 2}]}]
+        assert self.repository.read_object_by_id("1").response["cost"] == 0
+
+    #DAOs
+    def test_user_dao_without_firestore(self):
+        #arrange
+        dao = UserDao()
+
+        #act
+        admin_response = dao.read_admin_by_company_code("A")
+        students = list(dao.iterate_users_by_company_code("A", "Student", page_size=1)) # "3" has a truthy Admin
+
+        #assert
+        assert isinstance(admin_response.response["user"], TutorUser)
+        assert [[student.id for student in page] for page in students] == [["2"]]
@@ -0,0 +1,74 @@
+import pytest
+from entities import AdminPayout, Payroll, Response, StudentDebt, TutorUser
+from services import PayrollService
+
+
+class TestPayrollService:
+
+    @pytest.fixture(autouse=True)
+    def setup_class(self, mocker):
+        mocker.patch.dict("os.environ", {"STRIPE_API": "stripe_api"})
+        mocker.patch("firebase_admin.firestore.client")
+
+        self.service = PayrollService()
+        self.service.user_dao = mocker.Mock()
+        self.service.payroll_dao = mocker.Mock()
+        self.service.stripe_service = mocker.Mock()
+        self.service.company_service = mocker.Mock()
+
+        self.payroll = Payroll(
+            id="p",
+            company_code="A",
+            admin_id="1",
+            tutors_paid=True,
+            admin_payout=AdminPayout(admin_total_profit=1000, admin_sub_account_id="acct", admin_transference_id="t"),
+            students_debt=[StudentDebt.model_construct(meeting_cursor=4, student_id="2")]
+        )
+        self.service.payroll_dao.read_payroll_by_id.return_value = Response(response=self.payroll, success=True)
+        self.service.company_service.return_value.read_admin.return_value = Response(
+            response={"type": "Tutor", "user": TutorUser.model_construct(id="1", stripe_subaccount_id="acct")},
+            success=True
+        )
+        self.service.stripe_service.payout_to_tutor_sub_account.return_value = Response(response={"id": "po"}, success=True)
+        self.service.payroll_dao.update_payroll_admin_payout.return_value = Response(success=True)
+
+    #pay_admin_by_payroll
+    def test_pay_admin_by_payroll_completes_after_the_cursors(self):
+        #arrange
+        self.service.user_dao.set_payroll_meeting_cursors.return_value = Response(response=1, success=True)
+
+        #act
+        response = self.service.pay_admin_by_payroll("p")
+
+        #assert
+        assert response.success is True
+        self.service.user_dao.set_payroll_meeting_cursors.assert_called_once_with({"2": 4})
+        self.service.payroll_dao.mark_payroll_completed.assert_called_once_with("p")
+        self.service.user_dao.update_admin_last_payroll_date.assert_called_once_with("1")
+
+    def test_pay_admin_by_payroll_cursors_error_keeps_the_payroll_open(self):
+        #arrange
+        self.service.user_dao.set_payroll_meeting_cursors.return_value = Response(message="deadline_exceeded")
+
+        #act
+        self.service.pay_admin_by_payroll("p")
+
+        #assert
+        self.service.payroll_dao.set_payroll_admin_payout_paid.assert_called_once_with("p")
+        self.service.payroll_dao.mark_payroll_completed.assert_not_called()
+        admin_payout = self.service.payroll_dao.update_payroll_admin_payout.call_args.args[1]
+        assert admin_payout.error == "deadline_exceeded"
+        assert admin_payout.admin_payout_id == "po"
+
+    def test_pay_admin_by_payroll_retries_the_cursors_without_paying_again(self):
+        #arrange
+        self.payroll.admin_paid = True
+        self.service.user_dao.set_payroll_meeting_cursors.return_value = Response(response=1, success=True)
+
+        #act
+        self.service.pay_admin_by_payroll("p")
+
+        #assert
+        self.service.stripe_service.payout_to_tutor_sub_account.assert_not_called()
+        self.service.user_dao.set_payroll_meeting_cursors.assert_called_once_with({"2": 4})
+        self.service.payroll_dao.mark_payroll_completed.assert_called_once_with("p")
@@ -0,0 +1,97 @@
+import pytest
+from flask import Flask
+from controllers import health
+from entities import Response
+from repositories import create_repository
+from services import WarmupService, start_warmup, is_ready, read_warmup_stages, reset_warmup, warmup_service
+
+
+class TestWarmupService:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, monkeypatch, mocker):
+        monkeypatch.setenv("REPOSITORY_BACKEND", "memory")
+        monkeypatch.setenv("STRIPE_API", "stripe_api")
+        self.memberships = create_repository("memberships")
+        self.memberships.set_objects_by_ids({
+            "1": {"id": "1", "name": "basic", "price": 1000, "active_admin": True, "type_": ["Individual"]},
+        })
+        self.read_balance = mocker.patch("interfaces.StripeInterface.read_balance", return_value=Response(success=True))
+        reset_warmup()
+        yield
+        reset_warmup()
+        self.memberships.clear()
+
+    def wait_until_ready(self):
+        start_warmup()
+        assert warmup_service._ready.wait(timeout=10)
+
+    #warm_up
+    def test_warm_up_runs_every_stage(self):
+        #act
+        response = WarmupService().warm_up()
+
+        #assert
+        assert response.success is True
+        assert list(response.response) == ["validators", "catalogs", "stripe"]
+        self.read_balance.assert_called_once()
+
+    def test_warm_up_keeps_going_after_a_failed_stage(self):
+        #arrange
+        self.read_balance.return_value = Response(message="connection_error")
+
+        #act
+        response = WarmupService().warm_up()
+
+        #assert
+        assert response.success is False
+        assert response.response["catalogs"]["success"] is True
+        assert response.response["stripe"]["message"] == "connection_error"
+
+    #start_warmup
+    def test_start_warmup_flips_the_readiness(self):
+        #act
+        self.wait_until_ready()
+
+        #assert
+        assert is_ready() is True
+        assert read_warmup_stages()["validators"]["success"] is True
+
+    def test_start_warmup_runs_once(self, mocker):
+        #arrange
+        warm_up = mocker.spy(WarmupService, "warm_up")
+
+        #act
+        self.wait_until_ready()
+        start_warmup()
+
+        #assert
+        assert warm_up.call_count == 1
+
+    def test_start_warmup_disabled(self, monkeypatch, mocker):
+        #arrange
+        monkeypatch.setattr(warmup_service, "WARMUP_ENABLED", False)
+        warm_up = mocker.spy(WarmupService, "warm_up")
+
+        #act
+        start_warmup()
+
+        #assert
+        assert is_ready() is True
+        warm_up.assert_not_called()
+
+    #health
+    def test_ready_answers_503_until_the_warmup_is_done(self, mocker):
+        #arrange
+        app = Flask(__name__)
+        app.register_blueprint(health)
+        mocker.patch("controllers.health_controller.start_warmup")
+
+        #act
+        waiting = app.test_client().get("/health/ready")
+        self.wait_until_ready()
+        ready = app.test_client().get("/health/ready")
+
+        #assert
+        assert waiting.status_code == 503
+        assert ready.status_code == 200
+        assert ready.get_json()["response"]["catalogs"]["success"] is True
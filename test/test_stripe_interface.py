@@ -654,3 +654,26 @@ class TestStripeInterface:
         assert response.success is False
         assert response.message == exception
         stripe_mock.assert_called()
+
+    #read_balance
+    def test_read_balance_success(self):
+        #arrange
+        stripe_mock = self.mocker.patch("stripe.Balance.retrieve", return_value={"object": "balance"})
+
+        #act
+        response = self.stripe_instance.read_balance()
+
+        #assert
+        assert response.success is True
+        stripe_mock.assert_called_once_with()
+
+    def test_read_balance_exception(self):
+        #arrange
+        self.mocker.patch("stripe.Balance.retrieve", side_effect=Exception("connection_error"))
+
+        #act
+        response = self.stripe_instance.read_balance()
+
+        #assert
+        assert response.success is False
+        assert response.message == "connection_error"
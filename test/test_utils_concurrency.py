@@ -0,0 +1,68 @@
+import time
+import pytest
+from contextvars import ContextVar
+from utils import concurrency, run_in_parallel, reset_executor
+
+request_value: ContextVar[str] = ContextVar("request_value", default="")
+
+
+class TestConcurrency:
+
+    #run_in_parallel
+    def test_run_in_parallel_keeps_the_order(self):
+        #act
+        results = run_in_parallel(lambda: 1, None, lambda: 3)
+
+        #assert
+        assert results == [1, None, 3]
+
+    def test_run_in_parallel_overlaps_the_calls(self):
+        #arrange
+        def slow_read(value):
+            time.sleep(0.2)
+            return value
+
+        #act
+        start = time.perf_counter()
+        results = run_in_parallel(lambda: slow_read("user"), lambda: slow_read("subscription"), lambda: slow_read("roster"))
+        elapsed = time.perf_counter() - start
+
+        #assert
+        assert results == ["user", "subscription", "roster"]
+        assert elapsed < 0.4
+
+    def test_run_in_parallel_sees_the_caller_context(self):
+        #arrange
+        token = request_value.set("request_1")
+
+        #act
+        try:
+            results = run_in_parallel(request_value.get, lambda: run_in_parallel(request_value.get, request_value.get))
+        finally:
+            request_value.reset(token)
+
+        #assert
+        assert results == ["request_1", ["request_1", "request_1"]]
+
+    def test_run_in_parallel_raises_the_exception(self):
+        #arrange
+        def failing_read():
+            raise Exception("read_failed")
+
+        #act
+        with pytest.raises(Exception, match="read_failed"):
+            run_in_parallel(lambda: 1, failing_read)
+
+    #reset_executor
+    def test_reset_executor_builds_a_new_pool(self):
+        #arrange
+        run_in_parallel(lambda: 1, lambda: 2)
+        inherited = concurrency._executor
+
+        #act
+        reset_executor()
+        results = run_in_parallel(lambda: 1, lambda: 2)
+
+        #assert
+        assert results == [1, 2]
+        assert concurrency._executor is not inherited
@@ -0,0 +1,192 @@
+from datetime import datetime, timezone, timedelta
+from utils import calculate_hours_by_range_batch, calculate_hours_spent, calculate_hours_spent_by_range, \
+    to_epoch_microseconds, meeting_range, calculate_hours_by_ledger_batch
+
+
+class TestHours:
+
+    def setup_method(self):
+        self.starts = [datetime(2023, 6, 1, 5, 0), datetime(2023, 6, 2, 12, 0)]
+        self.ends = [datetime(2023, 6, 1, 10, 0), datetime(2023, 6, 2, 15, 0)]
+
+    #to_epoch_microseconds
+    def test_to_epoch_microseconds_naive_is_utc(self):
+        #arrange
+        naive = datetime(2024, 1, 1, 12, 0)
+        aware = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+        #act
+        result = to_epoch_microseconds([naive, aware])
+
+        #assert
+        assert result[0] == result[1] == int(aware.timestamp()) * 1_000_000
+
+    #calculate_hours_spent
+    def test_calculate_hours_spent(self):
+        #act
+        hours = calculate_hours_spent(self.starts, self.ends)
+
+        #assert
+        assert hours == 8.0
+
+    def test_calculate_hours_spent_skips_invalid_intervals(self):
+        #arrange
+        starts = self.starts + [datetime(2023, 6, 3, 10, 0)]
+        ends = self.ends + [datetime(2023, 6, 3, 9, 0)]
+
+        #act
+        hours = calculate_hours_spent(starts, ends)
+
+        #assert
+        assert hours == 8.0
+
+    def test_calculate_hours_spent_empty(self):
+        #act
+        hours = calculate_hours_spent([], [])
+
+        #assert
+        assert hours == 0.0
+
+    #calculate_hours_spent_by_range
+    def test_calculate_hours_spent_by_range_clips_meetings(self):
+        #act
+        hours = calculate_hours_spent_by_range(
+            self.starts,
+            self.ends,
+            datetime(2023, 6, 1, 8, 0),
+            datetime(2023, 6, 2, 13, 30)
+        )
+
+        #assert
+        assert hours == 3.5
+
+    def test_calculate_hours_spent_by_range_mixed_timezones(self):
+        #arrange
+        starts = [datetime(2023, 6, 1, 5, 0, tzinfo=timezone.utc), datetime(2023, 6, 2, 12, 0)]
+        start_range = datetime(2023, 6, 1, 3, 0, tzinfo=timezone(timedelta(hours=-5)))  # 08:00 UTC
+
+        #act
+        hours = calculate_hours_spent_by_range(starts, self.ends, start_range, datetime(2023, 6, 3, 0, 0))
+
+        #assert
+        assert hours == 5.0
+
+    #calculate_hours_by_range_batch
+    def test_calculate_hours_by_range_batch(self):
+        #arrange
+        histories = [
+            (self.starts, self.ends),
+            ([], []),
+            (self.starts[:1], self.ends)
+        ]
+
+        #act
+        hours = calculate_hours_by_range_batch(histories)
+
+        #assert
+        assert hours == [8.0, 0.0, 5.0]
+
+    def test_calculate_hours_by_range_batch_matches_per_user(self):
+        #arrange
+        base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        histories = [
+            (
+                [base + timedelta(days=day, hours=user) for day in range(user + 1)],
+                [base + timedelta(days=day, hours=user, minutes=90) for day in range(user + 1)]
+            )
+            for user in range(5)
+        ]
+        start_range = base + timedelta(days=1)
+        end_range = base + timedelta(days=3, hours=3, minutes=45)
+
+        #act
+        hours = calculate_hours_by_range_batch(histories, start_range, end_range)
+
+        #assert
+        assert hours == [
+            calculate_hours_spent_by_range(starts, ends, start_range, end_range)
+            for (starts, ends) in histories
+        ]
+        assert hours == [0.0, 1.5, 3.0, 3.75, 3.0]
+
+    #meeting_range
+    def test_meeting_range_finds_the_overlapping_meetings(self):
+        #arrange
+        base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        starts = [base + timedelta(days=day) for day in range(10)]
+        ends = [start + timedelta(hours=2) for start in starts]
+
+        #act
+        first, last, next_cursor = meeting_range(
+            starts,
+            ends,
+            0,
+            base + timedelta(days=2, hours=1),
+            base + timedelta(days=5, hours=1)
+        )
+
+        #assert
+        assert (first, last, next_cursor) == (2, 6, 5)
+
+    def test_meeting_range_starts_from_the_cursor(self):
+        #arrange
+        base = datetime(2024, 3, 1)
+        starts = [base + timedelta(days=day) for day in range(10)]
+        ends = [start + timedelta(hours=2) for start in starts]
+
+        #act
+        without_range = meeting_range(starts, ends, 7)
+        cursor_past_the_end = meeting_range(starts, ends, 25, base, base + timedelta(days=30))
+
+        #assert
+        assert without_range == (7, 10, 10)
+        assert cursor_past_the_end == (10, 10, 10)
+
+    def test_meeting_range_mixed_timezones(self):
+        #arrange
+        starts = [datetime(2023, 6, 1, 5, 0, tzinfo=timezone.utc)] + self.starts[1:] + [datetime(2023, 6, 3, 12, 0)]
+        ends = self.ends + [datetime(2023, 6, 3, 15, 0, tzinfo=timezone.utc)]
+        end_range = datetime(2023, 6, 2, 10, 0, tzinfo=timezone(timedelta(hours=-5)))  # 15:00 UTC
+
+        #act
+        naive_history = meeting_range(self.starts, self.ends, 0, datetime(2023, 6, 1, 10, 0), end_range)
+        mixed_history = meeting_range(starts, ends, 0, datetime(2023, 6, 1, 10, 0), end_range)
+
+        #assert
+        assert naive_history == (1, 2, 2)
+        assert mixed_history == (1, 2, 2)
+
+    #calculate_hours_by_ledger_batch
+    def test_calculate_hours_by_ledger_batch_matches_the_full_scan(self):
+        #arrange
+        base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        histories = [
+            (
+                [base + timedelta(days=day, hours=user) for day in range(user * 3)],
+                [base + timedelta(days=day, hours=user, minutes=90) for day in range(user * 3)]
+            )
+            for user in range(5)
+        ]
+        start_range = base + timedelta(days=4, hours=2)
+        end_range = base + timedelta(days=9, hours=3, minutes=30)
+
+        #act
+        hours, ranges = calculate_hours_by_ledger_batch(
+            [(starts, ends, 0) for (starts, ends) in histories],
+            start_range,
+            end_range
+        )
+        next_hours, _next_ranges = calculate_hours_by_ledger_batch(
+            [(starts, ends, cursor) for (starts, ends), (_first, _last, cursor) in zip(histories, ranges)],
+            start_range,
+            end_range
+        )
+
+        #assert
+        assert hours == calculate_hours_by_range_batch(histories, start_range, end_range)
+        assert next_hours == calculate_hours_by_range_batch(
+            [(starts[cursor:], ends[cursor:]) for (starts, ends), (_f, _l, cursor) in zip(histories, ranges)],
+            start_range,
+            end_range
+        )
+        assert [cursor for (_first, _last, cursor) in ranges] == [0, 3, 6, 9, 9]
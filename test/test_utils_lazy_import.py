@@ -0,0 +1,38 @@
+import sys
+from utils import lazy_import
+from utils.lazy_import import LazyModule
+
+
+class TestLazyImport:
+
+    def test_lazy_import_waits_for_the_first_use(self, monkeypatch):
+        #arrange
+        monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+        #act
+        module = lazy_import("colorsys")
+        imported_before = "colorsys" in sys.modules
+        value = module.rgb_to_hsv(1.0, 0.0, 0.0)
+
+        #assert
+        assert isinstance(module, LazyModule)
+        assert imported_before is False
+        assert value == (0.0, 1.0, 1.0)
+
+    def test_lazy_import_sets_on_the_module(self, monkeypatch):
+        #arrange
+        monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+        module = lazy_import("colorsys")
+
+        #act
+        module.lazy_value = 1
+
+        #assert
+        assert sys.modules["colorsys"].lazy_value == 1
+
+    def test_lazy_import_returns_an_imported_module(self):
+        #act
+        module = lazy_import("json")
+
+        #assert
+        assert module is sys.modules["json"]
@@ -0,0 +1,64 @@
+import pytest
+from datetime import datetime
+from repositories import create_repository
+from utils import migrate_history
+
+
+class TestMigrateHistory:
+    @pytest.fixture(autouse=True)
+    def setup_class(self, monkeypatch):
+        monkeypatch.setenv("REPOSITORY_BACKEND", "memory")
+        self.users = create_repository("users")
+        self.users.clear()
+        self.payroll = create_repository("payroll")
+        self.users.set_objects_by_ids({
+            user_id: {
+                "id": user_id,
+                "CompanyCode": company_code,
+                "Type": "Tutor",
+                "HistMeetingTimes": [datetime(2024, 3, 1), datetime(2024, 3, 2)],
+                "HistMeetingTimesEnd": [datetime(2024, 3, 1, 1), datetime(2024, 3, 2, 1)],
+                "payroll_meeting_cursor": 1
+            }
+            for (user_id, company_code) in [("1", "A"), ("2", "B")]
+        })
+        yield
+        self.users.clear()
+
+    def test_migrate_users_moves_the_billed_meetings(self):
+        #act
+        totals = migrate_history.migrate_users(500, False)
+
+        #assert
+        assert totals["users_meetings"] == 2
+        assert totals["errors"] == 0
+        assert self.users.read_object_by_id("1").response["payroll_meeting_cursor"] == 0
+        assert len(self.users.read_object_by_id("1").response["HistMeetingTimes"]) == 1
+
+    def test_migrate_users_reads_the_pending_payroll_again(self, mocker):
+        #arrange
+        #the payroll of B is created after the tool read the pending ones
+        mocker.patch("utils.migrate_history.companies_with_pending_payroll", return_value=set())
+        self.payroll.set_objects_by_ids({"p": {"id": "p", "company_code": "B", "completed": False}})
+
+        #act
+        totals = migrate_history.migrate_users(500, False)
+
+        #assert
+        assert totals["users_meetings"] == 1
+        assert totals["users_meetings_skipped_pending_payroll"] == 1
+        assert self.users.read_object_by_id("2").response["payroll_meeting_cursor"] == 1
+        assert len(self.users.read_object_by_id("2").response["HistMeetingTimes"]) == 2
+
+    def test_migrate_users_stops_when_the_payroll_cant_be_read(self, mocker):
+        #arrange
+        mocker.patch("utils.migrate_history.companies_with_pending_payroll", return_value=set())
+        mocker.patch(
+            "utils.migrate_history.read_pending_payroll",
+            side_effect=Exception("read_failed")
+        )
+
+        #act/assert
+        with pytest.raises(Exception, match="read_failed"):
+            migrate_history.migrate_users(500, False)
+        assert self.users.read_object_by_id("1").response["payroll_meeting_cursor"] == 1
@@ -0,0 +1,69 @@
+from entities import TutorPayout
+from utils import index_payroll_lines, merge_payroll_lines, check_duplicated_tutor_hours
+
+
+class TestPayrollLines:
+
+    def tutor_payout(self, tutor_id: str, payout: int, paid: bool = False) -> TutorPayout:
+        return TutorPayout(
+            tutor_id=tutor_id,
+            tutor_name=tutor_id,
+            tutor_payout=payout,
+            tutor_total_hours=1.0,
+            pending_onboarding=False,
+            paid=paid
+        )
+
+    #check_duplicated_tutor_hours
+    def test_check_duplicated_tutor_hours(self):
+        #arrange
+        first = self.tutor_payout("tutor_1", 100)
+        lines = [first, self.tutor_payout("tutor_2", 200), self.tutor_payout("tutor_1", 300)]
+
+        #act
+        consolidated = check_duplicated_tutor_hours(lines)
+
+        #assert
+        assert [(line.tutor_id, line.tutor_payout, line.tutor_total_hours) for line in consolidated] == [
+            ("tutor_1", 400, 2.0),
+            ("tutor_2", 200, 1.0)
+        ]
+        assert first.tutor_payout == 100
+
+    #index_payroll_lines
+    def test_index_payroll_lines_keeps_the_first_line(self):
+        #arrange
+        first = self.tutor_payout("tutor_1", 100)
+        lines = [first, self.tutor_payout("tutor_2", 200), self.tutor_payout("tutor_1", 300)]
+
+        #act
+        index = index_payroll_lines(lines, "tutor_id")
+
+        #assert
+        assert list(index) == ["tutor_1", "tutor_2"]
+        assert index["tutor_1"] is first
+
+    #merge_payroll_lines
+    def test_merge_payroll_lines(self):
+        #arrange
+        paid = self.tutor_payout("tutor_1", 100, paid=True)
+        paid_not_recalculated = self.tutor_payout("tutor_4", 400, paid=True)
+        previous = [paid, self.tutor_payout("tutor_2", 200), paid_not_recalculated, self.tutor_payout("tutor_5", 500)]
+        recalculated = self.tutor_payout("tutor_2", 250)
+        new_tutor = self.tutor_payout("tutor_3", 300)
+
+        #act
+        merged = merge_payroll_lines(previous, [self.tutor_payout("tutor_1", 150), recalculated, new_tutor], "tutor_id")
+
+        #assert
+        assert merged == [paid, recalculated, new_tutor, paid_not_recalculated]
+
+    def test_merge_payroll_lines_without_previous_lines(self):
+        #arrange
+        lines = [self.tutor_payout("tutor_1", 100)]
+
+        #act
+        merged = merge_payroll_lines([], lines, "tutor_id")
+
+        #assert
+        assert merged == lines
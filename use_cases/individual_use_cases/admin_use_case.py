@@ -2,6 +2,7 @@ from use_cases import BaseUseCase
 from entities import Response, Membership, StudentUser, TutorUser, PaymentSession, Subscription, Session, LineItems
 from typing import Union
 from services import CompanyService
+from utils import run_in_parallel
 
 
 class AdminUseCase(BaseUseCase):
@@ -23,42 +24,41 @@ class AdminUseCase(BaseUseCase):
 
         try:
             user = self.user
+            company_service = self.company_service(user.CompanyCode)
 
-            # Validates if customer has a stripe customer id
-            if (user.stripe_customer_id == ""):
-                stripe_customer_response = self.stripe_service.create_stripe_customer(user)
+            if (user.company_type == "individual_group"):
+                read_roster = company_service.read_individuals
+            elif (user.company_type == "tutor_group"):
+                read_roster = company_service.read_tutors
+            else:
+                raise Exception("invalid_company_type")
+
+            # The stripe customer and the active subscription don't depend on each other
+            stripe_customer_response, active_subscription = run_in_parallel(
+                (lambda: self.stripe_service.create_stripe_customer(user)) if (user.stripe_customer_id == "") else None,
+                lambda: self.subscription_dao.read_active_subscription_by_customer_id(user.id)
+            )
 
+            # Validates if customer has a stripe customer id
+            if (stripe_customer_response is not None):
                 if (not stripe_customer_response.success):
                     raise Exception(stripe_customer_response.message)
 
                 user.stripe_customer_id = stripe_customer_response.response["stripe_customer_id"]
 
             # Check if there is an active subscription
-            active_subscription = self.subscription_dao.read_active_subscription_by_customer_id(user.id)
             if (active_subscription.success):
                 raise Exception("user_has_active_subscription")
 
-            # Tally up users under the company code
-            total_licences = licences
-            company_service = self.company_service(user.CompanyCode)
+            # Tally up users under the company code, the roster is read only for the checkouts that go on
+            roster_response = read_roster()
+            if (not roster_response.success):
+                raise Exception(roster_response.message)
 
             if (user.company_type == "individual_group"):
-                total_individual_response = company_service.read_individuals()
-
-                if (not total_individual_response.success):
-                    raise Exception(total_individual_response.message)
-
-                total_licences = total_individual_response.response["total"]
-
-            elif (user.company_type == "tutor_group"):
-                total_tutors_response = company_service.read_tutors()
-
-                if (not total_tutors_response.success):
-                    raise Exception(total_tutors_response.message)
-
-                total_licences = total_licences + total_tutors_response.response["total"]
+                total_licences = roster_response.response["total"]
             else:
-                raise Exception("invalid_company_type")
+                total_licences = licences + roster_response.response["total"]
 
             if (total_licences == 0):
                 raise Exception("invalid_licences_amount")
@@ -131,7 +131,11 @@ class AdminUseCase(BaseUseCase):
             if (not stripe_update_subscription_response.success):
                 raise Exception(stripe_update_subscription_response.message)
 
-            response = self.subscription_dao.update_subscription_by_id(subscription.id, new_total_licences)
+            response = self.subscription_dao.update_subscription_by_id(
+                subscription.id,
+                new_total_licences,
+                current_licences
+            )
             response.response = {}
         except Exception as e:
             response.message = str(e)
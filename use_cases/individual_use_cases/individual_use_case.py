@@ -1,6 +1,7 @@
 from use_cases import BaseUseCase
 from typing import Union
 from entities import Response, Membership, StudentUser, TutorUser, Subscription, PaymentSession, Session, LineItems
+from utils import run_in_parallel
 
 
 class IndividualUseCase(BaseUseCase):
@@ -23,17 +24,20 @@ class IndividualUseCase(BaseUseCase):
         try:
             user = self.user
 
-            # Validates if customer has a stripe customer id
-            if (user.stripe_customer_id == ""):
-                stripe_customer_response = self.stripe_service.create_stripe_customer(user)
+            # The stripe customer and the active subscription don't depend on each other
+            stripe_customer_response, active_subscription = run_in_parallel(
+                (lambda: self.stripe_service.create_stripe_customer(user)) if (user.stripe_customer_id == "") else None,
+                lambda: self.subscription_dao.read_active_subscription_by_customer_id(user.id)
+            )
 
+            # Validates if customer has a stripe customer id
+            if (stripe_customer_response is not None):
                 if (not stripe_customer_response.success):
                     raise Exception(stripe_customer_response.message)
 
                 user.stripe_customer_id = stripe_customer_response.response["stripe_customer_id"]
 
             # Check if there is an active subscription
-            active_subscription = self.subscription_dao.read_active_subscription_by_customer_id(user.id)
             if (active_subscription.success):
                 raise Exception("user_has_active_subscription")
 
@@ -1,2 +1,9 @@
 from .utils import string_to_datetime, calculate_hours_spent, calculate_hours_spent_by_range, find_student_debt_by_student_id, find_tutor_pay_by_tutor_id
-from .utils import dollars_to_cents, cents_to_dollars, firebase_to_datetime, check_duplicated_tutor_hours
\ No newline at end of file
+from .utils import dollars_to_cents, cents_to_dollars, firebase_to_datetime, check_duplicated_tutor_hours
+from .utils import index_payroll_lines, merge_payroll_lines
+from .hours import calculate_hours_by_range_batch, to_epoch_microseconds, build_meeting_arrays
+from .hours import hours_by_range_from_arrays
+from .hours import meeting_range, calculate_hours_by_ledger_batch
+from .concurrency import run_in_parallel, reset_executor
+from .asgi import LifespanApp
+from .lazy_import import lazy_import
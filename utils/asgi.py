@@ -0,0 +1,46 @@
+import asyncio
+from typing import Callable, List, Optional
+
+
+class LifespanApp():
+    """
+        Runs startup and shutdown callbacks on the ASGI lifespan events of a server, e.g. uvicorn, and passes
+        every other scope to the wrapped ASGI app
+    """
+
+    def __init__(
+            self,
+            app,
+            on_startup: Optional[List[Callable[[], None]]] = None,
+            on_shutdown: Optional[List[Callable[[], None]]] = None
+    ) -> None:
+        """
+            Args:
+                app: the ASGI app that serves the requests
+                on_startup: functions called when the server starts, before it accepts requests
+                on_shutdown: functions called when the server stops
+        """
+        self.app = app
+        self.on_startup = on_startup or []
+        self.on_shutdown = on_shutdown or []
+
+    async def __call__(self, scope: dict, receive, send):
+        if (scope["type"] != "lifespan"):
+            await self.app(scope, receive, send)
+            return
+
+        while (True):
+            message = await receive()
+            if (message["type"] == "lifespan.startup"):
+                try:
+                    for callback in self.on_startup:
+                        await asyncio.to_thread(callback)
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif (message["type"] == "lifespan.shutdown"):
+                for callback in self.on_shutdown:
+                    await asyncio.to_thread(callback)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,58 @@
+"""
+    Builds the OpenAPI spec of the routes into config/openapi.json, create_app serves it as a static file so the
+    workers don't import flasgger nor build the entity schemas.
+
+    Run it in the image build, and after changing a route docstring or an entity:
+        python -m utils.build_openapi [--check]
+"""
+import argparse
+import json
+import sys
+from os import path
+
+OPENAPI_PATH = path.join(path.dirname(path.dirname(path.abspath(__file__))), "config", "openapi.json")
+
+
+def build_spec() -> dict:
+    """
+        Builds the spec flasgger serves from the route docstrings and config/swagger_config.py
+        Returns:
+            the swagger 2.0 spec
+    """
+    from flask import Flask
+    from flasgger import Swagger
+    from config.swagger_config import swagger_template
+    from controllers import blueprints
+
+    app = Flask(__name__)
+    swagger = Swagger(app, template=swagger_template)
+    for blueprint in blueprints:
+        app.register_blueprint(blueprint)
+
+    with app.test_request_context():
+        return json.loads(json.dumps(swagger.get_apispecs()))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Builds config/openapi.json")
+    parser.add_argument("--check", action="store_true", help="fails when the file is not up to date, writes nothing")
+    args = parser.parse_args(argv)
+
+    content = json.dumps(build_spec(), indent=2, sort_keys=True) + "\n"
+
+    if (args.check):
+        current = open(OPENAPI_PATH).read() if (path.exists(OPENAPI_PATH)) else ""
+        if (current != content):
+            print("config/openapi.json is not up to date, run python -m utils.build_openapi")
+            return 1
+        return 0
+
+    with open(OPENAPI_PATH, "w") as file:
+        file.write(content)
+
+    print("wrote " + OPENAPI_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from os import environ
+from threading import Lock
+from typing import Any, Callable, List, Optional
+
+#firestore and stripe calls spend their time waiting on the network, threads are enough to overlap them
+MAX_WORKERS = int(environ.get("PARALLEL_READS_WORKERS", "8"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+_in_worker: ContextVar[bool] = ContextVar("in_parallel_worker", default=False)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    #created on first use, so every worker process of the server gets its own pool
+    global _executor
+    with _executor_lock:
+        if (_executor is None):
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="parallel-reads")
+        return _executor
+
+
+def _run_in_worker(call: Callable[[], Any]) -> Any:
+    _in_worker.set(True)
+    return call()
+
+
+def run_in_parallel(*calls: Optional[Callable[[], Any]]) -> List[Any]:
+    """
+        Runs independent calls, e.g. DAO reads, at the same time on a shared thread pool.
+        Every call runs in a copy of the caller's context, so it sees the request identity map
+        Args:
+            calls: functions without arguments, a None is skipped and its result is None
+        Returns:
+            the results in the same order as the calls, the first exception raised by a call is raised again
+    """
+    pending = [call for call in calls if (call is not None)]
+
+    #a single call, or a call already made from the pool, runs inline so the pool can't wait on itself
+    if (len(pending) <= 1 or _in_worker.get()):
+        return [call() if (call is not None) else None for call in calls]
+
+    executor = _get_executor()
+    futures = [
+        executor.submit(copy_context().run, _run_in_worker, call) if (call is not None) else None
+        for call in calls
+    ]
+
+    return [future.result() if (future is not None) else None for future in futures]
+
+
+def reset_executor():
+    """
+        Forgets the pool of the parent process in a forked worker, its threads don't exist after the fork
+    """
+    global _executor
+    _executor = None
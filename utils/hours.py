@@ -0,0 +1,192 @@
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from operator import attrgetter
+from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+import numpy as np
+
+MICROSECONDS_PER_HOUR = 3600 * 1_000_000
+
+_get_tzinfo = attrgetter("tzinfo")
+
+
+def _epoch_seconds(date: datetime) -> float:
+    return date.timestamp() if (date.tzinfo is not None) else date.replace(tzinfo=timezone.utc).timestamp()
+
+
+def to_epoch_microseconds(dates: List[datetime]) -> np.ndarray:
+    """
+        Converts a list of datetimes to an int64 array of epoch microseconds
+        Args:
+            dates: timezone aware or naive datetimes, naive ones are taken as UTC (the way Firestore stores them)
+        Returns:
+            an int64 numpy array
+    """
+    if (None in map(_get_tzinfo, dates)):
+        dates = [date if (date.tzinfo is not None) else date.replace(tzinfo=timezone.utc) for date in dates]
+
+    seconds = np.fromiter(map(datetime.timestamp, dates), dtype=np.float64, count=len(dates))
+    return np.rint(seconds * 1_000_000).astype(np.int64)
+
+
+def build_meeting_arrays(histories: List[Tuple[List[datetime], List[datetime]]]) -> tuple:
+    """
+        Converts the meeting histories of many users to flat epoch arrays, once
+        Args:
+            histories: a list of (activity_starts, activity_ends) pairs, one per user
+        Returns:
+            (starts, ends, owners): int64 arrays, owners[i] is the index in histories of meeting i
+    """
+    counts = [min(len(starts), len(ends)) for (starts, ends) in histories]
+
+    starts = list(chain.from_iterable(
+        dates if (len(dates) == count) else dates[:count] for (dates, _ends), count in zip(histories, counts)
+    ))
+    ends = list(chain.from_iterable(
+        dates if (len(dates) == count) else dates[:count] for (_starts, dates), count in zip(histories, counts)
+    ))
+    owners = np.repeat(np.arange(len(histories)), counts)
+
+    return to_epoch_microseconds(starts), to_epoch_microseconds(ends), owners
+
+
+def hours_by_range_from_arrays(
+        starts: np.ndarray,
+        ends: np.ndarray,
+        owners: np.ndarray,
+        total_owners: int,
+        start_range: Optional[int] = None,
+        end_range: Optional[int] = None
+) -> np.ndarray:
+    """
+        Clips every meeting to [start_range, end_range] and adds the hours by owner.
+        Meetings where start > end add nothing
+        Args:
+            starts, ends, owners: arrays from build_meeting_arrays
+            total_owners: the number of users
+            start_range: the range start in epoch microseconds, None to count from the beginning
+            end_range: the range end in epoch microseconds, None to count until the end
+        Returns:
+            a float array with the hours of every owner
+    """
+    if (start_range is not None):
+        starts = np.maximum(starts, start_range)
+    if (end_range is not None):
+        ends = np.minimum(ends, end_range)
+
+    overlap = np.clip(ends - starts, 0, None)
+    totals = np.bincount(owners, weights=overlap, minlength=total_owners)
+
+    return totals / MICROSECONDS_PER_HOUR
+
+
+def calculate_hours_by_range_batch(
+        histories: List[Tuple[List[datetime], List[datetime]]],
+        start_range: Optional[datetime] = None,
+        end_range: Optional[datetime] = None
+) -> List[float]:
+    """
+        Calculates the hours spent by many users in one vectorized pass
+        Args:
+            histories: a list of (activity_starts, activity_ends) pairs, one per user
+            start_range: the range start, None to count from the beginning
+            end_range: the range end, None to count until the end
+        Returns:
+            a list with the hours of every user, in the same order as histories
+    """
+    starts, ends, owners = build_meeting_arrays(histories)
+
+    bounds = to_epoch_microseconds([date for date in (start_range, end_range) if (date is not None)]).tolist()
+    start_us = bounds.pop(0) if (start_range is not None) else None
+    end_us = bounds.pop(0) if (end_range is not None) else None
+
+    return hours_by_range_from_arrays(starts, ends, owners, len(histories), start_us, end_us).tolist()
+
+
+def meeting_range(
+        activity_starts: List[datetime],
+        activity_ends: List[datetime],
+        cursor: int = 0,
+        start_range: Optional[datetime] = None,
+        end_range: Optional[datetime] = None
+) -> Tuple[int, int, int]:
+    """
+        Finds with binary search the meetings that overlap [start_range, end_range].
+        The meeting history is append only, so starts and ends are chronological, and every meeting
+        before the cursor was already billed by a completed payroll
+        Args:
+            activity_starts: the meetings start dates
+            activity_ends: the meetings end dates
+            cursor: the index of the first meeting not completely billed yet
+            start_range: the range start, None to count from the cursor
+            end_range: the range end, None to count until the last meeting
+        Returns:
+            (first, last, next_cursor): the meetings [first, last) overlap the range,
+                next_cursor is the first meeting not completely inside the range
+    """
+    count = min(len(activity_starts), len(activity_ends))
+    first = min(max(cursor, 0), count)
+
+    #datetimes compare natively, the bounds just need the same awareness than the history
+    naive = (count > 0 and activity_starts[0].tzinfo is None)
+    start_bound = _as_comparable(start_range, naive)
+    end_bound = _as_comparable(end_range, naive)
+
+    try:
+        return _bisect_meetings(activity_starts, activity_ends, count, first, start_bound, end_bound, None)
+    except TypeError:
+        #a history with naive and aware dates mixed, compare them as epoch seconds
+        start_bound = _epoch_seconds(start_range) if (start_range is not None) else None
+        end_bound = _epoch_seconds(end_range) if (end_range is not None) else None
+        return _bisect_meetings(activity_starts, activity_ends, count, first, start_bound, end_bound, _epoch_seconds)
+
+
+def _as_comparable(date: Optional[datetime], naive: bool) -> Optional[datetime]:
+    if (date is None):
+        return None
+    if (naive):
+        return date.astimezone(timezone.utc).replace(tzinfo=None) if (date.tzinfo is not None) else date
+    return date if (date.tzinfo is not None) else date.replace(tzinfo=timezone.utc)
+
+
+def _bisect_meetings(activity_starts, activity_ends, count, first, start_bound, end_bound, key) -> Tuple[int, int, int]:
+    if (start_bound is not None):
+        first = bisect_right(activity_ends, start_bound, first, count, key=key)
+
+    if (end_bound is None):
+        return first, count, count
+
+    last = bisect_left(activity_starts, end_bound, first, count, key=key)
+    next_cursor = bisect_right(activity_ends, end_bound, first, last, key=key)
+
+    return first, last, next_cursor
+
+
+def calculate_hours_by_ledger_batch(
+        histories: List[Tuple[List[datetime], List[datetime], int]],
+        start_range: Optional[datetime] = None,
+        end_range: Optional[datetime] = None
+) -> Tuple[List[float], List[Tuple[int, int, int]]]:
+    """
+        Calculates the hours of many users touching only the meetings after every user's cursor
+        Args:
+            histories: a list of (activity_starts, activity_ends, cursor), one per user
+            start_range: the range start, None to count from the cursor
+            end_range: the range end, None to count until the last meeting
+        Returns:
+            (hours, ranges): the hours of every user and its meeting_range result, in the same order as histories
+    """
+    ranges = [
+        meeting_range(starts, ends, cursor, start_range, end_range)
+        for (starts, ends, cursor) in histories
+    ]
+    hours = calculate_hours_by_range_batch(
+        [
+            (starts[first:last], ends[first:last])
+            for (starts, ends, _cursor), (first, last, _next) in zip(histories, ranges)
+        ],
+        start_range,
+        end_range
+    )
+
+    return hours, ranges
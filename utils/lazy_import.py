@@ -0,0 +1,47 @@
+import sys
+from importlib import import_module
+from threading import Lock
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """
+        Stands for a module until an attribute is read or set, then imports it. The imports of stripe and the
+        firestore client take most of the start up of a worker, a request that doesn't use them doesn't pay it
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        object.__setattr__(self, "_lazy_lock", Lock())
+        object.__setattr__(self, "_lazy_module", None)
+
+    def _load(self) -> ModuleType:
+        module = object.__getattribute__(self, "_lazy_module")
+        if (module is None):
+            #the first requests of a threaded worker can reach the import at the same time
+            with object.__getattribute__(self, "_lazy_lock"):
+                module = object.__getattribute__(self, "_lazy_module")
+                if (module is None):
+                    module = import_module(self.__name__)
+                    object.__setattr__(self, "_lazy_module", module)
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._load(), name)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+        Imports a module on first use
+        Args:
+            name: the module name, e.g. "stripe" or "firebase_admin.firestore"
+        Returns:
+            the module when it's already imported, a LazyModule otherwise
+    """
+    return sys.modules[name] if (name in sys.modules) else LazyModule(name)
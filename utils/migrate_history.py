@@ -0,0 +1,144 @@
+"""
+    Moves the history arrays kept inline in the users and subscriptions records to their history subcollections:
+        subscriptions.prorate_data -> subscriptions/{id}/prorate_data
+        users.subscription_coupons_applied -> users/{id}/subscription_coupons_applied
+        users.HistMeetingTimes/HistMeetingTimesEnd already billed -> users/{id}/meetings
+
+    The meetings not billed yet stay in the user record, the payroll keeps reading them from there.
+    Companies with a payroll not paid are skipped for the meetings, run the tool again once it's paid.
+    The pending payroll is read again for each company right before its meetings are moved, still no payroll
+    must be created while the tool runs: its lines point to positions of the meeting arrays being moved.
+    The meetings appended meanwhile are not lost, move_to_history only rewrites HistMeetingTimes/HistMeetingTimesEnd
+    if the user didn't change since it was read, otherwise it reads and plans again.
+
+    Usage:
+        python -m utils.migrate_history [--dry-run] [--page-size 500]
+"""
+import argparse
+import sys
+from collections import Counter
+from os import environ
+
+
+def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import credentials
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if (not firebase_admin._apps):
+        firebase_admin.initialize_app(credentials.Certificate(environ["FIREBASE_CREDENTIALS_PATH"]), {
+            "databaseURL": environ["DATABASE_URL"]
+        })
+
+
+def read_pages(repository, page_size: int, fields: list):
+    """
+        Reads a whole collection one page at a time
+    """
+    start_after = None
+
+    while (True):
+        page_response = repository.read_collection_page(page_size, start_after, fields)
+        if (not page_response.success):
+            raise Exception(page_response.message)
+
+        yield from page_response.response_list
+
+        start_after = page_response.response
+        if (start_after is None):
+            return
+
+
+def read_pending_payroll(filters: list, limit: int = None) -> list:
+    from repositories import create_repository
+
+    payroll_response = create_repository("payroll").read_objects_with_filters(
+        [("completed", "==", False), *filters],
+        limit,
+        ["company_code"]
+    )
+    #no payroll pending answers no_records_found, any other failure stops the tool
+    if (not payroll_response.success and not payroll_response.message.startswith("no_records_found")):
+        raise Exception(payroll_response.message)
+
+    return payroll_response.response_list
+
+
+def companies_with_pending_payroll() -> set:
+    return {payroll["company_code"] for payroll in read_pending_payroll([])}
+
+
+def has_pending_payroll(company_code: str) -> bool:
+    """
+        Reads again if a company has a payroll not paid, for the payroll created after the tool started
+    """
+    return len(read_pending_payroll([("company_code", "==", company_code)], limit=1)) > 0
+
+
+def migrate_subscriptions(page_size: int, dry_run: bool) -> Counter:
+    from dao import SubscriptionsDao
+
+    subscriptions_dao = SubscriptionsDao()
+    totals = Counter()
+
+    for subscription in read_pages(subscriptions_dao.repository, page_size, ["prorate_data"]):
+        if (len(subscription.get("prorate_data") or []) == 0):
+            continue
+
+        totals["subscriptions_prorate_data"] += 1
+        if (not dry_run):
+            archive_response = subscriptions_dao.archive_prorate_data(subscription["id"])
+            totals["errors"] += 0 if (archive_response.success) else 1
+
+    return totals
+
+
+def migrate_users(page_size: int, dry_run: bool) -> Counter:
+    from dao import UserDao
+
+    user_dao = UserDao()
+    pending_payroll = companies_with_pending_payroll()
+    totals = Counter()
+
+    fields = ["CompanyCode", "subscription_coupons_applied", "payroll_meeting_cursor"]
+    for user in read_pages(user_dao.repository, page_size, fields):
+        if (len(user.get("subscription_coupons_applied") or []) > 0):
+            totals["users_coupons_applied"] += 1
+            if (not dry_run):
+                archive_response = user_dao.archive_coupons_applied(user["id"])
+                totals["errors"] += 0 if (archive_response.success) else 1
+
+        if (user.get("payroll_meeting_cursor", 0) > 0):
+            company_code = user.get("CompanyCode")
+            #read again right before moving, a payroll may have been created since the tool started
+            if (company_code in pending_payroll or (not dry_run and has_pending_payroll(company_code))):
+                pending_payroll.add(company_code)
+                totals["users_meetings_skipped_pending_payroll"] += 1
+                continue
+
+            totals["users_meetings"] += 1
+            if (not dry_run):
+                archive_response = user_dao.archive_billed_meetings(user["id"])
+                totals["errors"] += 0 if (archive_response.success) else 1
+
+    return totals
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Moves the inline history arrays to history subcollections")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="only count the records to migrate")
+    args = parser.parse_args(argv)
+
+    initialize_firebase()
+
+    totals = migrate_subscriptions(args.page_size, args.dry_run) + migrate_users(args.page_size, args.dry_run)
+    for (name, total) in sorted(totals.items()):
+        print(f"{name}: {total}")
+
+    return 1 if (totals["errors"] > 0) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 from typing import List
 from datetime import datetime, timedelta
 from entities import TutorPayout
+from .hours import calculate_hours_by_range_batch
 
 
 def cents_to_dollars(cents: int) -> float:
@@ -51,20 +52,7 @@ def calculate_hours_spent_by_range(
         start_range: datetime,
         end_range: datetime
 ) -> float:
-    total_hours = 0.0
-
-    for start, end in zip(activity_starts, activity_ends):
-        if start > end:
-            continue  # Skip invalid intervals where start is after end
-
-        overlap_start = max(start, start_range)
-        overlap_end = min(end, end_range)
-
-        if overlap_end > overlap_start:
-            overlap_duration = overlap_end - overlap_start
-            total_hours += overlap_duration.total_seconds() / 3600
-
-    return total_hours
+    return calculate_hours_by_range_batch([(activity_starts, activity_ends)], start_range, end_range)[0]
 
 
 def firebase_to_datetime(firebase_timestamp):
@@ -77,14 +65,7 @@ def calculate_hours_spent(
         activity_starts: List[datetime],
         activity_ends: List[datetime]
 ) -> float:
-    total_hours = 0.0
-
-    for start, end in zip(activity_starts, activity_ends):
-        if end > start:
-            time_spent = end - start
-            total_hours += time_spent.total_seconds() / 3600
-
-    return total_hours
+    return calculate_hours_by_range_batch([(activity_starts, activity_ends)])[0]
 
 
 def string_to_datetime(date_string: str) -> datetime:
@@ -121,12 +102,51 @@ def check_duplicated_tutor_hours(tutors_list: list) -> list:
     for tutor in tutors_list:
         tutor: TutorPayout = tutor
 
-        if tutor.tutor_id in consolidated:
-            consolidated[tutor.tutor_id]["tutor_total_hours"] += tutor.tutor_total_hours
-            consolidated[tutor.tutor_id]["tutor_payout"] += tutor.tutor_payout
+        saved_tutor = consolidated.get(tutor.tutor_id)
+        if (saved_tutor is None):
+            #a copy, the lines received are not modified
+            consolidated[tutor.tutor_id] = tutor.model_copy()
         else:
-            consolidated[tutor.tutor_id] = tutor.model_dump()
-            consolidated[tutor.tutor_id]["tutor_total_hours"] = tutor.tutor_total_hours
-            consolidated[tutor.tutor_id]["tutor_payout"] = tutor.tutor_payout
+            saved_tutor.tutor_total_hours += tutor.tutor_total_hours
+            saved_tutor.tutor_payout += tutor.tutor_payout
+
+    return list(consolidated.values())
+
+
+def index_payroll_lines(data_list: list, key: str) -> dict:
+    """
+        Indexes payroll lines by a field, the first line wins like in the find_* functions
+        Args:
+            data_list: StudentDebt or TutorPayout lines
+            key: student_id or tutor_id
+        Returns:
+            a dict {key value: line}
+    """
+    index = {}
+    for item in data_list:
+        index.setdefault(getattr(item, key), item)
+    return index
+
+
+def merge_payroll_lines(previous_lines: list, new_lines: list, key: str) -> list:
+    """
+        Reconciles the lines of a pending payroll with a new calculation in one pass.
+        Paid lines are kept as they were saved, even when they are not in the new calculation,
+        the rest of the lines come from the new calculation
+        Args:
+            previous_lines: the saved StudentDebt or TutorPayout lines
+            new_lines: the lines of the new calculation
+            key: student_id or tutor_id
+        Returns:
+            the merged lines
+    """
+    previous_index = index_payroll_lines(previous_lines, key)
+
+    merged = []
+    for line in new_lines:
+        saved = previous_index.pop(getattr(line, key), None)
+        merged.append(saved if (saved is not None and saved.paid) else line)
+
+    merged.extend(saved for saved in previous_index.values() if (saved.paid))
 
-    return [TutorPayout(**tutor_parsed) for _id, tutor_parsed in consolidated.items()]
+    return merged